@@ -62,7 +62,7 @@ class CompareDistribution(object):
     '''
     
     #TODO: Error Checking
-    def __init__(self, data_list, dist_list, observed_index):
+    def __init__(self, data_list, dist_list, observed_index, freq=False):
         '''
         Parameters
         ----------
@@ -79,20 +79,40 @@ class CompareDistribution(object):
             data_list.  If 0, data_list can be a list of data
             rather than a list of tuples of data.  The index specified by
             object_ind will be considered the observed data.
+        freq : bool
+            If True, data_list is a list of frequency tables of (values,
+            counts), eg, from freq_table, and observed_index is ignored. The
+            tables are passed to the fit functions and used for likelihoods.
         
         Notes
         -----
-        All distribution objects are fit in the __init__ method.
+        All distribution objects are fit and frozen in the __init__ method.
+        Distributions that take a METEState, such as psi, theta and nu, share
+        one state for each set of n_samp, tot_obs and E.
 
         '''
 
-        self.dist_list = make_dist_list(dist_list)
-
-        # Fit the distributions objects 
-        [dist.fit(data_list) for dist in self.dist_list]
+        # Fit the distributions objects and freeze them, so that internal
+        # parameters are solved once for all comparisons. METE distributions
+        # fit to the same data share one METEState.
+        if freq:
+            dists = [dist.fit(data_list, freq=True) for dist in
+                                                    make_dist_list(dist_list)]
+        else:
+            dists = [dist.fit(data_list) for dist in
+                                                    make_dist_list(dist_list)]
+        share_mete_state(dists)
+        self.dist_list = [dist.freeze() for dist in dists]
         
-        # Set the observed data
-        if observed_index == 0 and np.all([type(dt) != type((1,)) for dt in
+        # Set the observed data. Frequency tables are kept for likelihoods
+        # and expanded for the comparisons that need each observation.
+        self.observed_tables = None
+        if freq:
+            self.observed_tables = [(np.asarray(tvalues), np.asarray(tcounts))
+                                            for tvalues, tcounts in data_list]
+            self.observed_data = [np.repeat(tvalues, tcounts) for tvalues,
+                                            tcounts in self.observed_tables]
+        elif observed_index == 0 and np.all([type(dt) != type((1,)) for dt in
                                                             data_list]):
             self.observed_data = [np.array(dt) for dt in data_list]
         elif np.all([type(dt) == type((1,)) for dt in data_list]):
@@ -196,15 +216,13 @@ class CompareDistribution(object):
         aic_vals = []
         for dist in self.dist_list:
             
+            # Likelihood is evaluated on the frequency table of each data set
             try:
-                nlls = nll(dist.pmf(self.observed_data))
+                nlls = -self._loglik(dist)
             except NotImplementedError:
-                try:
-                    nlls = nll(dist.pdf(self.observed_data))
-                except NotImplementedError:
-                    logging.warning('%s has neither a PMF nor a PDF. AIC set'
+                logging.warning('%s has neither a PMF nor a PDF. AIC set'
                                             % get_name(dist) + ' to infinity')
-                    nlls = np.repeat(np.inf, len(self.observed_data)) 
+                nlls = np.repeat(np.inf, len(self.observed_data)) 
                     
             #NOTE: dist.par_num is the number of parameters of distribution
             k = np.repeat(dist.par_num, len(nlls))
@@ -215,6 +233,15 @@ class CompareDistribution(object):
                 aic_vals.append(aic(nlls, k))
         return list(np.array(aic_vals).T)
 
+    def _loglik(self, dist):
+        '''
+        Log-likelihood of each observed data set under dist, from the
+        frequency tables if they were given.
+        '''
+        if self.observed_tables is None:
+            return dist.loglik(self.observed_data)
+        return dist.loglik(self.observed_tables, freq=True)
+
     def compare_aic_measures(self, crt=False):
         '''
         Compare AIC weights, delta_AIC, and AIC values across the different 
@@ -342,18 +369,15 @@ class CompareDistribution(object):
 
         '''
         LRT_list = {}
-        null_mdl.fit(self.observed_data)
+        if self.observed_tables is None:
+            null_mdl.fit(self.observed_data)
+        else:
+            null_mdl.fit(self.observed_tables, freq=True)
 
-        try:
-            null_nlls = nll(null_mdl.pmf(self.observed_data))
-        except:
-            null_nlls = nll(null_mdl.pdf(self.observed_data))
+        null_nlls = -self._loglik(null_mdl)
         for i, dist in enumerate(self.dist_list):
             
-            try:
-                alt_nlls = nll(dist.pmf(self.observed_data))
-            except:
-                alt_nlls = nll(dist.pdf(self.observed_data))
+            alt_nlls = -self._loglik(dist)
 
             k = dist.par_num - null_mdl.par_num
             df = np.repeat(k, len(alt_nlls))
@@ -548,7 +572,7 @@ class CompareSAD(CompareDistribution):
 
     '''
     
-    def __init__(self, data_list, dist_list, patch=False):
+    def __init__(self, data_list, dist_list, patch=False, freq=False):
         '''
         Parameters
         ----------
@@ -560,17 +584,28 @@ class CompareSAD(CompareDistribution):
         patch : bool
             If True, expects the output from the Patch.sad method and if False, 
             expects a list of iterables. Presumably, each iterable is an SAD.
+        freq : bool
+            If True, each element of data_list is a frequency table of
+            (abundances, number of species with each abundance), eg, from
+            freq_table. The tables are used to fit the distributions and in
+            compare_aic and compare_LRT. Ignored if patch is True.
 
         Notes
         -----
         If data_list is a list of tuples containing iterables, the 1st entry
         (0th element) in each tuple is considered the observed SADs
+
+        Likelihoods in compare_aic and compare_LRT are calculated from the
+        frequency table of each SAD, so each distinct abundance is only
+        evaluated once. If freq is True, self.observed_data holds the SADs
+        expanded from the tables, for the comparisons of rads, cdfs and
+        moments.
         '''
         if patch == True:
             self.criteria, sad_data, self.sad_spp_list = unpack(data_list)
             super(CompareSAD, self).__init__(sad_data, dist_list, 0) 
         else:
-            super(CompareSAD, self).__init__(data_list, dist_list, 0)
+            super(CompareSAD, self).__init__(data_list, dist_list, 0, freq)
 
 class CompareSSAD(CompareDistribution):
     '''
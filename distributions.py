@@ -41,19 +41,46 @@ Energy Distributions
 - `theta` -- The species energy distribution (SED) as described by Harte (2011).
 - `nu` -- The average species energy distribution (ASED) as described by Harte
   (2011)
+- `METEState` -- Lagrange multipliers and normalizing constants shared by
+  logser_ut and the energy distributions
 
 Misc Functions
 --------------
 - `make_array` 
 - `make_rank_abund` 
+- `freq_table`
 - `_ln_choose`
+- `_fnbd_logpmf`
+- `_abund_area`
+- `_pln_logpmf`
 - `_downscale_sar_`
 - `_upscale_sar_`
+- `_downscale_step`
+- `_upscale_step`
+- `mete_sar_table`
+- `_mete_sar_ratio`
+- `_cubic_weights`
 - `_generate_areas_`
 - `expand_n`
 - `check_list_of_iterables`
 - `set_up_and_down`
 - `unpack`
+- `_random_state`
+- `_exp1`
+- `beta_solver`
+- `beta_eq`
+- `solve_beta`
+- `share_mete_state`
+- `_set_state`
+- `_get_state`
+- `batch_solver`
+- `_geo_sum`
+- `_log_sum`
+- `_memo_solve`
+- `_mle`
+- `_nbd_k_newton`
+- `_dgamma_norm`
+- `_sugihara_chunk`
 
 References
 ----------
@@ -105,15 +132,56 @@ import numpy as np
 import scipy.stats as stats
 import scipy.optimize 
 import scipy.special
-from copy import deepcopy
+from copy import copy, deepcopy
 import math as m
 import scipy.integrate as integrate
 import sys
+import multiprocessing
+from collections import OrderedDict
 #from docinherit import DocInherit
 from utils.docinherit import DocInherit
+from utils.solve_cache import SolveCache
 
 doc_inherit = DocInherit
 
+# Memoizes Lagrange multiplier and parameter solves. Use 
+# solve_cache.use_disk(path) to keep solves between runs, and
+# solve_cache.stats() for hit rates.
+solve_cache = SolveCache()
+
+# Gauss-Legendre nodes and weights for each panel of the Poisson lognormal
+# integral
+_PLN_NODES, _PLN_WEIGHTS = np.polynomial.legendre.leggauss(32)
+
+# Maximum length of the cumulative pmf table kept for each parameter set by
+# Distribution.cdf
+_CUM_TABLE_MAX = 2**20
+
+# Upper limit of the support used by Distribution.rvs when params have no
+# tot_obs
+_RVS_SUPPORT_MAX = 2**20
+
+# Number of presence tables per doubling of area when gen_sar interpolates
+# in log-area
+_PRES_PER_DOUBLING = 8
+
+# Maximum total length of the sad pmfs kept by gen_sar for upscaling
+_SAD_PMF_CACHE_MAX = 2**22
+
+# Largest number of individuals for which the METE SAR iterations sum over
+# abundances directly. Larger areas use _upscale_step and _downscale_step.
+_SAR_DIRECT_MAX = 2**16
+
+# Nodes per doubling of S and of N / S in the METE SAR table used by
+# mete_sar_table, and the smallest N, S and N / S at a node. The ratio of
+# species in a step changes quickly near N / S = 1 and, for few species, near
+# the largest N / S with a solution, so steps near these limits are iterated
+# exactly.
+_SAR_TABLE_PER_DOUBLING = 8
+_SAR_TABLE_MIN_N = 2**7
+_SAR_TABLE_MIN_S = 24
+_SAR_TABLE_MIN_RATIO = 2
+
 
 # TODO: Add truncated log-normal?
 
@@ -195,7 +263,7 @@ class Curve(object):
         pass
 
     def univ_curve(self, num_iter=5, direction='down', param='tot_obs',
-                                      iterative=False, base=2, use_rad=False):
+                            iterative=False, base=2, use_rad=False, **kwargs):
         '''
         Generating a univsersal curve for different curves.  A universal curve
         is defined as the slope value (z) at a function y = f(x) at a given x
@@ -223,6 +291,8 @@ class Curve(object):
             If False, uses the sad pmf to calculate the SAR.  If True, uses the
             sad rank abundance distribution to calculate the SAR. An SAR class
             inherits curve.
+        kwargs : keyword arguments
+            Passed on to Curve.vals or Curve.iter_vals
 
         Returns
         -------
@@ -250,7 +320,7 @@ class Curve(object):
             def z(a):
                 na = [((1. / base) * a[0])] + list(a) + [(base * a[-1])]
                 complete_a = self.iter_vals(na, non_iter=True, base=base,
-                                                      use_rad=use_rad)['items']
+                                            use_rad=use_rad, **kwargs)['items']
                 sz = len(complete_a)
                 a1 = complete_a[np.arange(1,sz - 1)]
                 a2 = complete_a[np.arange(sz - 2)]
@@ -261,12 +331,13 @@ class Curve(object):
 
         else:
             def z(a):
-                a1 = self.vals(a, use_rad=use_rad)['items']
-
-                a2 = np.array(list(self.vals(((1./base) * a)[0],
-                        use_rad=use_rad)['items']) + list(a1[:-1]))
-                a3 = np.array(list(a1[1:]) +  list(self.vals((base *
-                                            a)[-1], use_rad=use_rad)['items']))
+                # All areas, including one step beyond each end, in one call
+                na = [((1. / base) * a[0])] + list(a) + [(base * a[-1])]
+                complete_a = self.vals(na, use_rad=use_rad, **kwargs)['items']
+                sz = len(complete_a)
+                a1 = complete_a[np.arange(1, sz - 1)]
+                a2 = complete_a[np.arange(sz - 2)]
+                a3 = complete_a[np.arange(2, sz)]
                 return (0.5 * (np.log(a3 / a2))) / np.log(base), a1, zip(a1, a)
         
         # Get the area list
@@ -330,6 +401,8 @@ class Distribution(object):
         Contains all keyword arguments used to initialize distribution object
     min_supp : int
         Minimum support for distribution, usually 0 or 1
+    upper_trunc : bool
+        True if the support of the distribution ends at tot_obs
     par_num : int
         Number of free parameters of distribution, used for AIC calculations
     var : dict
@@ -343,12 +416,23 @@ class Distribution(object):
         Probability density function
     pmf(n)
         Probability mass function
+    logpdf(n), logpmf(n)
+        Log of the pdf or pmf
+    loglik(data)
+        Log-likelihood of data, calculated from a frequency table
+    p_absent(tot_obs, a), p_all(tot_obs, a)
+        Probability that a species is absent from, or has all individuals
+        in, a cell that is a fraction a of the total area (SSADs)
     cdf(n)
         Cumulative distribution function
     rad()
         Rank abundance distribution, calculated from cdf
+    rvs(size, random_state)
+        Random variates, by inverse cdf over the support of the pmf
     fit(data)
         Uses data to populate params attribute
+    freeze()
+        Returns immutable copy with internal parameters solved once
 
     Examples
     --------
@@ -368,6 +452,9 @@ class Distribution(object):
 
     '''
 
+    # Subclasses whose support ends at tot_obs set this in __init__
+    upper_trunc = False
+
     def __init__(self, **kwargs):
         '''
         Initialize distribution object.
@@ -434,6 +521,48 @@ class Distribution(object):
         raise NotImplementedError('PDF is not implemented for this' + 
                                   ' Distribution class')
 
+    def logpmf(self, n):
+        '''
+        Log of the probability mass function.
+
+        Parameters
+        ----------
+        n : int, float or array-like object
+            Values at which to calculate logpmf. May be a list of same length
+            as parameters, or single iterable.
+
+        Returns
+        -------
+        logpmf : list of ndarrays
+            List of 1D arrays of log probability of observing sample n.
+
+        See class docstring for more specific information on this distribution.
+        '''
+        # By default, take the log of the pmf. Derived classes override this
+        # method to calculate the logpmf directly.
+        with np.errstate(divide='ignore'):
+            return [np.log(tpmf) for tpmf in self.pmf(n)]
+
+    def logpdf(self, n):
+        '''
+        Log of the probability density function.
+
+        Parameters
+        ----------
+        n : int, float or array-like object
+            Values at which to calculate logpdf. May be a list of same length
+            as parameters, or single iterable.
+
+        Returns
+        -------
+        logpdf : list of ndarrays
+            List of 1D arrays of log probability of observing sample n.
+
+        See class docstring for more specific information on this distribution.
+        '''
+        with np.errstate(divide='ignore'):
+            return [np.log(tpdf) for tpdf in self.pdf(n)]
+
 
     def cdf(self, n):
         '''
@@ -460,26 +589,70 @@ class Distribution(object):
         # Expand n argument if needed, assumes all params same length
         n = expand_n(n, len(self.params.values()[0]))
 
-        # Calculate pmfs
-        max_n = [np.max(tn) for tn in n]
-        n_in = [np.arange(self.min_supp, i + 1) for i in max_n]
-
-        # Extend for pdf or pmf
-        try:
-            pmf_list = self.pdf(n_in)
-
-        except(NotImplementedError):
-            pmf_list = self.pmf(n_in)
+        # Look up cdfs in cumulative table, extended to max n if needed
+        n = [np.asarray(tn).astype(int) - self.min_supp for tn in n]
+        max_n = [np.max(tn) + 1 if len(tn) else 0 for tn in n]
+        table = self._cum_table(max_n)
 
-        # Calculate cdfs
         cdf = []
-        for tpmf, tn in zip(pmf_list, n):
-            full_cdf = np.cumsum(tpmf)
-            tcdf = np.array([full_cdf[x - self.min_supp] for x in tn])
+        for ttable, tn in zip(table, n):
+            tcdf = np.zeros(len(tn))
+            tcdf[tn >= 0] = ttable[tn[tn >= 0]]
             cdf.append(tcdf)
 
         return cdf 
 
+    def _cum_table(self, lengths):
+        '''
+        Returns the cumulative pmf (or pdf) from min_supp for each parameter
+        set, with at least lengths[i] elements for parameter set i.
+
+        Tables are kept between calls and extended by doubling their length
+        when longer tables are needed. Tables longer than _CUM_TABLE_MAX are
+        not kept. Unless the distribution is frozen, tables are discarded when
+        params change.
+        '''
+        if self.frozen:
+            key = None
+        else:
+            key = _params_key(self.params)
+
+        stored = getattr(self, '_cum_tables', None)
+        if stored is None or stored[0] != key or len(stored[1]) != \
+                                                                len(lengths):
+            tables = [np.array([]) for i in xrange(len(lengths))]
+        else:
+            tables = list(stored[1])
+
+        cur = [len(ttable) for ttable in tables]
+        grow = [tlength > tcur for tlength, tcur in zip(lengths, cur)]
+
+        if np.any(grow):
+            new = [max(tlength, 2 * tcur) if tgrow else tcur for tlength,
+                                        tcur, tgrow in zip(lengths, cur, grow)]
+
+            # Parameter sets that are not extended get a placeholder
+            n_in = [np.arange(self.min_supp + tcur, self.min_supp + tnew) if
+                    tgrow else np.array([self.min_supp]) for tcur, tnew, tgrow
+                    in zip(cur, new, grow)]
+
+            # Extend for pdf or pmf
+            try:
+                pmf_list = self.pdf(n_in)
+            except(NotImplementedError):
+                pmf_list = self.pmf(n_in)
+
+            # Continue the running sum so values equal a single cumsum
+            for i in np.where(grow)[0]:
+                last = tables[i][-1:]
+                tcum = np.cumsum(np.concatenate((last, pmf_list[i])))
+                tables[i] = np.concatenate((tables[i], tcum[len(last):]))
+
+        self._cum_tables = (key, [ttable if len(ttable) <= _CUM_TABLE_MAX else
+                np.array([]) for ttable in tables])
+
+        return tables
+
 
     def rad(self):
         '''
@@ -496,13 +669,8 @@ class Distribution(object):
         # Get parameters
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
 
-        # TODO: Add error or warning if tot_obs is large enough that python is slow
-        # FIX: Throw warning that tot_obs is large and that calculation will take
-        # awhile.  tot_obs > 100,000. Base CDF should thrown the same warning. 
-
-        # Calculate pmfs, going up to tot_obs for upper limit
-        n_arrays = [np.arange(self.min_supp, 1*(i + 1)) for i in tot_obs]
-        pmf = self.pmf(n_arrays)
+        # Calculate pmfs, going up to tot_obs at most
+        pmf = self._support_pmf(tot_obs)
         
         # Calculate rad
         rad = []
@@ -513,7 +681,205 @@ class Distribution(object):
         return rad
 
 
-    def fit(self, data):
+    def _support_pmf(self, tot_obs, eps=1e-12, block=1024):
+        '''
+        Evaluates the pmf from min_supp up to at most tot_obs for each
+        parameter set, in blocks of doubling size, stopping once the
+        cumulative probability reaches 1 - eps.
+
+        Parameters
+        ----------
+        tot_obs : array-like
+            Upper limit of support for each parameter set
+        eps : float
+            Probability mass in the upper tail that may be left out
+        block : int
+            Length of the first block
+
+        Returns
+        -------
+        : list of ndarrays
+            Pmf over the truncated support of each parameter set
+
+        '''
+        num = len(tot_obs)
+        pieces = [[] for i in xrange(num)]
+        start = np.repeat(self.min_supp, num)
+        cum = np.zeros(num)
+        active = np.array([self.min_supp < ttot_obs + 1 for ttot_obs in
+                                                                    tot_obs])
+        size = block
+
+        while np.any(active):
+            # Finished parameter sets get a placeholder that is discarded
+            n_in = [np.arange(start[i], min(start[i] + size, tot_obs[i] + 1))
+                    if active[i] else np.array([self.min_supp]) for i in
+                    xrange(num)]
+            pmf = self.pmf(n_in)
+
+            for i in np.where(active)[0]:
+                tpmf = np.asarray(pmf[i], dtype=float)
+                pieces[i].append(tpmf)
+                cum[i] += np.sum(tpmf)
+                start[i] += size
+                if start[i] >= tot_obs[i] + 1 or cum[i] >= 1 - eps:
+                    active[i] = False
+            size *= 2
+
+        return [np.concatenate(tpieces) if tpieces else np.array([]) for
+                                                            tpieces in pieces]
+
+    def rvs(self, size=1, random_state=None):
+        '''
+        Random variates method.
+
+        Parameters
+        ----------
+        size : int or tuple
+            Shape of the variates drawn for each parameter set
+        random_state : None, int or np.random.RandomState
+            Source of random numbers. None uses numpy's global RandomState
+            and an int seeds a new RandomState.
+
+        Returns
+        -------
+        rvs : list of ndarrays
+            List of arrays of random variates, one for each parameter set
+
+        Notes
+        -----
+        By default, the cumulative pmf is inverted with np.searchsorted. The
+        support ends at tot_obs if upper_trunc is True, and otherwise at
+        _RVS_SUPPORT_MAX or where the upper tail has less than 1e-12
+        probability, so that variates follow cdf. The cdf tables are kept
+        between calls, and are discarded when params change unless the
+        distribution is frozen.
+        Distributions with standard numpy generators or a closed form inverse
+        cdf override this method.
+
+        See class docstring for more specific information on this distribution.
+        '''
+        random_state = _random_state(random_state)
+        tables = self._rvs_tables()
+
+        rvs = []
+        for ttable in tables:
+            u = random_state.random_sample(size) * ttable[-1]
+            rvs.append(np.searchsorted(ttable, u, side='right') +
+                                                                self.min_supp)
+        return rvs
+
+    def _rvs_tables(self):
+        '''
+        Returns the cdf over the truncated support of the pmf for each
+        parameter set, for rvs. See _cum_table for how tables are kept.
+        '''
+        if self.frozen:
+            key = None
+        else:
+            key = _params_key(self.params)
+
+        stored = getattr(self, '_rvs_cache', None)
+        if stored is not None and stored[0] == key:
+            return stored[1]
+
+        if self.upper_trunc:
+            upper = self.get_params(['tot_obs'])[0]
+        else:
+            upper = np.repeat(_RVS_SUPPORT_MAX, len(make_array(
+                                                  self.params.values()[0])))
+        try:
+            tables = [np.cumsum(tpmf) for tpmf in self._support_pmf(upper)]
+        except NotImplementedError:
+            raise NotImplementedError('rvs is not implemented for %s' %
+                                                    self.__class__.__name__)
+        self._rvs_cache = (key, tables)
+        return tables
+
+    def loglik(self, data, freq=False):
+        '''
+        Log-likelihood of data, with the logpmf (or logpdf) evaluated only at
+        the unique values of each data set.
+
+        Parameters
+        ----------
+        data : list of ndarrays or list of tuples
+            One data array for each parameter set. If freq is True, each
+            element is instead a frequency table of (values, counts), eg, from
+            freq_table.
+        freq : bool
+            If True, data is a list of frequency tables.
+
+        Returns
+        -------
+        : ndarray
+            Log-likelihood of each data set
+
+        '''
+        tables = _freq_tables(data, freq)
+        values = [tvalues for tvalues, tcounts in tables]
+
+        try:
+            logp = self.logpmf(values)
+        except NotImplementedError:
+            logp = self.logpdf(values)
+
+        return np.array([np.sum(tcounts * tlogp) for (tvalues, tcounts), tlogp
+                                                        in zip(tables, logp)])
+
+    def p_absent(self, tot_obs, a):
+        '''
+        Probability that a species is absent from a cell, ie, pmf(0) with
+        n_samp = 1 / a.
+
+        Parameters
+        ----------
+        tot_obs : int, float or array-like object
+            Abundance of each species in the total area
+        a : float or array-like object
+            Ratio of cell area to total area, broadcast against tot_obs
+
+        Returns
+        -------
+        : ndarray
+            Probability of absence for each abundance
+
+        Notes
+        -----
+        Parameters other than tot_obs and n_samp, eg, k, are taken from
+        params. SSADs override this method with a closed form; this default
+        calls pmf.
+
+        '''
+        tot_obs, a = _abund_area(tot_obs, a)
+        return np.array([tpmf[0] for tpmf in
+                         self._at_area(tot_obs, a).pmf(0)])
+
+    def p_all(self, tot_obs, a):
+        '''
+        Probability that all individuals of a species are in a cell, ie,
+        pmf(tot_obs) with n_samp = 1 / a. See p_absent.
+        '''
+        tot_obs, a = _abund_area(tot_obs, a)
+        return np.array([tpmf[0] for tpmf in
+                         self._at_area(tot_obs, a).pmf(zip(tot_obs))])
+
+    def _at_area(self, tot_obs, a):
+        '''Returns a copy with one parameter set for each abundance.'''
+        return self._with_params(tot_obs=tot_obs, n_samp=1 / a)
+
+    def _with_params(self, **kwargs):
+        '''
+        Returns a shallow copy with kwargs replacing params, leaving this
+        object unchanged.
+        '''
+        dist = copy(self)
+        dist.params = dict(self.params, **kwargs)
+        dist.var = {}
+        dist._state = None
+        return dist
+
+    def fit(self, data, freq=False):
         '''
         Fit method.
 
@@ -525,6 +891,9 @@ class Distribution(object):
         data : list of ndarrays
             Data to use to fit parameters of distribution. Even if only one 
             data array, must be in a list with one element.
+        freq : bool
+            If True, data is a list of frequency tables of (values, counts),
+            eg, from freq_table.
 
         See class docstring for more specific information on this distribution.
         '''
@@ -532,10 +901,14 @@ class Distribution(object):
         # By default, loop through ndarrays in data and extract n_samp
         # and tot_obs for each one.
 
-        data = check_list_of_iterables(data) 
+        if freq:
+            tables = _freq_tables(data, freq)
+            data = [tvalues[tcounts > 0] for tvalues, tcounts in tables]
+        else:
+            data = check_list_of_iterables(data) 
         
         # Check if distribution can support the fitted data
-        num_zeros = np.array([sum(dt == 0) for dt in data])
+        num_zeros = np.array([np.sum(dt == 0) for dt in data])
         if np.any(num_zeros != 0) and self.min_supp == 1:
             raise ValueError('%s does not support data with zeros' %
                                                     self.__class__.__name__)
@@ -543,9 +916,14 @@ class Distribution(object):
         n_samp = []
         tot_obs = []
         
-        for tdata in data:
-            n_samp.append(len(tdata))
-            tot_obs.append(np.sum(tdata))
+        if freq:
+            for tvalues, tcounts in tables:
+                n_samp.append(np.sum(tcounts))
+                tot_obs.append(np.sum(tvalues * tcounts))
+        else:
+            for tdata in data:
+                n_samp.append(len(tdata))
+                tot_obs.append(np.sum(tdata))
 
         self.params['n_samp'] = n_samp
         self.params['tot_obs'] = tot_obs
@@ -596,6 +974,68 @@ class Distribution(object):
 
         return tuple(retrieved_params)
 
+    def freeze(self):
+        '''
+        Returns an immutable copy of this distribution in which internal
+        parameters, such as Lagrange multipliers and normalizing constants,
+        are solved once and stored in var.
+
+        Returns
+        -------
+        : Distribution
+            Frozen copy. Its params cannot be changed, so methods such as fit
+            raise a TypeError, and pmf, cdf and rad reuse the stored solution.
+
+        '''
+        frozen = deepcopy(self)
+
+        params = {}
+        for kw, value in frozen.params.iteritems():
+            value = np.array(make_array(value))
+            value.flags.writeable = False
+            params[kw] = value
+        frozen.params = _FrozenDict(params)
+
+        frozen._state = frozen._solve()
+        frozen.var.update(frozen._state)
+        return frozen
+
+    @property
+    def frozen(self):
+        '''True if this distribution was created by freeze.'''
+        return isinstance(self.params, _FrozenDict)
+
+    def _solve(self):
+        '''
+        Returns a dict of internal parameters that depend only on params, one
+        array element per parameter set. Distributions that solve for
+        internal parameters override this method.
+        '''
+        return {}
+
+    def _solved(self):
+        '''
+        Returns the internal parameters from _solve, which are stored when
+        the distribution is frozen and recalculated otherwise. The result is
+        also copied into var.
+        '''
+        state = getattr(self, '_state', None)
+        if state is None:
+            state = self._solve()
+            self.var.update(state)
+        return state
+
+def _params_key(params):
+    '''Makes a key from params that changes when any parameter changes.'''
+    key = []
+    for kw in sorted(params.iterkeys()):
+        value = params[kw]
+        if isinstance(value, np.ndarray):
+            key.append((kw, value.dtype.str, value.shape, value.tostring()))
+        else:
+            key.append((kw, repr(value)))
+    return tuple(key)
+
 class DownscaleError(Exception):
     '''Catch downscale errors'''
     def __init__(self, value=None):
@@ -604,6 +1044,20 @@ class DownscaleError(Exception):
     def __str__(self):
         return '%s' % self.value
 
+class _FrozenDict(dict):
+    '''Dictionary that cannot be changed, used for frozen params.'''
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('Parameters of a frozen distribution cannot be ' +
+                        'changed')
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = \
+                                                    update = _immutable
+
+    def __deepcopy__(self, memo):
+        return _FrozenDict(deepcopy(dict(self), memo))
+
+    def __reduce__(self):
+        return (_FrozenDict, (dict(self),))
+
 
 # ----------------------------------------------------------------------------
 # Distributions
@@ -634,6 +1088,7 @@ class most_even(Distribution):
         
         self.params = kwargs
         self.min_supp = 1
+        self.upper_trunc = True
         self.par_num = 2
         self.var = {}
 
@@ -696,6 +1151,7 @@ class most_uneven(Distribution):
         
         self.params = kwargs
         self.min_supp = 1
+        self.upper_trunc = True
         self.par_num = 2
         self.var = {}
 
@@ -778,75 +1234,54 @@ class logser(Distribution):
         self.par_num = 1
         self.var = {}
     
-    @doc_inherit
-    def pmf(self, n):
-        
+    def _solve(self):
+
         # Get parameters
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
-        n = expand_n(n, len(n_samp))
-        
+
         # TODO: Additional checks?
         assert np.all(n_samp <= tot_obs), 'n_samp must be <= tot_obs'
-        
-        # Calculate pmf
+
         stop = 1 - 1e-10
         start = -2
         eq = lambda x, n_samp, tot_obs: (((tot_obs/x) - tot_obs) * 
                                                 (-(np.log(1 - x)))) - n_samp
 
-        pmf = []
-        self.var['p'] = []
+        # Solve for all parameter sets at once
+        p = _memo_solve('logser', lambda n_samp, tot_obs: batch_solver(eq,
+                        start, stop, args=(n_samp, tot_obs)), n_samp, tot_obs)
+        _check_roots(p, self.__class__.__name__, tot_obs, n_samp)
 
-        for tn_samp, ttot_obs, tn in zip(n_samp, tot_obs, n):
-            # Catching cryptic brentq error
-            try:
-                tp = scipy.optimize.brentq(eq, start, stop, 
-                                            args=(tn_samp,ttot_obs), disp=True)
-            except(ValueError):
-                raise ValueError("No solution to %s.pmf when tot_obs = %.2f"\
-                                  % (self.__class__.__name__, ttot_obs) + 
-                                  " and n_samp = %.2f" % (tn_samp)) 
-            tpmf = stats.logser.pmf(tn, tp)
-            self.var['p'].append(tp)
-            pmf.append(tpmf)
+        return {'p': p}
+    
+    @doc_inherit
+    def pmf(self, n):
         
-        self.var['p'] = np.array(self.var['p'])
+        n = expand_n(n, len(self.get_params(['n_samp'])[0]))
+        p = self._solved()['p']
+
+        # Calculate pmf
+        pmf = [stats.logser.pmf(tn, tp) for tp, tn in zip(p, n)]
         return pmf
 
     @doc_inherit
-    def cdf(self, n):
-        
-        # Get parameters
-        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
-        n = expand_n(n, len(n_samp))
-        
-        # TODO: Additional checks?
-        assert np.all(n_samp <= tot_obs), 'n_samp must be <= tot_obs'
+    def logpmf(self, n):
         
-        # Calculate pmf
-        stop = 1 - 1e-10
-        start = -2
-        eq = lambda x, n_samp, tot_obs: (((tot_obs/x) - tot_obs) * 
-                                                (-(np.log(1 - x)))) - n_samp
+        n = expand_n(n, len(self.get_params(['n_samp'])[0]))
+        p = self._solved()['p']
 
-        cdf = []
-        self.var['p'] = []
+        # Calculate logpmf
+        logpmf = [stats.logser.logpmf(tn, tp) for tp, tn in zip(p, n)]
+        return logpmf
 
-        for tn_samp, ttot_obs, tn in zip(n_samp, tot_obs, n):
-            # Catching cryptic brentq error
-            try:
-                tp = scipy.optimize.brentq(eq, start, stop, 
-                                            args=(tn_samp,ttot_obs), disp=True)
-            except(ValueError):
-                raise ValueError("No solution to %s.cdf when tot_obs = %.2f"\
-                                  % (self.__class__.__name__, ttot_obs) + 
-                                  " and n_samp = %.2f" % (tn_samp)) 
-            tcdf = stats.logser.cdf(tn, tp)
-            self.var['p'].append(tp)
-            cdf.append(tcdf)
-   
-        self.var['p'] = np.array(self.var['p'])
+    @doc_inherit
+    def cdf(self, n):
+        
+        n = expand_n(n, len(self.get_params(['n_samp'])[0]))
+        p = self._solved()['p']
 
+        # Calculate cdf
+        cdf = [stats.logser.cdf(tn, tp) for tp, tn in zip(p, n)]
         return cdf
 
 class logser_ut(Distribution):
@@ -880,63 +1315,82 @@ class logser_ut(Distribution):
     stop value of the brentq optimizer is 2.
 
     The total species (S) is equivalent to n_samp and the total
-    individuals (N) is equivalent to tot_obs.
+    individuals (N) is equivalent to tot_obs. n_samp and tot_obs may instead
+    be given as a METEState with the keyword state.
     '''
     
     @doc_inherit
     def __init__(self, **kwargs):
         self.params = kwargs
+        _set_state(self)
         self.min_supp = 1
+        self.upper_trunc = True
         self.par_num = 2 # This is highly contested
         self.var = {}
 
-    @doc_inherit    
-    def pmf(self, n):
+    def _solve(self):
 
         # Get parameters
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
-        n = expand_n(n, len(n_samp))
         
         # TODO: Additional checks?
         assert np.all(n_samp <= tot_obs), 'n_samp must be <= tot_obs'
-        
 
-        # Calculate pmf
-        start = 0.3
-        stop = 2
-        flmax = sys.float_info[0]
+        # If n_samp = tot_obs, e**-beta = 0
+        state = _get_state(self, n_samp, tot_obs)
+        _check_roots(state.x, self.__class__.__name__, tot_obs, n_samp)
+
+        return {'x': state.x, 'norm': state.logser_norm}
+
+    @doc_inherit    
+    def pmf(self, n):
+
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+        state = self._solved()
 
         pmf = []
-        self.var['x'] = []
 
-        for tn_samp, ttot_obs, tn in zip(n_samp, tot_obs, n):
+        for tn_samp, ttot_obs, tn, tx, tnorm in zip(n_samp, tot_obs, n, 
+                                                   state['x'], state['norm']):
 
             # If n_samp = tot_obs, return 1 for n = 1 and 0 otherwise 
-            # (e**-beta = 0)
             if tn_samp == ttot_obs:
                 tpmf = np.zeros(len(tn))
                 tpmf[tn == 1] = 1
-                tx = 0
 
             else:
-                k = np.linspace(1, ttot_obs, num=ttot_obs)
-                try:
-                    tx = scipy.optimize.brentq(beta_solver, start,
-                               min((flmax/tn_samp)**(1/float(ttot_obs)), stop), 
-                               args = (k, ttot_obs, tn_samp), disp=True)
-                except(ValueError):
-                    raise ValueError("No solution to %s.pmf when tot_obs = "
-                                  % (self.__class__.__name__) + 
-                                  "%.2f and n_samp = %.2f" % (ttot_obs, tn_samp))
-                tnorm = np.sum(tx ** k / k)
                 tpmf = (tx ** tn / tn) / tnorm
 
-            self.var['x'].append(tx)
             pmf.append(tpmf)
    
-        self.var['x'] = np.array(self.var['x'])
         return pmf
 
+    @doc_inherit
+    def logpmf(self, n):
+
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+        state = self._solved()
+
+        logpmf = []
+
+        for tn_samp, ttot_obs, tn, tx, tnorm in zip(n_samp, tot_obs, n, 
+                                                   state['x'], state['norm']):
+
+            if tn_samp == ttot_obs:
+                tlogpmf = np.repeat(-np.inf, len(tn))
+                tlogpmf[tn == 1] = 0
+
+            else:
+                tlogpmf = tn * np.log(tx) - np.log(tn) - np.log(tnorm)
+
+            logpmf.append(tlogpmf)
+
+        return logpmf
+
     # TODO: Add exact cdf from JK dissertation
 
 
@@ -985,71 +1439,104 @@ class logser_ut_appx(Distribution):
     def __init__(self, **kwargs):
         self.params = kwargs
         self.min_supp = 1
+        self.upper_trunc = True
         self.par_num = 2 # This is highly contested
         self.var = {}
     
-    @doc_inherit
-    def pmf(self, n):
+    def _solve(self):
         
         # Multiple roots. root = 2 makes it a logseries
         root = 2
 
         # Get parameters
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
-        n = expand_n(n, len(n_samp))
 
         # TODO: Additional Checks
         assert np.all(n_samp <= tot_obs), 'n_samp must be <= tot_obs'
 
-        # Calculate pmf
+        # Solve for x
         start = 0.3
         stop = 1 - 1e-10
-        eq = lambda x, n_samp, tot_obs: (((-m.log(x))*(m.log(-1/(m.log(x))))) - 
-                                                       (float(n_samp)/tot_obs))
+        eq = lambda x, n_samp, tot_obs: (((-np.log(x))*(np.log(-1/(np.log(x)))))
+                                                      - (n_samp / tot_obs))
+
+        def solve(n_samp, tot_obs):
+
+            # Try normal root finder for all parameter sets at once. Will
+            # fail where there are two roots.
+            x = batch_solver(eq, start, stop, args=(n_samp, tot_obs))
+
+            # Where that fails, pick a root on either side of the maximum of
+            # eq, which is at x = exp(-1/e)
+            two_roots = np.isnan(x)
+            if np.any(two_roots):
+                xmax = np.exp(-1 / np.e)
+                ymax = eq(xmax, n_samp[two_roots], tot_obs[two_roots])
+                if root == 1:
+                    tx = batch_solver(eq, start, xmax, args=(
+                                   n_samp[two_roots], tot_obs[two_roots]))
+                if root == 2:
+                    tx = batch_solver(eq, xmax, stop, args=(
+                                   n_samp[two_roots], tot_obs[two_roots]))
+                tx[ymax < 0] = np.nan
+                x[two_roots] = tx
+            return x
+
+        # TODO: What if tot_obs = n_samp? 
+        x = np.zeros(len(n_samp))
+        solve_ind = n_samp != tot_obs
+        x[solve_ind] = _memo_solve('logser_ut_appx_%i' % root, solve,
+                                   n_samp[solve_ind], tot_obs[solve_ind])
+        _check_roots(x, self.__class__.__name__, tot_obs, n_samp)
+
+        return {'x': x}
+
+    @doc_inherit
+    def pmf(self, n):
+
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+        x = self._solved()['x']
+
         pmf = []
-        self.var['x'] = []
 
-        for tn_samp, ttot_obs, tn in zip(n_samp, tot_obs, n):
+        for tn_samp, ttot_obs, tn, tx in zip(n_samp, tot_obs, n, x):
             
-            # TODO: What if tot_obs = n_samp? 
             if tn_samp == ttot_obs:
                 tpmf = np.zeros(len(tn))
                 tpmf[tn == 1] = 1
-                tx = 0
             else:
-                # Try normal root finder. Will fail if two roots
-                try:
-                    tx = scipy.optimize.brentq(eq, start, stop, 
-                                            args=(tn_samp, ttot_obs),disp=True)
-
-                # If that fails, try a more complex decision tree
-                except ValueError:
-                    eq1 = lambda x: -1 * eq(x, tn_samp, ttot_obs)
-                    xmax = scipy.optimize.fmin(eq1, .5, disp=0)[0]
-                    ymax = eq(xmax, tn_samp, ttot_obs)
-                    if ymax > 0:
-                        if root == 1:
-                            tx = scipy.optimize.brentq(eq, start, xmax,
-                                           args=(tn_samp, ttot_obs), disp=True)
-                        if root == 2:
-                            tx = scipy.optimize.brentq(eq, xmax, stop, 
-                                           args=(tn_samp, ttot_obs), disp=True)
-                    if ymax < 0:
-                        raise ValueError('No solution to ' +
-                            ' %s.pmf' % (self.__class__.__name__) +
-                            ' when tot_obs = %.2f and n_samp = %.2f ' % 
-                            (ttot_obs, tn_samp)) 
-
                 g = -1/np.log(tx)
                 tpmf = (1/np.log(g)) * ((tx**tn)/tn)
 
-            self.var['x'].append(tx)
             pmf.append(tpmf)
 
-        self.var['x'] = np.array(self.var['x'])
-
         return pmf
 
+    @doc_inherit
+    def logpmf(self, n):
+
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+        x = self._solved()['x']
+
+        logpmf = []
+
+        for tn_samp, ttot_obs, tn, tx in zip(n_samp, tot_obs, n, x):
+            
+            if tn_samp == ttot_obs:
+                tlogpmf = np.repeat(-np.inf, len(tn))
+                tlogpmf[tn == 1] = 0
+            else:
+                g = -1/np.log(tx)
+                tlogpmf = tn * np.log(tx) - np.log(tn) - np.log(np.log(g))
+
+            logpmf.append(tlogpmf)
+
+        return logpmf
+
 
 class plognorm(Distribution):
     __doc__ = Distribution.__doc__ + \
@@ -1073,9 +1560,11 @@ class plognorm(Distribution):
         The mu parameter of the poisson log normal
     sigma : float or iterable
         The sigma parameter of the poisson log normal
+    mu_se, sigma_se : np.array
+        Standard errors of mu and sigma
 
     These parameters are stored in var as well as params if they are calculated
-    with the fit method.
+    with the fit method. Standard errors are only stored by the fit method.
 
     Notes
     -----
@@ -1084,6 +1573,11 @@ class plognorm(Distribution):
     function was adapted from Ethan White's pln_solver function in 
     weecology.
 
+    The pmf for all abundances and parameter sets is calculated at once with
+    fixed quadrature nodes centered on the mode of the integrand (see
+    _pln_logpmf). The fit method uses the derivatives of the log pmf from the
+    same nodes.
+
     The total species (S) is equivalent to n_samp and the total
     individuals (N) is equivalent to tot_obs.
     '''
@@ -1129,54 +1623,69 @@ class plognorm(Distribution):
         See class docstring for more specific information on this distribution.
         '''
 
-        # Get parameters
-        mu, sigma = self.get_params(['mu', 'sigma'])
-        n = expand_n(n, len(mu))
+        return [np.exp(tlogpmf) for tlogpmf in self.logpmf(n)]
 
-        n_uniq = [np.unique(tn) for tn in n]  # Speed up by calc for uniq vals
+    # @doc_inherit cannot be used here because of derived plognorm_lt
+    def logpmf(self, n):
+        '''
+        Log of the probability mass function.
 
-        # Calculate pmf, no intermediate vars
-        pmf = []
+        Parameters
+        ----------
+        n : int, float or array-like object
+            Values at which to calculate logpmf. May be a list of same length
+            as parameters, or single iterable.
 
-        eq = lambda t,x,mu,sigma: np.exp(t*x - np.exp(t) - 0.5*((t-mu) / 
-                                                                sigma)**2)
+        Returns
+        -------
+        logpmf : list of ndarrays
+            List of 1D arrays of log probability of observing sample n.
 
-        for tmu, tsigma, tn_uniq, tn in zip(mu, sigma, n_uniq, n):
-            
-            # If mu negative, pmf 0
-            if tmu <= 0 or tsigma <= 0:
-                tpmf_uniq = np.repeat(1e-120, len(tn_uniq))
+        See class docstring for more specific information on this distribution.
+        '''
 
-            # Calculate unique pmf values
-            else:
-                # TODO: Throwing overflow warning but not affecting result
-                tpmf_uniq = np.empty(len(tn_uniq), dtype=np.float)
-                for i, g in enumerate(tn_uniq):
-                    if g <= 170:
-                        integ = integrate.quad(eq, -np.inf, np.inf, 
-                                               args=(g,tmu,tsigma))[0]
-                        norm = np.exp(-0.5 * m.log(2 * m.pi * tsigma**2) -
-                                                m.lgamma(g + 1))
-                        tpmf_uniq[i] = norm * integ
-                    else:
-                        z = (m.log(g) - tmu) / tsigma
-                        tpmf_uniq[i] = ((1 + (z**2 + m.log(g) - tmu - 1) /
-                                   (2 * g * tsigma**2)) * np.exp(-0.5 * z**2) /
-                                    (m.sqrt(2 * m.pi) * tsigma * g))
+        # Get parameters
+        mu, sigma = self.get_params(['mu', 'sigma'])
+        n = expand_n(n, len(mu))
 
-            # Expand to full pmf
-            tpmf = np.empty(len(tn))
-            for i, g in enumerate(tn_uniq):
-                tpmf[np.where(tn == g)[0]] = tpmf_uniq[i]
+        # Speed up by calc for uniq vals. If mu or sigma negative, pmf 0.
+        n_uniq = [np.unique(tn, return_inverse=True) for tn in n]
+        valid = (mu > 0) & (sigma > 0)
+        lens = [len(tn_uniq) if tvalid else 0 for (tn_uniq, tinv), tvalid in
+                                                        zip(n_uniq, valid)]
 
-            pmf.append(tpmf)
+        # Calculate logpmf for all parameter sets at once
+        all_uniq = np.concatenate([tn_uniq[:tlen] for (tn_uniq, tinv), tlen
+                                   in zip(n_uniq, lens)])
+        all_logpmf = _pln_logpmf(all_uniq, np.repeat(mu, lens),
+                                 np.repeat(sigma, lens))
+        logpmf_uniq = np.split(all_logpmf, np.cumsum(lens)[:-1])
 
-        return pmf
+        logpmf = []
+        for tvalid, (tn_uniq, tinv), tlogpmf_uniq in zip(valid, n_uniq,
+                                                                logpmf_uniq):
+            if not tvalid:
+                tlogpmf_uniq = np.repeat(np.log(1e-120), len(tn_uniq))
+
+            # Expand to full logpmf
+            logpmf.append(tlogpmf_uniq[tinv])
+
+        return logpmf
 
     # TODO: Is there a known cdf?
+
+    def _loglik_grad(self, table, mu, sigma):
+        '''
+        Log-likelihood of a frequency table and its gradient with respect to
+        mu and sigma.
+        '''
+        values, counts = table
+        logpmf, (dmu, dsigma) = _pln_logpmf(values, mu, sigma, grad=True)
+        return (np.sum(counts * logpmf), np.array([np.sum(counts * dmu),
+                                                   np.sum(counts * dsigma)]))
     
     # @doc_inherit cannot be used here because of derived plognorm_lt
-    def fit(self, data):
+    def fit(self, data, freq=False):
         '''
         Fit method.
 
@@ -1188,37 +1697,52 @@ class plognorm(Distribution):
         data : list of ndarrays
             Data to use to fit parameters of distribution. Even if only one 
             data array, must be in a list with one element.
+        freq : bool
+            If True, data is a list of frequency tables of (values, counts),
+            eg, from freq_table.
 
         See class docstring for more specific information on this distribution.
         '''
 
-        super(plognorm, self).fit(data)
-        data = check_list_of_iterables(data)
+        super(plognorm, self).fit(data, freq)
+
+        # Likelihood is evaluated on unique values only
+        tables = _freq_tables(data, freq)
 
         # Calculate and store parameters
         temp_mu = []
         temp_sigma = []
+        temp_se = []
+        prev = None
 
-        for tdata in data:
-            mu0 = np.mean(np.log(tdata))  # Starting guesses for mu and sigma
-            sigma0 = np.std(np.log(tdata), ddof=1)
-            
-            # TODO: Can we do this without setting the self.params? Make
-            # another plognorm inside?
-            def pln_func(x):
-                self.params['mu'] = x[0]
-                self.params['sigma'] = x[1]
-                return -sum(np.log(self.pmf(tdata)[0]))
+        for table, tn_samp in zip(tables, self.params['n_samp']):
 
-            mu, sigma = scipy.optimize.fmin(pln_func, x0=[mu0, sigma0],
-                                            disp=0)
-            temp_mu.append(mu)
-            temp_sigma.append(sigma)
+            # Starting guesses for mu and sigma
+            logn, counts = np.log(table[0]), table[1]
+            mu0 = np.sum(counts * logn) / tn_samp
+            ss = np.sum(counts * (logn - mu0) ** 2)
+            sigma0 = np.sqrt(ss / (tn_samp - 1))
 
+            def pln_func(x):
+                loglik, grad = self._loglik_grad(table, x[0], x[1])
+                return -loglik, -grad
+
+            # pmf is zero for mu or sigma <= 0, so both are bounded. Starts
+            # from the previous solution if it is better than the guess.
+            x, se = _mle(pln_func, [[mu0, sigma0], prev], bounds=[(1e-10,
+                                                        None), (1e-10, None)])
+            prev = x
+            temp_mu.append(x[0])
+            temp_sigma.append(x[1])
+            temp_se.append(se)
+
+        temp_se = np.array(temp_se)
         self.params['mu'] = np.array(temp_mu)
         self.params['sigma'] = np.array(temp_sigma)
         self.var['mu'] = np.array(temp_mu)
         self.var['sigma'] = np.array(temp_sigma)
+        self.var['mu_se'] = temp_se[:, 0]
+        self.var['sigma_se'] = temp_se[:, 1]
 
         return self
 
@@ -1245,9 +1769,11 @@ class plognorm_lt(plognorm):
         The mu parameter of the poisson log normal
     sigma : float or iterable
         The sigma parameter of the poisson log normal
+    mu_se, sigma_se : np.array
+        Standard errors of mu and sigma
 
     These parameters are stored in var as well as params if they are calculated
-    with the fit method.
+    with the fit method. Standard errors are only stored by the fit method.
 
     Notes
     -----
@@ -1318,6 +1844,55 @@ class plognorm_lt(plognorm):
 
         return trunc_pmf 
 
+    # @doc_inherit cannot be used here because class is derived from plognorm
+    def logpmf(self, n):
+        '''
+        Log of the probability mass function.
+
+        Parameters
+        ----------
+        n : int, float or array-like object
+            Values at which to calculate logpmf. May be a list of same length
+            as parameters, or single iterable.
+
+        Returns
+        -------
+        logpmf : list of ndarrays
+            List of 1D arrays of log probability of observing sample n.
+
+        See class docstring for more specific information on this distribution.
+        '''
+
+        # Get parameters
+        mu, sigma = self.get_params(['mu', 'sigma'])
+
+        # Calculate logpmf, using plognorm as aid
+        reg_plog = plognorm(mu=mu, sigma=sigma)
+        reg_logpmf = reg_plog.logpmf(n)
+        reg_pmf0 = reg_plog.pmf(0)
+        self.var = reg_plog.var
+
+        trunc_logpmf = [(lpr - np.log1p(-p0)) for lpr, p0 in zip(reg_logpmf,
+                                                                 reg_pmf0)]
+
+        return trunc_logpmf
+
+    def _loglik_grad(self, table, mu, sigma):
+        '''
+        Log-likelihood of a frequency table and its gradient with respect to
+        mu and sigma.
+        '''
+        loglik, grad = super(plognorm_lt, self)._loglik_grad(table, mu, sigma)
+
+        # Truncation adds -log(1 - pmf(0)) for each observation
+        logp0, grad0 = _pln_logpmf(0, mu, sigma, grad=True)
+        p0 = np.exp(logp0)
+        S = np.sum(table[1])
+        loglik -= S * np.log1p(-p0)
+        grad += S * p0 / (1 - p0) * np.array(grad0)
+
+        return loglik, grad
+
     # TODO: Write cdf method based on cdf of plognorm, similar to above
 
 
@@ -1346,6 +1921,8 @@ class lognorm(Distribution):
         np.log(tot_obs / n_samp) - (sigma**2 / 2).
     sigma : list of float
         The sigma parameter of the log normal
+    sigma_se : list of floats
+        Standard error of the sigma parameter calculated in fit
 
     Notes
     -----
@@ -1385,6 +1962,26 @@ class lognorm(Distribution):
 
         return pmf
 
+    @doc_inherit  
+    def logpmf(self, n):
+
+        # Get parameters
+        tot_obs, n_samp, sigma = self.get_params(['tot_obs','n_samp','sigma'])
+        n = expand_n(n, len(sigma))
+        
+        # Calculate mu
+        mu = np.log(tot_obs / n_samp) - (sigma**2 / 2)
+        self.var['mu'] = mu
+        self.var['sigma'] = sigma
+
+        # Calculate logpmf
+        logpmf = []
+        for tmu, tsigma, tn in zip(mu, sigma, n):
+            tlogpmf = stats.lognorm.logpdf(tn, tsigma, scale=np.exp(tmu))
+            logpmf.append(tlogpmf)
+
+        return logpmf
+
     @doc_inherit  
     def cdf(self, n):
 
@@ -1406,29 +2003,47 @@ class lognorm(Distribution):
 
         return cdf
 
+    @doc_inherit
+    def rvs(self, size=1, random_state=None):
+        tot_obs, n_samp, sigma = self.get_params(['tot_obs','n_samp','sigma'])
+        random_state = _random_state(random_state)
+
+        # Continuous variates, with the mu used by pmf and cdf
+        mu = np.log(tot_obs / n_samp) - (sigma**2 / 2)
+        self.var['mu'] = mu
+        return [random_state.lognormal(tmu, tsigma, size) for tmu, tsigma in
+                                                            zip(mu, sigma)]
+
     @doc_inherit 
-    def fit(self, data):
+    def fit(self, data, freq=False):
 
-        super(lognorm, self).fit(data)
+        super(lognorm, self).fit(data, freq)
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
 
-        data = check_list_of_iterables(data) 
+        tables = _freq_tables(data, freq)
         tempsig = []
+        tempse = []
 
-        for tdata, tn_samp, ttot_obs in zip(data, n_samp, tot_obs): 
+        for (tvalues, tcounts), tn_samp, ttot_obs in zip(tables, n_samp,
+                                                                    tot_obs):
 
-            def ln_func(sigma):
-                self.params['tot_obs'] = ttot_obs
-                self.params['n_samp'] = tn_samp
-                self.params['sigma'] = sigma 
-                return -sum(np.log(self.pmf(tdata)[0]))
-
-            mle_sigma = scipy.optimize.fmin(ln_func,
-                        np.array([np.std(np.log(tdata), ddof=1)]), disp=0)[0]
+            # With mu = log(tot_obs / n_samp) - sigma**2 / 2, the score
+            # equation is sigma**4 / 4 + sigma**2 - B / n = 0, where B is the
+            # sum of squares of log(n) about log(tot_obs / n_samp)
+            B = np.sum(tcounts * (np.log(tvalues) - np.log(ttot_obs /
+                                                            tn_samp)) ** 2)
+            mle_sigma = np.sqrt(2 * (np.sqrt(1 + B / tn_samp) - 1))
             tempsig.append(mle_sigma)
 
+            # No standard error when all log abundances equal log(N / S)
+            if mle_sigma == 0:
+                tempse.append(np.nan)
+            else:
+                tempse.append(1 / np.sqrt(tn_samp * (1 + 2 / mle_sigma**2)))
+
         self.params['sigma'] = np.array(tempsig)
         self.var['sigma'] = np.array(tempsig)
+        self.var['sigma_se'] = np.array(tempse)
         self.params['n_samp'] = n_samp
         self.params['tot_obs'] = tot_obs
 
@@ -1457,10 +2072,16 @@ class dgamma(Distribution):
         The alpha parameter of the discrete gamma distribution
     theta : float or iterable
         The theta parameter of the discrete gamma distribution
+    alpha_se, theta_se : np.array
+        Standard errors of alpha and theta
 
-    Alpha and theta are included in vars if they are calculated from the fit
-    function.
+    Alpha and theta, and their standard errors, are included in vars if they
+    are calculated from the fit function.
 
+    Notes
+    -----
+    The normalizing sum over 1..tot_obs is truncated once the remaining
+    terms are negligible, and memoized in solve_cache (see _dgamma_norm).
 
     '''
 
@@ -1474,6 +2095,11 @@ class dgamma(Distribution):
     @doc_inherit
     def pmf(self, n):
 
+        return [np.exp(tlogpmf) for tlogpmf in self.logpmf(n)]
+
+    @doc_inherit
+    def logpmf(self, n):
+
         # Get parameters
         n_samp, tot_obs, alpha, theta =\
                 self.get_params(['n_samp', 'tot_obs', 'alpha', 'theta'])
@@ -1481,21 +2107,52 @@ class dgamma(Distribution):
 
         assert np.all(n_samp <= tot_obs), 'n_samp must be <= tot_obs'
 
-        # Calculate pmf
-        eq = lambda x, alpha, theta: x**(alpha - 1) * theta**x       
+        # Log normalization constants for all parameter sets
+        lognorm = _dgamma_norm(alpha, theta, tot_obs)[0]
 
-        pmf = []
-        for tn_samp, ttot_obs, talpha, ttheta, tn in zip(n_samp, tot_obs,
-                                                alpha, theta, n):
-            # Normalization constant
-            sumg = sum(eq(np.arange(1, np.floor(ttot_obs) + 1), talpha,
-                                                                    ttheta))
-            tpmf = eq(tn, talpha, ttheta) / sumg # Normalizing
-            pmf.append(tpmf)
+        logpmf = []
+        for talpha, ttheta, tlognorm, tn in zip(alpha, theta, lognorm, n):
+            logpmf.append((talpha - 1) * np.log(tn) + tn * np.log(ttheta) -
+                          tlognorm)
 
-        return pmf
+        return logpmf
 
-    def fit(self, data):
+    @doc_inherit
+    def loglik(self, data, freq=False):
+
+        # Log-likelihood from the sufficient statistics sum(log(n)), sum(n)
+        # and the number of species
+        tables = _freq_tables(data, freq)
+
+        alpha, theta, tot_obs = self.get_params(['alpha', 'theta', 'tot_obs'])
+        lognorm = _dgamma_norm(alpha, theta, tot_obs)[0]
+
+        return np.array([(talpha - 1) * np.sum(tcounts * np.log(tvalues)) +
+                         np.sum(tcounts * tvalues) * np.log(ttheta) -
+                         np.sum(tcounts) * tlognorm for talpha, ttheta,
+                         tlognorm, (tvalues, tcounts) in zip(alpha, theta,
+                         lognorm, tables)])
+
+    def _loglik_grad(self, table, alpha, theta, tot_obs):
+        '''
+        Log-likelihood of a frequency table and its gradient with respect to
+        alpha and theta, from the sufficient statistics sum(log(n)) and sum(n).
+        '''
+        values, counts = table
+        S = np.sum(counts)
+        sum_log = np.sum(counts * np.log(values))
+        sum_n = np.sum(counts * values)
+
+        # Normalization constant and the means of log(k) and k under the pmf
+        lognorm, mean_log, mean_k = [tval[0] for tval in _dgamma_norm(alpha,
+                                                             theta, tot_obs)]
+
+        loglik = (alpha - 1) * sum_log + sum_n * np.log(theta) - S * lognorm
+        grad = np.array([sum_log - S * mean_log, (sum_n - S * mean_k) / theta])
+
+        return loglik, grad
+
+    def fit(self, data, freq=False):
         '''
         Fit method.
 
@@ -1507,35 +2164,54 @@ class dgamma(Distribution):
         data : list of ndarrays
             Data to use to fit parameters of distribution. Even if only one 
             data array, must be in a list with one element.
+        freq : bool
+            If True, data is a list of frequency tables of (values, counts),
+            eg, from freq_table.
 
         See class docstring for more specific information on this distribution.
         '''
 
-        super(dgamma, self).fit(data)
-        data = check_list_of_iterables(data)
+        super(dgamma, self).fit(data, freq)
+        n_samp, tot_obs = self.params['n_samp'], self.params['tot_obs']
+
+        # Likelihood is evaluated on unique values only
+        tables = _freq_tables(data, freq)
 
         # Calculate and store parameters
         temp_alpha = []
         temp_theta = []
+        temp_se = []
+        prev = None
 
-        for tdata in data:
+        for table, tn_samp, ttot_obs in zip(tables, n_samp, tot_obs):
             alpha0 = 1 # starting guesses for alpha and theta 
             theta0 = .9 
-            
+
+            # Moment estimates of the continuous gamma are a second guess
+            mean = ttot_obs / tn_samp
+            var = np.sum(table[1] * (table[0] - mean) ** 2) / tn_samp
+            moments = None
+            if var > 0:
+                moments = [mean ** 2 / var, np.exp(-mean / var)]
+
             def dgm_func(x):
-                self.params['alpha'] = x[0]
-                self.params['theta'] = x[1]
-                return -sum(np.log(self.pmf(tdata)[0]))
+                loglik, grad = self._loglik_grad(table, x[0], x[1], ttot_obs)
+                return -loglik, -grad
 
-            alpha, theta = scipy.optimize.fmin(dgm_func, x0=[alpha0, theta0],
-                                            disp=0)
-            temp_alpha.append(alpha)
-            temp_theta.append(theta)
+            x, se = _mle(dgm_func, [[alpha0, theta0], moments, prev],
+                         bounds=[(None, None), (1e-10, None)])
+            prev = x
+            temp_alpha.append(x[0])
+            temp_theta.append(x[1])
+            temp_se.append(se)
 
+        temp_se = np.array(temp_se)
         self.params['alpha'] = np.array(temp_alpha)
         self.params['theta'] = np.array(temp_theta)
         self.var['alpha'] = np.array(temp_alpha)
         self.var['theta'] = np.array(temp_theta)
+        self.var['alpha_se'] = temp_se[:, 0]
+        self.var['theta_se'] = temp_se[:, 1]
 
         return self
 
@@ -1585,6 +2261,7 @@ class geo_ser(Distribution):
     def __init__(self, **kwargs):
         self.params = kwargs
         self.min_supp = 1
+        self.upper_trunc = True
         self.par_num = 3 # May says 2 parameters, test this
         self.var = {}
 
@@ -1642,6 +2319,22 @@ class geo_ser(Distribution):
 
         return pmf
 
+    @doc_inherit
+    def logpmf(self, n):
+
+        # Get parameters
+        n_samp, tot_obs, k = self.get_params(['n_samp', 'tot_obs', 'k'])
+        n = expand_n(n, len(n_samp))
+
+        assert np.all(n_samp <= tot_obs), 'n_samp must be <= tot_obs'
+        assert np.all(k > 0) and np.all(k <= 1), ('k must be in the ' + 
+                                                  'interval (0, 1]')
+
+        # Log of equation from May 1975
+        logpmf = [-np.log(tn) - np.log(tn_samp) - np.log(-np.log1p(-tk)) for
+                                            tn_samp, tk, tn in zip(n_samp, k, n)]
+        return logpmf
+
     @doc_inherit
     def rad(self):
 
@@ -1663,10 +2356,10 @@ class geo_ser(Distribution):
 
 
     @doc_inherit
-    def fit(self, data):
+    def fit(self, data, freq=False):
 
         # Get parameters
-        super(geo_ser, self).fit(data)  # Run Distribution.fit method
+        super(geo_ser, self).fit(data, freq)  # Run Distribution.fit method
         n_samp = self.params['n_samp']
         tot_obs = self.params['tot_obs']
 
@@ -1675,8 +2368,10 @@ class geo_ser(Distribution):
 
         # Calculate fit
         self.params['k'] = []
-        for tdata, tn_samp, ttot_obs in zip(data, n_samp, tot_obs):
-            ttot_obs_min = np.min(tdata)
+        tables = _freq_tables(data, freq)
+        for (tvalues, tcounts), tn_samp, ttot_obs in zip(tables, n_samp,
+                                                                    tot_obs):
+            ttot_obs_min = np.min(tvalues[tcounts > 0])
             eq = lambda x: (((x / (1 - x)) *
                              ((1 - x) ** tn_samp / (1 - (1 - x) ** tn_samp)))
                             - (ttot_obs_min / ttot_obs))
@@ -1717,6 +2412,7 @@ class broken_stick(Distribution):
     def __init__(self, **kwargs):
         self.params = kwargs
         self.min_supp = 1
+        self.upper_trunc = True
         self.par_num = 2  # May says 1
         self.var = {}
 
@@ -1744,6 +2440,26 @@ class broken_stick(Distribution):
 
         return pmf
 
+    @doc_inherit
+    def logpmf(self, n):
+
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+
+        assert np.all(n_samp <= tot_obs), 'n_samp must be <= tot_obs'
+
+        # Calculate logpmf
+        eq = lambda x, n_samp, tot_obs: np.log((n_samp - 1) / tot_obs) + \
+                                          (n_samp - 2) * np.log1p(-x / tot_obs)
+
+        logpmf = []
+        for tn_samp, ttot_obs, tn in zip(n_samp, tot_obs, n):
+            ttot_obs = np.round(ttot_obs, decimals=0)
+            logpmf.append(eq(tn, tn_samp, ttot_obs))
+
+        return logpmf
+
 
     @doc_inherit
     def rad(self):
@@ -1783,7 +2499,10 @@ class sugihara(Distribution):
 
     self.var keyword
     ----------------
-    None
+    rad_se : list of ndarrays
+        Standard error of the mean abundance at each rank, set by rad
+    sample_size : list of ints
+        Number of breakage sequences simulated by rad
 
     Notes
     -----
@@ -1800,7 +2519,9 @@ class sugihara(Distribution):
     breaking.  
 
     The rad method has an additional optional argument for sample_size, which 
-    is set to 10000 by default. 
+    is set to 10000 by default. All breakage sequences in a chunk are
+    simulated at once (see _sugihara_chunk), and chunks may be spread over
+    processes.
     
     The total species (S) is equivalent to n_samp and the total
     individuals (N) is equivalent to tot_obs.
@@ -1812,41 +2533,108 @@ class sugihara(Distribution):
     def __init__(self, **kwargs):
         self.params = kwargs
         self.min_supp = 1
+        self.upper_trunc = True
         self.par_num = 1
         self.var = {}
     
 
-    @doc_inherit
-    def rad(self, sample_size=10000):
+    def rad(self, sample_size=10000, chunk_size=1000, n_jobs=1,
+            random_state=None, tol=None, biased=False):
+        '''
+        Rank abundance distribution method, calculates rad as the mean of
+        simulated breakage sequences.
+
+        Parameters
+        ----------
+        sample_size : int
+            Maximum number of breakage sequences simulated
+        chunk_size : int
+            Number of breakage sequences simulated together
+        n_jobs : int
+            Number of processes the chunks are spread over. -1 uses one
+            process per cpu.
+        random_state : int
+            Seed of the random numbers. Each chunk has its own stream seeded
+            from random_state, so results do not depend on chunk order or
+            n_jobs. If None, seeds are drawn from np.random.
+        tol : float
+            If not None, simulation stops once the standard error of the mean
+            abundance at every rank is below tol
+        biased : bool
+            If True, the niche that is broken is chosen with probability
+            proportional to its size. If False (default), it is chosen
+            uniformly.
+
+        Returns
+        -------
+        rad : list of ndarrays
+            List of 1D arrays of predicted abundance for each species
+
+        See class docstring for more specific information on this distribution.
+        '''
         
         # Get parameters
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
         assert np.all(n_samp <= tot_obs), 'n_samp must be <= tot_obs'
 
+        if n_jobs == -1:
+            n_jobs = multiprocessing.cpu_count()
+        if n_jobs < 1:
+            raise ValueError('n_jobs must be a positive integer or -1')
+
+        if random_state is None:
+            rng = np.random
+        else:
+            rng = np.random.RandomState(random_state)
+
+        n_chunks = int(np.ceil(sample_size / chunk_size))
+        sizes = [min(chunk_size, sample_size - i * chunk_size) for i in
+                                                            xrange(n_chunks)]
+        n_proc = int(min(n_jobs, n_chunks))
+        pool = None
+        if n_proc > 1:
+            pool = multiprocessing.Pool(n_proc)
+
         # Calculate rad
         rad = []
-        for tn_samp, ttot_obs in zip(n_samp, tot_obs):
-            total = []
-            for i in xrange(sample_size):
-                U = np.random.triangular(0.5, 0.75, 1, size=tn_samp - 1)
-                p = []
-                # TODO: Could this be refactored to perform better?
-                for i in xrange(np.int(tn_samp)):
-                    if i == 0:
-                        p.append(1)
+        self.var['rad_se'] = []
+        self.var['sample_size'] = []
+        try:
+            for tn_samp, ttot_obs in zip(n_samp, tot_obs):
+                seeds = rng.randint(0, 2**31 - 1, size=n_chunks)
+                jobs = [(tsize, int(tn_samp), tseed, biased) for tsize, tseed
+                                                        in zip(sizes, seeds)]
+
+                # Run chunks in rounds of n_proc, checking the standard error
+                # after each round
+                sums = np.zeros(int(tn_samp))
+                sq_sums = np.zeros(int(tn_samp))
+                n = 0
+                for start in xrange(0, n_chunks, n_proc):
+                    round_jobs = jobs[start:start + n_proc]
+                    if pool is None:
+                        results = map(_sugihara_chunk, round_jobs)
                     else:
-                        index = np.random.random_integers(0, len(p) - 1)
-                        p_new1 = p[index] * U[i - 1]
-                        p_new2 = p[index] * (1 - U[i - 1])
-                        p[index] = p_new1
-                        p.append(p_new2)
-                        p.sort(reverse=True)
-                total.append(p)
-      
-            total_array = np.array(total)
-            means = np.array([np.mean(total_array[:,i]) for i in 
-                                                         xrange(int(tn_samp))])
-            rad.append(np.sort(ttot_obs * means))
+                        results = pool.map(_sugihara_chunk, round_jobs)
+                    for (tsum, tsq_sum), job in zip(results, round_jobs):
+                        sums += tsum
+                        sq_sums += tsq_sum
+                        n += job[0]
+
+                    means = sums / n
+                    var = np.maximum(sq_sums / n - means ** 2, 0) * n / max(n
+                                                                    - 1, 1)
+                    se = ttot_obs * np.sqrt(var / n)
+                    if tol is not None and n > 1 and np.max(se) < tol:
+                        break
+
+                rad.append(ttot_obs * means)
+                self.var['rad_se'].append(se)
+                self.var['sample_size'].append(n)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
 
         return rad
 
@@ -1892,6 +2680,7 @@ class binm(Distribution):
     def __init__(self, **kwargs):
         self.params = kwargs
         self.min_supp = 0
+        self.upper_trunc = True
         self.par_num = 2
         self.var = {}
     
@@ -1910,6 +2699,21 @@ class binm(Distribution):
             pmf.append(stats.binom.pmf(tn, ttot_obs, ta))
             self.var['p'].append(ta)
         return pmf
+
+    @doc_inherit
+    def logpmf(self, n):
+
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+
+        logpmf = []
+        self.var['p'] = []
+        for tn_samp, ttot_obs, tn in zip(n_samp, tot_obs, n):
+            ta = 1 / tn_samp
+            logpmf.append(stats.binom.logpmf(tn, ttot_obs, ta))
+            self.var['p'].append(ta)
+        return logpmf
     
     @doc_inherit
     def cdf(self, n):
@@ -1926,6 +2730,23 @@ class binm(Distribution):
             self.var['p'].append(ta)
         return cdf
 
+    @doc_inherit
+    def rvs(self, size=1, random_state=None):
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        random_state = _random_state(random_state)
+        return [random_state.binomial(ttot_obs, 1 / tn_samp, size) for
+                                    tn_samp, ttot_obs in zip(n_samp, tot_obs)]
+
+    @doc_inherit
+    def p_absent(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        return (1 - a) ** tot_obs
+
+    @doc_inherit
+    def p_all(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        return a ** tot_obs
+
 class pois(Distribution):
     __doc__ = Distribution.__doc__ + \
     '''
@@ -1969,6 +2790,20 @@ class pois(Distribution):
             pmf.append(stats.poisson.pmf(tn, tmu))
             self.var['mu'].append(tmu)
         return pmf
+
+    @doc_inherit
+    def logpmf(self, n):
+
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+
+        logpmf = []
+        self.var['mu'] = []
+        for tn_samp, ttot_obs, tn in zip(n_samp, tot_obs, n):
+            tmu = ttot_obs * (1 / tn_samp)
+            logpmf.append(stats.poisson.logpmf(tn, tmu))
+            self.var['mu'].append(tmu)
+        return logpmf
     
     @doc_inherit
     def cdf(self, n): 
@@ -1986,6 +2821,25 @@ class pois(Distribution):
             self.var['mu'].append(tmu)
         return cdf
 
+    @doc_inherit
+    def rvs(self, size=1, random_state=None):
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        random_state = _random_state(random_state)
+        return [random_state.poisson(ttot_obs / tn_samp, size) for tn_samp,
+                                              ttot_obs in zip(n_samp, tot_obs)]
+
+    @doc_inherit
+    def p_absent(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        return np.exp(-a * tot_obs)
+
+    @doc_inherit
+    def p_all(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        mu = a * tot_obs
+        return np.exp(scipy.special.xlogy(tot_obs, mu) - mu -
+                      scipy.special.gammaln(tot_obs + 1))
+
 class nbd(Distribution):
     __doc__ = Distribution.__doc__ + \
     '''
@@ -2014,6 +2868,8 @@ class nbd(Distribution):
         p parameters of nbd
     k : array of floats
         Aggregation parameter
+    k_se : array of floats
+        Standard error of k calculated in fit
     '''
     
     @doc_inherit
@@ -2022,6 +2878,14 @@ class nbd(Distribution):
         self.min_supp = 0
         self.par_num = 2
         self.var = {}
+
+    def _solve(self):
+
+        n_samp, tot_obs, k = self.get_params(['n_samp', 'tot_obs', 'k'])
+        mu = tot_obs * (1 / n_samp)
+        p = 1 / (mu / k + 1) # See Bolker book Chapt 4
+
+        return {'p': p}
     
     def pmf(self, n):
         '''
@@ -2043,22 +2907,46 @@ class nbd(Distribution):
         
         n_samp, tot_obs, k = self.get_params(['n_samp', 'tot_obs', 'k'])
         n = expand_n(n, len(n_samp))
+        p = self._solved()['p']
         
         # TODO: Additional checks?
         
         pmf = []
-        self.var['p'] = []
 
-        for tn_samp, ttot_obs, tk, tn in zip(n_samp, tot_obs, k, n):
-            tmu = ttot_obs * (1 / tn_samp)
-            tp = 1 / (tmu / tk + 1) # See Bolker book Chapt 4
+        for tk, tp, tn in zip(k, p, n):
             pmf.append(scipy.stats.nbinom.pmf(tn, tk, tp))
-            self.var['p'].append(tp)
-
-        self.var['p'] = np.array(self.var['p'])
 
         return pmf 
 
+    def logpmf(self, n):
+        '''
+        Log of the probability mass function.
+
+        Parameters
+        ----------
+        n : int, float or array-like object
+            Values at which to calculate logpmf. May be a list of same length
+            as parameters, or single iterable.
+
+        Returns
+        -------
+        logpmf : list of ndarrays
+            List of 1D arrays of log probability of observing sample n.
+
+        See class docstring for more specific information on this distribution.
+        '''
+
+        n_samp, tot_obs, k = self.get_params(['n_samp', 'tot_obs', 'k'])
+        n = expand_n(n, len(n_samp))
+        p = self._solved()['p']
+        
+        logpmf = []
+
+        for tk, tp, tn in zip(k, p, n):
+            logpmf.append(scipy.stats.nbinom.logpmf(tn, tk, tp))
+
+        return logpmf
+
     def cdf(self, n):
         '''
         Cumulative distribution method.  
@@ -2079,22 +2967,59 @@ class nbd(Distribution):
 
         n_samp, tot_obs, k = self.get_params(['n_samp', 'tot_obs', 'k'])
         n = expand_n(n, len(n_samp))
+        p = self._solved()['p']
         
         # TODO: Additional checks?
         
         cdf = []
-        self.var['p'] = []
 
-        for tn_samp, ttot_obs, tk, tn in zip(n_samp, tot_obs, k, n):
-            tmu = ttot_obs * (1 / tn_samp)
-            tp = 1 / (tmu / tk + 1) # See Bolker book Chapt 4
+        for tk, tp, tn in zip(k, p, n):
             cdf.append(scipy.stats.nbinom.cdf(tn, tk, tp))
-            self.var['p'].append(tp)
         
-        self.var['p'] = np.array(self.var['p'])
         return cdf
+
+    @doc_inherit
+    def rvs(self, size=1, random_state=None):
+        k = self.get_params(['n_samp', 'tot_obs', 'k'])[2]
+        p = self._solved()['p']
+        random_state = _random_state(random_state)
+        return [random_state.negative_binomial(tk, tp, size) for tk, tp in
+                                                                    zip(k, p)]
+
+    @doc_inherit
+    def p_absent(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        k = self.get_params(['k'])[0]
+        return np.exp(-k * np.log1p(a * tot_obs / k))
+
+    @doc_inherit
+    def p_all(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        k = self.get_params(['k'])[0]
+        gammaln = scipy.special.gammaln
+        mu = a * tot_obs
+        return np.exp(gammaln(tot_obs + k) - gammaln(k) - gammaln(tot_obs + 1)
+                      - k * np.log1p(mu / k) + scipy.special.xlogy(tot_obs,
+                      mu / (k + mu)))
+
+    def _loglik_grad(self, table, k, mu):
+        '''
+        Log-likelihood of a frequency table and its derivative with respect to
+        k, where mu is the mean.
+        '''
+        values, counts = table
+        gammaln = scipy.special.gammaln
+        digamma = scipy.special.digamma
+        p = k / (k + mu)
+
+        logpmf = (gammaln(values + k) - gammaln(k) - gammaln(values + 1) + k *
+                  np.log(p) + values * np.log1p(-p))
+        score = (digamma(values + k) - digamma(k) + np.log(p) + 1 - (k +
+                 values) / (k + mu))
+
+        return np.sum(counts * logpmf), np.sum(counts * score)
     
-    def fit(self, data, guess_for_k=1):
+    def fit(self, data, guess_for_k=1, batch=True, freq=False):
         '''
         Fit method.
 
@@ -2108,31 +3033,60 @@ class nbd(Distribution):
             data array, must be in a list with one element.
         guess_for_k : float
             Initial guess for parameter k in solver
+        batch : bool
+            If True (default), k is solved for all data arrays at once (see
+            _nbd_k_newton). Only arrays that do not converge are fit one at a
+            time.
+        freq : bool
+            If True, data is a list of frequency tables of (values, counts),
+            eg, from freq_table.
 
         See class docstring for more specific information on this distribution.
         '''
 
-        super(nbd, self).fit(data)
+        super(nbd, self).fit(data, freq)
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
 
-        data = check_list_of_iterables(data) 
-        tempk = []
-
-        for tdata, tn_samp, ttot_obs in zip(data, n_samp, tot_obs): 
-
-            def nll_nb(k):
-                self.params['tot_obs'] = ttot_obs
-                self.params['n_samp'] = tn_samp
-                self.params['k'] = k
-                return -sum(np.log(self.pmf(tdata)[0]))
-
-            mlek = scipy.optimize.fmin(nll_nb, np.array([guess_for_k]), 
-                                                                    disp=0)[0]
-            tempk.append(mlek)
-        self.params['k'] = np.array(tempk)
+        # Likelihood is evaluated on unique values only
+        tables = _freq_tables(data, freq)
+        tempk = np.repeat(np.nan, len(tables))
+        tempse = np.repeat(np.nan, len(tables))
+        prev = None
+
+        if batch:
+            # Pad frequency tables into matrices of values and counts, with
+            # counts of zero for the padding
+            lens = np.array([len(tvalues) for tvalues, tcounts in tables])
+            X = np.zeros((len(tables), np.max(lens)))
+            W = np.zeros(X.shape)
+            for i, (tvalues, tcounts) in enumerate(tables):
+                X[i, :lens[i]] = tvalues
+                W[i, :lens[i]] = tcounts
+            tempk, tempse = _nbd_k_newton(X, W, tot_obs / n_samp, guess_for_k,
+                                          trunc=self.min_supp == 1)
+
+        for i in np.where(np.isnan(tempk))[0]:
+            table, tn_samp, ttot_obs = tables[i], n_samp[i], tot_obs[i]
+            mu = ttot_obs / tn_samp
+
+            # Solve on log(k), so that k stays positive
+            def nll_nb(logk):
+                k = np.exp(logk[0])
+                loglik, score = self._loglik_grad(table, k, mu)
+                return -loglik, np.array([-score * k])
+
+            logk, se = _mle(nll_nb, [[np.log(guess_for_k)], prev],
+                            bounds=[(np.log(1e-10), None)])
+            prev = logk
+
+            # se of log(k) times k is the se of k at the maximum
+            tempk[i] = np.exp(logk[0])
+            tempse[i] = np.exp(logk[0]) * se[0]
+        self.params['k'] = tempk
         self.params['n_samp'] = n_samp
         self.params['tot_obs'] = tot_obs
-        self.var['k'] = np.array(tempk)
+        self.var['k'] = tempk
+        self.var['k_se'] = tempse
 
         return self
 
@@ -2163,6 +3117,8 @@ class nbd_lt(nbd):
         p parameters of nbd
     k : array of floats
         Aggregation parameter
+    k_se : array of floats
+        Standard error of k calculated in fit
 
     Notes
     -----
@@ -2212,44 +3168,104 @@ class nbd_lt(nbd):
 
         return trunc_pmf         
 
-    def cdf(self, n):
+    def logpmf(self, n):
         '''
-        Cumulative distribution method.  
+        Log of the probability mass function.
 
         Parameters
         ----------
         n : int, float or array-like object
-            Values at which to calculate cdf. May be a list of same length as 
-            parameters, or single iterable.
+            Values at which to calculate logpmf. May be a list of same length
+            as parameters, or single iterable.
 
         Returns
         -------
-        cdf : list of ndarrays
-            List of 1D arrays of probability of observing sample n.
+        logpmf : list of ndarrays
+            List of 1D arrays of log probability of observing sample n.
 
         See class docstring for more specific information on this distribution.
         '''
 
+        # Get parameters
         n_samp, tot_obs, k = self.get_params(['n_samp', 'tot_obs', 'k'])
         n = expand_n(n, len(n_samp))
-        
-        # TODO: Additional checks?
 
         reg_nbd = nbd(n_samp=n_samp, tot_obs=tot_obs, k=k)
-        p0 = reg_nbd.pmf(0)
+        reg_logpmf = reg_nbd.logpmf(n)
         self.var = reg_nbd.var
-        reg_cdf = reg_nbd.cdf(n)
-
-        trun_cdf = [(tcdf - tp0) / (1 - tp0) for tcdf, tp0 in zip(reg_cdf, p0)]
+        reg_pmf0 = reg_nbd.pmf(0)
 
-        return trun_cdf
+        trunc_logpmf = [(lpr - np.log1p(-p0)) for lpr, p0 in zip(reg_logpmf,
+                                                                 reg_pmf0)]
 
-class fnbd(Distribution):
-    __doc__ = Distribution.__doc__ + \
-    '''
-    Description
-    -----------
-    Finite negative binomial (Zillio and He 2010).
+        return trunc_logpmf
+
+    def _loglik_grad(self, table, k, mu):
+        '''
+        Log-likelihood of a frequency table and its derivative with respect to
+        k, where mu is the mean of the untruncated nbd.
+        '''
+        loglik, score = super(nbd_lt, self)._loglik_grad(table, k, mu)
+
+        # Truncation adds -log(1 - p**k) for each observation
+        p = k / (k + mu)
+        p0 = p ** k
+        S = np.sum(table[1])
+        loglik -= S * np.log1p(-p0)
+        score += S * p0 * (np.log(p) + 1 - p) / (1 - p0)
+
+        return loglik, score
+
+    def rvs(self, size=1, random_state=None):
+        '''numpy's generator does not apply. See Distribution.rvs.'''
+        return Distribution.rvs(self, size, random_state)
+
+    def p_absent(self, tot_obs, a):
+        '''The closed form of nbd does not apply. See Distribution.p_absent.'''
+        return Distribution.p_absent(self, tot_obs, a)
+
+    def p_all(self, tot_obs, a):
+        '''The closed form of nbd does not apply. See Distribution.p_all.'''
+        return Distribution.p_all(self, tot_obs, a)
+
+    def cdf(self, n):
+        '''
+        Cumulative distribution method.  
+
+        Parameters
+        ----------
+        n : int, float or array-like object
+            Values at which to calculate cdf. May be a list of same length as 
+            parameters, or single iterable.
+
+        Returns
+        -------
+        cdf : list of ndarrays
+            List of 1D arrays of probability of observing sample n.
+
+        See class docstring for more specific information on this distribution.
+        '''
+
+        n_samp, tot_obs, k = self.get_params(['n_samp', 'tot_obs', 'k'])
+        n = expand_n(n, len(n_samp))
+        
+        # TODO: Additional checks?
+
+        reg_nbd = nbd(n_samp=n_samp, tot_obs=tot_obs, k=k)
+        p0 = reg_nbd.pmf(0)
+        self.var = reg_nbd.var
+        reg_cdf = reg_nbd.cdf(n)
+
+        trun_cdf = [(tcdf - tp0) / (1 - tp0) for tcdf, tp0 in zip(reg_cdf, p0)]
+
+        return trun_cdf
+
+class fnbd(Distribution):
+    __doc__ = Distribution.__doc__ + \
+    '''
+    Description
+    -----------
+    Finite negative binomial (Zillio and He 2010).
 
     Parameters
     ----------
@@ -2274,12 +3290,18 @@ class fnbd(Distribution):
     def __init__(self, **kwargs):
         self.params = kwargs
         self.min_supp = 0
+        self.upper_trunc = True
         self.par_num = 2
         self.var = {}
     
     @doc_inherit
     def pmf(self, n):
 
+        return [np.exp(tlogpmf) for tlogpmf in self.logpmf(n)]
+
+    @doc_inherit
+    def logpmf(self, n):
+
         # TODO: Fix to work if n and N are one value
         #    if not (n <= N).all():
         #        raise Exception, "All values of n must be <= N."
@@ -2292,23 +3314,49 @@ class fnbd(Distribution):
         
         # TODO: Additional checks?
         
-        pmf = []
+        logpmf = []
         self.var['p'] = []
 
         for tn_samp, ttot_obs, tk, tn in zip(n_samp, tot_obs, k, n):
 
-            ln_L = lambda n_i,N,a,k: _ln_choose(n_i+k-1,n_i) + \
-                _ln_choose(N-n_i+(k/a)-k-1,N-n_i) - _ln_choose(N +(k/a)-1,N)
             ta = 1 / tn_samp
-            tpmf = ln_L(tn, ttot_obs, ta, tk) # Already log
-            pmf.append(np.exp(tpmf))
+            logpmf.append(_fnbd_logpmf(tn, ttot_obs, ta, tk))
             self.var['p'].append(ta)
 
         self.var['p'] = np.array(self.var['p'])
 
-        return pmf
+        return logpmf
+
+    @doc_inherit
+    def p_absent(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        k = self.get_params(['k'])[0]
+        return np.exp(_fnbd_logpmf(0, tot_obs, a, k))
+
+    @doc_inherit
+    def p_all(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        k = self.get_params(['k'])[0]
+
+        # The choose term for the other cells is 1, also when a = 1
+        return np.exp(_ln_choose(tot_obs + k - 1, tot_obs) -
+                      _ln_choose(tot_obs + (k / a) - 1, tot_obs))
+
+    def _loglik_k(self, table, k, tot_obs, n_samp):
+        '''
+        Log-likelihood of a frequency table for each value in the array k,
+        calculated in one broadcast over k and the unique values.
+        '''
+        values, counts = table
+        k = np.atleast_1d(np.asarray(k, dtype=float))[:, None]
+        a = 1 / n_samp
+
+        ln_L = (_ln_choose(values + k - 1, values) + _ln_choose(tot_obs -
+                values + (k / a) - k - 1, tot_obs - values))
+        return (np.sum(counts * ln_L, axis=1) - np.sum(counts) *
+                _ln_choose(tot_obs + (k[:, 0] / a) - 1, tot_obs))
     
-    def fit(self, data, upper_bnd=10):
+    def fit(self, data, upper_bnd=None, per_decade=8, freq=False):
         '''
         Fit method.
 
@@ -2320,28 +3368,49 @@ class fnbd(Distribution):
         data : list of ndarrays
             Data to use to fit parameters of distribution. Even if only one 
             data array, must be in a list with one element.
-        upper_bnd : int
-            upper_bnd for parameter k in solver
+        upper_bnd : float
+            upper_bnd for parameter k in solver. If None (default), the grid
+            starts at 10 and is extended until the maximum likelihood is
+            inside it or k is 1e10.
+        per_decade : int
+            Number of grid points for each factor of 10 in k
+        freq : bool
+            If True, data is a list of frequency tables of (values, counts),
+            eg, from freq_table.
 
         See class docstring for more specific information on this distribution.
         '''
-        super(fnbd, self).fit(data)
+        super(fnbd, self).fit(data, freq)
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
-        
-        data = check_list_of_iterables(data)
 
-        tempk = []
+        # Evaluate likelihood on unique values only
+        tables = _freq_tables(data, freq)
 
-        for tdata, tn_samp, ttot_obs in zip(data, n_samp, tot_obs): 
+        tempk = []
 
-            def nll_nb(k):
-                self.params['tot_obs'] = ttot_obs
-                self.params['n_samp'] = tn_samp
-                self.params['k'] = k
-                return -sum(np.log(self.pmf(tdata)[0]))
-            
-            mlek = scipy.optimize.brute(nll_nb, ((1e-10, upper_bnd),))
-            tempk.append(mlek[0])
+        for table, tn_samp, ttot_obs in zip(tables, n_samp, tot_obs): 
+
+            # Log-likelihood on a grid in log(k) from 1e-10
+            top = np.log10(10 if upper_bnd is None else upper_bnd)
+            num = int(np.ceil((top + 10) * per_decade)) + 1
+            logk = np.linspace(-10, top, num)
+            ll = self._loglik_k(table, 10 ** logk, ttot_obs, tn_samp)
+
+            # Extend the grid by decades while the maximum is at its top
+            while (upper_bnd is None and np.nanargmax(ll) == len(ll) - 1 and
+                   logk[-1] < 10):
+                new = logk[-1] + np.arange(1, per_decade + 1) / per_decade
+                ll = np.concatenate((ll, self._loglik_k(table, 10 ** new,
+                                                        ttot_obs, tn_samp)))
+                logk = np.concatenate((logk, new))
+
+            # Refine between the neighbours of the best grid point
+            i = np.nanargmax(ll)
+            lo, hi = logk[max(i - 1, 0)], logk[min(i + 1, len(logk) - 1)]
+            nll_nb = lambda x: -self._loglik_k(table, 10 ** x, ttot_obs,
+                                               tn_samp)[0]
+            mlek = 10 ** scipy.optimize.fminbound(nll_nb, lo, hi, xtol=1e-10)
+            tempk.append(mlek)
 
         self.params['k'] = np.array(tempk)
         self.var['k'] = np.array(tempk)
@@ -2392,6 +3461,18 @@ class geo(Distribution):
         pmf = nbd(tot_obs=tot_obs, n_samp=n_samp, k=k).pmf(n)
         self.var['p'] = 1 / n_samp
         return pmf
+
+    @doc_inherit
+    def logpmf(self, n):
+        
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+
+        k = np.repeat(1, len(n_samp))
+        logpmf = nbd(tot_obs=tot_obs, n_samp=n_samp, k=k).logpmf(n)
+        self.var['p'] = 1 / n_samp
+        return logpmf
     
     @doc_inherit
     def cdf(self, n):
@@ -2406,6 +3487,20 @@ class geo(Distribution):
         cdf = nbd(tot_obs=tot_obs, n_samp=n_samp, k=k).cdf(n)
         self.var['p'] = 1 / n_samp
         return cdf
+
+    @doc_inherit
+    def rvs(self, size=1, random_state=None):
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        k = np.repeat(1, len(n_samp))
+        return nbd(tot_obs=tot_obs, n_samp=n_samp, k=k).rvs(size, random_state)
+
+    @doc_inherit
+    def p_absent(self, tot_obs, a):
+        return nbd(k=1).p_absent(tot_obs, a)
+
+    @doc_inherit
+    def p_all(self, tot_obs, a):
+        return nbd(k=1).p_all(tot_obs, a)
         
 class fgeo(Distribution):
     __doc__ = Distribution.__doc__ + \
@@ -2438,6 +3533,7 @@ class fgeo(Distribution):
     def __init__(self, **kwargs):
         self.params = kwargs
         self.min_supp = 0
+        self.upper_trunc = True
         self.par_num = 1
         self.var = {}
     
@@ -2455,6 +3551,19 @@ class fgeo(Distribution):
         pmf = tfnbd.pmf(n)
         self.var=  tfnbd.var
         return pmf 
+
+    @doc_inherit
+    def logpmf(self, n):
+        
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+
+        k = np.repeat(1, len(n_samp))
+        tfnbd = fnbd(tot_obs=tot_obs, n_samp=n_samp, k=k)
+        logpmf = tfnbd.logpmf(n)
+        self.var = tfnbd.var
+        return logpmf
     
     @doc_inherit
     def cdf(self, n):
@@ -2471,6 +3580,14 @@ class fgeo(Distribution):
         self.var = tfnbd.var
         return cdf
 
+    @doc_inherit
+    def p_absent(self, tot_obs, a):
+        return fnbd(k=1).p_absent(tot_obs, a)
+
+    @doc_inherit
+    def p_all(self, tot_obs, a):
+        return fnbd(k=1).p_all(tot_obs, a)
+
 class tgeo(Distribution):
     __doc__ = Distribution.__doc__ + \
     '''
@@ -2510,62 +3627,141 @@ class tgeo(Distribution):
     def __init__(self, **kwargs):
         self.params = kwargs
         self.min_supp = 0
+        self.upper_trunc = True
         self.par_num = 1
         self.var = {}
     
+    def _solve(self):
+
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        
+        # TODO: Additional checks?
+
+        # Mean of the distribution minus N * a, in t = -log(x) so that
+        # x ** (N + 1) cannot overflow. The mean is N / 2 at t = 0.
+        def eq(t, N, a):
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                mean = 1 / np.expm1(t) - (N + 1) / np.expm1((N + 1) * t)
+            return np.where(t == 0, N / 2, mean) - N * a
+
+        # Solve for x for all parameter sets at once. The mean at 1 / x is N
+        # minus the mean at x, so a > 0.5 is solved as 1 - a with x < 1.
+        def solve(tot_obs, a):
+            flip = a > 0.5
+            t = batch_solver(eq, 0, 800, args=(tot_obs, np.where(flip, 1 - a,
+                                                                         a)))
+            x = np.exp(np.where(flip, t, -t))
+            x[tot_obs == 0] = 0
+            return x
+
+        a = 1 / n_samp
+        xs = np.empty(len(n_samp))
+        xs[a == 0.5] = 1
+        xs[a == 1] = 0
+        solve_ind = (a != 0.5) & (a != 1)
+        xs[solve_ind] = _memo_solve('tgeo', solve, tot_obs[solve_ind],
+                                    a[solve_ind])
+
+        bad = np.where(np.isnan(xs))[0]
+        if len(bad) != 0:
+            raise ValueError("No solution to %s.pmf when tot_obs = " %
+                         (self.__class__.__name__) +
+                         "%.2f, n_samp = %.10f and a = %.10f" % 
+                         (tot_obs[bad[0]], n_samp[bad[0]], a[bad[0]]))
+
+        return {'x': xs}
+
     @doc_inherit
     def pmf(self, n):
 
         # Get parameters
         n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
         n = expand_n(n, len(n_samp))
-        
-        # TODO: Additional checks?
+        xs = self._solved()['x']
+        a = 1 / n_samp
 
-        #NOTE: Overflow warning but not affecting results
-        eq = lambda x, N, a: ((x / (1 - x)) - (((N + 1) * x ** (N + 1)) / \
-                            (1 - x ** (N + 1)))) - (N * a)
         pmf = []
-        self.var['x'] = []
-        for tn_samp, ttot_obs, tn in zip(n_samp, tot_obs, n):
-            ta = 1 / tn_samp
+        for tn_samp, ttot_obs, tn, ta, x in zip(n_samp, tot_obs, n, a, xs):
 
             #Compute probability directly to save time
             if ta == 0.5: 
-                x = 1
                 tpmf = np.repeat(1 / (1 + ttot_obs), len(tn))
 
             # All values zero except ttot_obs
             elif ta == 1:
                 tpmf = np.zeros(len(tn))
                 tpmf[np.where(tn == ttot_obs)[0]] = 1
-                x = 0 
 
             else:
-                try:
-                    
-                    x = scipy.optimize.brentq(eq, 0, min((sys.float_info[0] *
-                        ta)**(1/float(ttot_obs)), 8), args=(ttot_obs, ta), 
-                        disp=False, xtol=1e-60)
-                except: 
-                    try: # Allows it to pass, but optimizer starts rounding.
-                         # Not Sure why it is doing this.
-                        x = scipy.optimize.brentq(eq, 8.0, 50.0, \
-                                   args=(ttot_obs, ta), disp=False, xtol=1e-60)
-                    except:
-
-                        raise ValueError("No solution to %s.pmf when tot_obs = " %
-                                     (self.__class__.__name__) +
-                                     "%.2f, n_samp = %.10f and a = %.10f" % 
-                                     (ttot_obs, tn_samp, ta))
                 z = (1 - x ** (ttot_obs + 1)) / (1 - x)
                 tpmf = (1 / z) * (x ** tn)
 
             pmf.append(tpmf)
-            self.var['x'].append(x)
 
         return pmf
 
+    @doc_inherit
+    def logpmf(self, n):
+
+        # Get parameters
+        n_samp, tot_obs = self.get_params(['n_samp', 'tot_obs'])
+        n = expand_n(n, len(n_samp))
+        xs = self._solved()['x']
+        a = 1 / n_samp
+
+        logpmf = []
+        for ttot_obs, tn, ta, x in zip(tot_obs, n, a, xs):
+
+            if ta == 0.5: 
+                tlogpmf = np.repeat(-np.log1p(ttot_obs), len(tn))
+
+            elif ta == 1:
+                tlogpmf = np.repeat(-np.inf, len(tn))
+                tlogpmf[np.where(tn == ttot_obs)[0]] = 0
+
+            else:
+                logz = np.log(_geo_sum(x, ttot_obs)[0] + 1)
+                tlogpmf = tn * np.log(x) - logz
+
+            logpmf.append(tlogpmf)
+
+        return logpmf
+
+    @doc_inherit
+    def p_absent(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        log_x, log_z = self._log_norm(tot_obs, a)
+        p = np.exp(-log_z)
+        p[a == 1] = tot_obs[a == 1] == 0
+        return p
+
+    @doc_inherit
+    def p_all(self, tot_obs, a):
+        tot_obs, a = _abund_area(tot_obs, a)
+        log_x, log_z = self._log_norm(tot_obs, a)
+        p = np.exp(tot_obs * log_x - log_z)
+        p[a == 1] = 1
+        return p
+
+    def _log_norm(self, tot_obs, a):
+        '''
+        Returns log(x) and the log of the normalizing constant z, the sum of
+        x ** i for i = 0 to tot_obs, for each abundance.
+        '''
+        x = np.ones(len(a))
+        solve_ind = a != 1
+        if np.any(solve_ind):
+            x[solve_ind] = tgeo(tot_obs=tot_obs[solve_ind], n_samp=1 /
+                                a[solve_ind])._solve()['x']
+
+        # For x > 1 the sum is taken over powers of 1 / x to avoid overflow
+        log_x = np.log(x)
+        big = x > 1
+        log_z = np.log1p(_geo_sum(np.where(big, 1 / x, x), tot_obs))
+        log_z[big] += tot_obs[big] * log_x[big]
+        return log_x, log_z
+
 class mete_sar_iter(Curve):
     __doc__ = Curve.__doc__ + \
     '''
@@ -2584,7 +3780,13 @@ class mete_sar_iter(Curve):
     -----
     This class uses method 1 in Harte (2011) to calculate the SAR.  It is much
     faster than the equivalent object gen_sar(logser_ut, tgeo) because of the
-    approximations used. 
+    approximations used. Areas with more than _SAR_DIRECT_MAX individuals
+    are calculated with closed form and asymptotic sums in bounded memory
+    (see _upscale_step), so the SAR can be iterated to very large areas.
+
+    With method='table', iter_vals and univ_curve interpolate each doubling
+    and halving from a table that is built once and shared by all sites (see
+    mete_sar_table), which is much faster when predicting many sites.
     
     '''
     
@@ -2600,7 +3802,7 @@ class mete_sar_iter(Curve):
                                   " 'mete_sar_iter'")
 
     def iter_vals(self, a_list=None, upscale=0, downscale=0, non_iter=False,
-                                                                     **kwargs):
+                                                      method='iter', **kwargs):
         '''
         Predict the universal SAR curve for the given S and N found at 
         the given anchor scale
@@ -2618,6 +3820,9 @@ class mete_sar_iter(Curve):
         non_iter : bool
             If False, returns all iterations.  If True, only returns iterations
             that match a_list.
+        method : str
+            'iter' (default) iterates the METE SAR exactly. 'table'
+            interpolates each step from the table of mete_sar_table.
 
         Returns
         -------
@@ -2644,9 +3849,12 @@ class mete_sar_iter(Curve):
             a_list = make_array(a_list)
         if not np.iterable(a_list) and a_list is not None:
             raise TypeError('a_list is not an array-like object')
+        if method not in ('iter', 'table'):
+            raise ValueError("Parameter 'method' with value '%s' is not " %
+                             method + "supported")
 
         anch = 1
-        if a_list != None:
+        if a_list is not None:
             upscale, downscale = set_up_and_down(anch, a_list)
         
         if upscale == 0 and downscale == 0:
@@ -2656,10 +3864,14 @@ class mete_sar_iter(Curve):
         sar = np.empty(len(areas), dtype=[('items', np.float),
                                       ('area', np.float)])
         sar['area'] = areas
-        if upscale != 0:
-            sar['items'][downscale:] = _upscale_sar_(areas[downscale:], N, S)
-        if downscale != 0:
-            sar['items'][:downscale + 1] =\
+        if method == 'table':
+            sar['items'] = mete_sar_table(S, N, upscale, downscale)[0]
+        else:
+            if upscale != 0:
+                sar['items'][downscale:] = _upscale_sar_(areas[downscale:], N,
+                                                         S)
+            if downscale != 0:
+                sar['items'][:downscale + 1] =\
                                    _downscale_sar_(areas[:downscale + 1], N, S)
 
         if non_iter == False:
@@ -2671,10 +3883,12 @@ class mete_sar_iter(Curve):
             return sar[ind]
 
     @doc_inherit
-    def univ_curve(self, num_iter=5, direction='down', **kwargs):
+    def univ_curve(self, num_iter=5, direction='down', method='iter',
+                                                                   **kwargs):
 
         return super(mete_sar_iter, self).univ_curve(num_iter=num_iter,
-                  direction=direction, param='tot_obs', iterative=True, base=2)
+                  direction=direction, param='tot_obs', iterative=True, base=2,
+                  method=method)
         
     def fit(self, *args):
         '''
@@ -2805,11 +4019,17 @@ class gen_sar(Curve):
     plognorm and plognorm_lt are not supported by gen_sar. If one would like
     them to be supported, the full pmf for the sad must be calculated in the
     fit method.
+
+    The probability that a species with abundance n is present in (or endemic
+    to) an area does not depend on the anchor, so it is kept in a table over
+    n for each area and reused by all vals, iter_vals and univ_curve calls.
+    The sad pmfs evaluated while upscaling are kept as well. Neither the sad
+    nor the ssad object is changed by vals.
     
 
     '''
 
-    def __init__(self, sad, ssad, **kwargs):
+    def __init__(self, sad, ssad, interp=False, **kwargs):
         '''
 
         Parameters
@@ -2818,7 +4038,13 @@ class gen_sar(Curve):
             A Distribution object with minimum support equal to 1. pmf of sad
             from 1 to N should sum to approximately 1.
         ssad : a ssad distribution object
-            A distribution object with minimum support equal to 0.
+            A distribution object with minimum support equal to 0. Its
+            p_absent and p_all methods give the SAR and EAR.
+        interp : bool
+            If False (default), presence probabilities are calculated at each
+            area. If True, they are only calculated at _PRES_PER_DOUBLING
+            areas per doubling and interpolated linearly in log-area
+            in between.
 
         Notes
         -----
@@ -2828,7 +4054,10 @@ class gen_sar(Curve):
         '''
         self.sad = sad
         self.ssad = ssad
+        self.interp = interp
         self.params = kwargs
+        self._presence_tables = {}
+        self._sad_pmfs = OrderedDict()
 
     def get_name(self):
         '''
@@ -2902,7 +4131,7 @@ class gen_sar(Curve):
             raise TypeError('a_list is not an array-like object')
 
         anch = 1
-        if a_list != None:
+        if a_list is not None:
             upscale, downscale = set_up_and_down(anch, a_list, base=base)
 
         if upscale == 0 and downscale == 0:
@@ -2960,8 +4189,6 @@ class gen_sar(Curve):
             # Reset anchor values
             self.params['tot_obs'] = N
             self.params['n_samp'] = S
-            self.sad.params['tot_obs'] = N
-            self.sad.params['n_samp'] = S
 
             if up_down == 'down':
                 return np.array(S_list)[::-1]
@@ -2974,7 +4201,7 @@ class gen_sar(Curve):
         if downscale != 0:
             sar['items'][:downscale + 1] = up_down_scale(areas[:downscale +
                                                               1][::-1], 'down')
-        if non_iter == False or a_list == None:
+        if non_iter == False or a_list is None:
             return sar
         else:
             ind = np.zeros(len(sar), dtype=bool)
@@ -3014,6 +4241,10 @@ class gen_sar(Curve):
         exactly the same value at upscaling with the pmf.  However, the SAR
         curves should have the same general pattern.
 
+        All areas smaller than the anchor are calculated together from one
+        matrix of presence probabilities. Areas larger than the anchor are
+        each solved for separately.
+
         At the moment you cannot upscale the EAR.
         '''
         
@@ -3030,97 +4261,194 @@ class gen_sar(Curve):
         # Calculating sad in this method, not in fit.  More flexible this way.
         # However, this is a bit slower
         S, N = self.get_params(['n_samp', 'tot_obs'])
-        self.sad.params['n_samp'] = S; self.sad.params['tot_obs'] = N
 
         # Calculate either rad or full pmf
         if use_rad:
             # If n_samp is fractional, need to round
-            self.sad.params['n_samp'] = np.round(self.sad.params['n_samp'],
-                                                                    decimals=0)
-
-            rad = self.sad.rad()[0]
+            rad = self.sad._with_params(n_samp=np.round(S, decimals=0),
+                                        tot_obs=N).rad()[0]
         else:
-            sad = self.sad.pmf(np.arange(1, np.floor(N) + 1))[0]
-        ssad = self.ssad
-        sar = []
+            sad = self._sad_pmf(S, N)
 
         a_list = make_array(a_list)
-        for i, a in enumerate(a_list):
-            
-            #Setting ssad parameters differently if using rad 
+        sar = np.empty(len(a_list))
+
+        # Downscale all areas at once with a matrix of presence probabilities
+        # (areas x abundances)
+        down = a_list < 1
+        if np.any(down):
             if use_rad:
-                ssad.params['tot_obs'] = rad
+                p_pres = self._p_present_matrix(rad, 1 / a_list[down], form)
+                sar[down] = np.sum(p_pres, axis=1)
             else:
-                N_range = np.arange(1, len(sad) + 1)
-                ssad.params['tot_obs'] = N_range
-
-            # Upscale
-            if a > 1:
-
-                sad_params = deepcopy(self.sad.params)
-                def eq(Sbig, abig, S):
-                    # Setting distribution parameters for guess at upscale
-                    # NOTE: You can't refit plognorm when you upscale. 
-                    Nbig = np.round(abig * self.params['tot_obs'], decimals=0)
-                    self.sad.params['tot_obs'] = Nbig
-
-                    if use_rad:
-                        self.sad.params['n_samp'] = np.round(Sbig, decimals=0)
-                        ssad.params['tot_obs'] = self.sad.rad()[0]
-                    else:
-                        self.sad.params['n_samp'] = Sbig
-                        ssad.params['tot_obs'] = np.arange(1, Nbig + 1)
-                    ssad.params['n_samp'] = np.repeat(abig,
-                                                   len(ssad.params['tot_obs']))
-                    
-                    # Probability of presence list
-                    if form == 'sar':
-                        p_pres_list = [1 - absnt[0] for absnt in ssad.pmf(0)]
-                    elif form == 'ear':
-                        p_pres_list = [fval[0] for fval in 
-                                        ssad.pmf(zip(ssad.params['tot_obs']))]
-                        
-                    if use_rad:
-                        return sum(np.array(p_pres_list)) - S
-                    else:
-                        sadbig = self.sad.pmf(np.arange(1, Nbig + 1))[0]
-                        val = sum(Sbig * sadbig * np.array(p_pres_list)) - S
-                        return val
-                
-                #Optimizing to find Sbig. If error set to nan
-                try:
-                    Sbig = scipy.optimize.brentq(eq, S, a * S, args=(a, S), disp=0)
-                    sar.append(Sbig)
-                except(ValueError):
-                    print 'Could not calculate species number with values' +\
-                           ' a = %s and S = %s' % (str(a), str(S))
-                    sar.append(np.nan)
+                p_pres = self._p_present_matrix(np.arange(1, len(sad) + 1),
+                                                1 / a_list[down], form)
+                sar[down] = np.dot(p_pres, S * sad)
 
-                self.sad.params = sad_params # Reset sad params
+        if use_rad:
+            sar[a_list == 1] = S
+        else:
+            sar[a_list == 1] = np.sum(S * sad)
+
+        # Upscaled species numbers found so far, used to narrow the brackets
+        # of later solves
+        upscaled = []
+
+        for i in np.where(a_list > 1)[0]:
+            a = a_list[i]
 
-            elif a == 1:
+            # NOTE: You can't refit plognorm when you upscale. 
+            Nbig = np.round(a * N, decimals=0)
+
+            # Presence probabilities are read from the table for a, and
+            # sad pmfs are cached, so repeated evaluations are cheap
+            def eq(Sbig):
                 if use_rad:
-                    sar.append(S)
+                    big_abunds = self.sad._with_params(n_samp=np.round(
+                                 Sbig, decimals=0), tot_obs=Nbig).rad()[0]
+                    return np.sum(self._p_present(big_abunds, a, form)) - S
                 else:
-                    p_pres_list = np.repeat(1, len(N_range))
-                    sar.append(sum(S * sad * np.array(p_pres_list)))
+                    sadbig = self._sad_pmf(Sbig, Nbig)
+                    p_pres_big = self._p_present(np.arange(1, Nbig + 1),
+                                                 a, form)
+                    return np.sum(Sbig * sadbig * p_pres_big) - S
+
+            # Sbig increases with area, so solutions at smaller and larger
+            # areas bound this one. The full bracket is the fallback.
+            full = (np.squeeze(S), np.squeeze(a * S))
+            narrow = (max([full[0]] + [tS for ta, tS in upscaled if ta <
+                      a]), min([full[1]] + [tS for ta, tS in upscaled if
+                      ta > a]))
+            brackets = [full] if narrow == full else [narrow, full]
+
+            #Optimizing to find Sbig. If error set to nan
+            Sbig = np.nan
+            for lo, hi in brackets:
+                try:
+                    Sbig = scipy.optimize.brentq(eq, lo, hi, disp=0)
+                    break
+                except(ValueError):
+                    pass
 
-            # Downscale
+            if np.isnan(Sbig):
+                print 'Could not calculate species number with values' +\
+                       ' a = %s and S = %s' % (str(a), str(S))
             else:
-                ssad.params['n_samp'] = np.repeat(1 / a,
-                                                   len(ssad.params['tot_obs']))
-                if form == 'sar':
-                    p_pres_list = [1 - absnt[0] for absnt in ssad.pmf(0)]
-                elif form == 'ear':
-                    p_pres_list = [fval[0] for fval in 
-                                        ssad.pmf(zip(ssad.params['tot_obs']))]
-                if use_rad:
-                    sar.append(sum(np.array(p_pres_list)))
-                else:
-                    sar.append(sum(S * sad * np.array(p_pres_list)))
+                upscaled.append((a, Sbig))
+            sar[i] = Sbig
 
         return np.array(zip(sar, a_list), dtype=[('items', np.float), 
                                                   ('area', np.float)])
+
+    def _sad_pmf(self, S, N):
+        '''
+        Returns the sad pmf from 1 to N with n_samp S and tot_obs N. The most
+        recently used pmfs are kept, up to a total length of
+        _SAD_PMF_CACHE_MAX.
+        '''
+        fixed = dict((kw, val) for kw, val in self.sad.params.iteritems() if
+                                            kw not in ('tot_obs', 'n_samp'))
+        key = (self.sad.__class__.__name__, _params_key(fixed),
+               repr(float(np.squeeze(S))), repr(float(np.squeeze(N))))
+
+        pmf = self._sad_pmfs.pop(key, None)
+        if pmf is None:
+            pmf = self.sad._with_params(n_samp=S, tot_obs=N).pmf(np.arange(1,
+                                                    np.floor(N) + 1))[0]
+        self._sad_pmfs[key] = pmf
+
+        total = sum(len(tpmf) for tpmf in self._sad_pmfs.itervalues())
+        while total > _SAD_PMF_CACHE_MAX and len(self._sad_pmfs) > 1:
+            total -= len(self._sad_pmfs.popitem(last=False)[1])
+        return pmf
+
+    def _p_present(self, abunds, cells, form='sar'):
+        '''
+        Probability that a species with each abundance in abunds is present in
+        (form='sar'), or endemic to (form='ear'), one of cells equal parts of
+        its area. See _p_present_matrix.
+        '''
+        return self._p_present_matrix(abunds, [cells], form)[0]
+
+    def _p_present_matrix(self, abunds, cells, form='sar'):
+        '''
+        Presence (or endemic) probabilities for each number of cells in cells
+        (rows) and each abundance in abunds (columns).
+
+        Values for whole abundances are read from the table for each cells
+        (see _presence_tables_at). If self.interp is True, tables are only
+        made at _PRES_PER_DOUBLING values of cells per doubling, and values
+        are interpolated linearly in log(cells).
+        '''
+        abunds = make_array(abunds).astype(float)
+        cells = make_array(cells).astype(float)
+
+        # Fractional abundances, eg, from some rads, are not tabled
+        if np.any(abunds != np.round(abunds)) or np.any(abunds < 1):
+            return self._presence_col(np.tile(abunds, len(cells)),
+                    np.repeat(cells, len(abunds)), form).reshape(len(cells),
+                    len(abunds))
+
+        ind = abunds.astype(int) - 1
+        n_max = int(np.max(abunds))
+
+        if self.interp:
+            pos = np.log2(cells) * _PRES_PER_DOUBLING
+            lo, hi = np.floor(pos), np.ceil(pos)
+            w = pos - lo
+
+            # Areas on a node use their own table
+            on_node = lo == hi
+            lo_cells = np.where(on_node, cells, 2 ** (lo / _PRES_PER_DOUBLING))
+            hi_cells = np.where(on_node, cells, 2 ** (hi / _PRES_PER_DOUBLING))
+            tables = self._presence_tables_at(np.concatenate((lo_cells,
+                                                    hi_cells)), n_max, form)
+            p_lo = np.array([table[ind] for table in tables[:len(cells)]])
+            p_hi = np.array([table[ind] for table in tables[len(cells):]])
+            return (1 - w)[:, None] * p_lo + w[:, None] * p_hi
+
+        tables = self._presence_tables_at(cells, n_max, form)
+        return np.array([table[ind] for table in tables])
+
+    def _presence_tables_at(self, cells, n_max, form):
+        '''
+        Returns presence (or endemic) probabilities for abundances 1..n_max at
+        each number of cells in cells. Stored tables that are shorter are
+        extended together in one call to the ssad. Tables are kept for each
+        ssad and its parameters other than tot_obs and n_samp.
+        '''
+        fixed = dict((kw, val) for kw, val in self.ssad.params.iteritems() if
+                                            kw not in ('tot_obs', 'n_samp'))
+        fixed_key = (self.ssad.__class__.__name__, _params_key(fixed))
+        keys = [(form,) + fixed_key + (repr(float(tcells)),) for tcells in
+                                                                        cells]
+
+        # Missing abundances of each short table, with repeated areas once
+        short = OrderedDict()
+        for key, tcells in zip(keys, cells):
+            have = len(self._presence_tables.get(key, ()))
+            if have < n_max and key not in short:
+                short[key] = (tcells, np.arange(have + 1, n_max + 1))
+
+        if short:
+            new_abunds = [tabunds for tcells, tabunds in short.itervalues()]
+            new = self._presence_col(np.concatenate(new_abunds),
+                                     np.concatenate([np.repeat(tcells,
+                                     len(tabunds)) for tcells, tabunds in
+                                     short.itervalues()]), form)
+            splits = np.cumsum([len(tabunds) for tabunds in new_abunds])[:-1]
+            for key, tnew in zip(short.iterkeys(), np.split(new, splits)):
+                self._presence_tables[key] = np.concatenate((
+                            self._presence_tables.get(key, np.array([])), tnew))
+
+        return [self._presence_tables[key] for key in keys]
+
+    def _presence_col(self, abunds, cells, form):
+        '''Calculates presence (or endemic) probabilities with the ssad.'''
+        if form == 'sar':
+            return 1 - self.ssad.p_absent(abunds, 1 / cells)
+        else:
+            return self.ssad.p_all(abunds, 1 / cells)
     
     def fit(self, *args):
         '''
@@ -3154,6 +4482,168 @@ class gen_sar(Curve):
 #########################
 
 
+class METEState(object):
+    '''
+    State variables of METE (Harte 2011) with the Lagrange multipliers and
+    normalizing constants that depend on them. One state can be shared by
+    logser_ut, psi, theta and nu, so that these are solved once.
+
+    Parameters
+    ----------
+    n_samp : int or iterable
+        Total number of species / samples (S)
+    tot_obs: int or iterable
+        Total number of individuals / observations (N)
+    E : int, iterable or None
+        Total energy output of community. Only needed by the energy
+        distributions.
+
+    Attributes
+    ----------
+    n_samp, tot_obs, E : np.array
+        State variables, one element per parameter set
+    x : np.array
+        exp(-beta), 0 where n_samp = tot_obs
+    beta, lambda_1, lambda_2 : np.array
+        Lagrange multipliers, with beta = lambda_1 + lambda_2
+    sigma : np.array
+        lambda_1 + E * lambda_2
+    logser_norm : np.array
+        Normalizing constant of logser_ut
+    psi_norm : np.array
+        Normalizing constant of psi, Harte (2011) 7.22
+    nu_norm : np.array
+        Normalizing constant of nu
+
+    Notes
+    -----
+    Distributions take a state with the keyword state, eg,
+    psi(state=METEState(30, 400, 4000)), which sets their n_samp, tot_obs and
+    E. A distribution uses its state while its params equal the state
+    variables, and makes a new state otherwise, eg, after fit.
+
+    Attributes are calculated when first used, once for each distinct
+    parameter set, and are then fixed. A state is immutable, so copies of a
+    distribution, such as those made by freeze, share its state.
+
+    '''
+
+    def __init__(self, n_samp, tot_obs, E=None):
+        '''Initialize METEState object. See class docstring.'''
+
+        arrays = [make_array(n_samp), make_array(tot_obs)]
+        if E is not None:
+            arrays.append(make_array(E))
+        arrays = [np.array(arr, dtype=float) for arr in
+                                                np.broadcast_arrays(*arrays)]
+        for arr in arrays:
+            arr.flags.writeable = False
+
+        self.n_samp, self.tot_obs = arrays[:2]
+        self.E = arrays[2] if E is not None else None
+        self._vals = {}
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def matches(self, n_samp, tot_obs, E=None):
+        '''
+        True if the state variables equal n_samp, tot_obs and, if it is not
+        None, E.
+        '''
+        pairs = [(self.n_samp, n_samp), (self.tot_obs, tot_obs)]
+        if E is not None:
+            if self.E is None:
+                return False
+            pairs.append((self.E, E))
+        return all([np.array_equal(mine, make_array(other)) for mine, other
+                                                                   in pairs])
+
+    def _get(self, name, calc):
+        '''Returns the value name, calculated by calc on first use.'''
+        if name not in self._vals:
+            val = np.array(calc(), dtype=float)
+            val.flags.writeable = False
+            self._vals[name] = val
+        return self._vals[name]
+
+    def _energy(self):
+        '''Returns E, raising a TypeError if the state has none.'''
+        if self.E is None:
+            raise TypeError('E not found in METEState')
+        return self.E
+
+    def _distinct(self, calc):
+        '''
+        Calls calc with the index of the first of each distinct parameter set
+        and returns its result for every parameter set.
+        '''
+        sets = [self.n_samp, self.tot_obs]
+        if self.E is not None:
+            sets.append(self.E)
+        _, ind, inv = np.unique(np.column_stack(sets), axis=0,
+                                return_index=True, return_inverse=True)
+        return np.asarray(calc(ind), dtype=float)[inv]
+
+    @property
+    def x(self):
+        def calc(ind):
+            n_samp, tot_obs = self.n_samp[ind], self.tot_obs[ind]
+            x = np.zeros(len(ind))
+            solve = n_samp != tot_obs
+            if np.any(solve):
+                x[solve] = solve_beta(n_samp[solve], tot_obs[solve])
+            return x
+        return self._get('x', lambda: self._distinct(calc))
+
+    @property
+    def beta(self):
+        return self._get('beta', lambda: -np.log(self.x))
+
+    @property
+    def lambda_2(self):
+        # Harte (2011) 7.26
+        return self._get('lambda_2', lambda: self.n_samp / (self._energy() -
+                                                               self.tot_obs))
+
+    @property
+    def lambda_1(self):
+        return self._get('lambda_1', lambda: self.beta - self.lambda_2)
+
+    @property
+    def sigma(self):
+        return self._get('sigma', lambda: self.lambda_1 + self._energy() *
+                                                                 self.lambda_2)
+
+    @property
+    def logser_norm(self):
+        def calc():
+            norm = np.ones(len(self.n_samp))
+            solve = self.n_samp != self.tot_obs
+            norm[solve] = _log_sum(self.x[solve], self.tot_obs[solve])
+            return norm
+        return self._get('logser_norm', calc)
+
+    @property
+    def psi_norm(self):
+        # Harte (2011) 7.22, with the sums over n from _geo_sum
+        return self._get('psi_norm', lambda: (self.n_samp / (self.lambda_2 *
+                         self.tot_obs)) * (_geo_sum(1, self.tot_obs,
+                         log_x=-self.beta) - _geo_sum(1, self.tot_obs,
+                         log_x=-self.sigma)))
+
+    @property
+    def nu_norm(self):
+        # Integral of nu_pmf_eq from e_min to e_max. With
+        # t = beta / (lambda_2 * (e - 1)), it is an exponential integral
+        return self._get('nu_norm', lambda: (_exp1(self.beta) -
+                         _exp1(self.beta * self.tot_obs)) /
+                         np.log(self.n_samp / self.beta))
+
+
 class psi(Distribution):
     __doc__ = Distribution.__doc__ + \
     '''
@@ -3172,12 +4662,18 @@ class psi(Distribution):
     ------------------
     beta : list of floats
         The beta lagrange multiplier
+    lambda_1 : list of floats
+        The lambda1 lagrange multiplier
     lambda_2 : list of floats
         The lambda2 lagrange multiplier
+    norm : list of floats
+        Normalizing constant, Harte (2011) 7.22
 
     Notes
     -----
     All other lagrange multipliers can be calculated from beta and lambda_2.
+    n_samp, tot_obs and E may instead be given as a METEState with the
+    keyword state.
 
     '''
 
@@ -3185,46 +4681,32 @@ class psi(Distribution):
     def __init__(self, **kwargs):
 
         self.params = kwargs
+        _set_state(self)
         self.par_num = 2        
         self.min_supp = 1
         self.var = {}
 
+    def _solve(self):
+
+        n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
+        state = _get_state(self, n_samp, tot_obs, E)
+        _check_roots(state.x, self.__class__.__name__, tot_obs, n_samp)
+
+        return {'beta': state.beta, 'lambda_1': state.lambda_1, 'lambda_2':
+                state.lambda_2, 'norm': state.psi_norm}
+
     @doc_inherit
     def pdf(self, e):
         #Get and check parameters
         n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
         e = expand_n(e, len(n_samp))
 
-        start = 0.3
-        stop = 2
-        flmax = sys.float_info[0]
+        state = self._solved()
 
         pdf = []
-        self.var['beta'] = []
-        self.var['lambda_2'] = []
-
-        for tn_samp, ttot_obs, tE, te in zip(n_samp, tot_obs, E, e):
-            k = np.linspace(1, ttot_obs, num=ttot_obs)
 
-            try:
-                tx = scipy.optimize.brentq(beta_solver, start,
-                               min((flmax/tn_samp)**(1/float(ttot_obs)), stop), 
-                               args = (k, ttot_obs, tn_samp), disp=True)
-            except(ValueError):
-                raise ValueError("No solution to %s.pmf for tot_obs = %.2f"
-                                 % (self.__class__.__name__, ttot_obs) + 
-                                 " and n_samp = %.2f" % (tn_samp))
-
-            # Set lagrange multipliers
-            tbeta = -np.log(tx)
-            tl2 = float(tn_samp) / (tE - ttot_obs) # Harte (2011) 7.26
-            tl1 = tbeta - tl2
-            tsigma = tl1 + (tE * tl2)
-            
-            norm = (float(tn_samp) / (tl2 * ttot_obs)) * (((np.exp(-tbeta) - \
-                    np.exp(-tbeta*(ttot_obs + 1))) / (1 - np.exp(-tbeta))) - \
-                    ((np.exp(-tsigma) - np.exp(-tsigma*(ttot_obs + 1))) / \
-                    (1 - np.exp(-tsigma)))) #Harte (2011) 7.22
+        for tn_samp, ttot_obs, te, tbeta, tl2, norm in zip(n_samp, tot_obs, e,
+                         state['beta'], state['lambda_2'], state['norm']):
 
             #Notation from E.W.
             exp_neg_gamma = np.exp(-(tbeta + (te - 1) * tl2))
@@ -3242,10 +4724,31 @@ class psi(Distribution):
             #        (1 - exp_neg_gamma)))))
                     # Harte (2011) 7.24
             pdf.append(tpdf)
-            self.var['beta'].append(tbeta)
-            self.var['lambda_2'].append(tl2)
         
         return pdf
+
+    @doc_inherit
+    def logpdf(self, e):
+
+        #Get and check parameters
+        n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
+        e = expand_n(e, len(n_samp))
+        state = self._solved()
+
+        logpdf = []
+        for tn_samp, ttot_obs, te, tbeta, tl2, norm in zip(n_samp, tot_obs, e,
+                         state['beta'], state['lambda_2'], state['norm']):
+
+            # Log of Harte (2011) 7.24, with gamma = beta + (e - 1) * lambda_2
+            log_neg_gamma = -(tbeta + (te - 1) * tl2)
+            tlogpdf = np.log(float(tn_samp) / (ttot_obs * norm)) + \
+                      log_neg_gamma + np.log1p(-((ttot_obs + 1) *
+                      np.exp(log_neg_gamma * ttot_obs)) + (ttot_obs *
+                      np.exp(log_neg_gamma * (ttot_obs + 1)))) - \
+                      2 * np.log(-np.expm1(log_neg_gamma))
+            logpdf.append(tlogpdf)
+
+        return logpdf
     
     @doc_inherit
     def cdf(self, e):
@@ -3253,39 +4756,16 @@ class psi(Distribution):
         n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
         e = expand_n(e, len(n_samp))
 
-        start = 0.3
-        stop = 2
-        flmax = sys.float_info[0]
+        state = self._solved()
 
         cdf = []
 
-        self.var['beta'] = []
-        self.var['lambda_2'] = []
-
-        for tn_samp, ttot_obs, tE, te in zip(n_samp, tot_obs, E, e):
-            k = np.linspace(1, ttot_obs, num=ttot_obs)
-
-            try:
-                tx = scipy.optimize.brentq(beta_solver, start,
-                               min((flmax/tn_samp)**(1/float(ttot_obs)), stop), 
-                               args = (k, ttot_obs, tn_samp), disp=True)
-            except(ValueError):
-                raise ValueError("No solution to %s.cdf for tot_obs = %.2f"
-                                 % (self.__class__.__name__, ttot_obs) + 
-                                 " and n_samp = %.2f" % (tn_samp))
-
-            # Set lagrange multipliers
-            tbeta = -np.log(tx)
-            tl2 = float(tn_samp) / (tE - ttot_obs) # Harte (2011) 7.26
-            tl1 = tbeta - tl2
+        for te, tbeta, tl1, tl2 in zip(e, state['beta'], state['lambda_1'],
+                                                           state['lambda_2']):
 
             # Exact cdf equation. 
-            eq2 = lambda x: tbeta * ((1 / (1 - np.exp(tl1 + (tl2 * x)))) - 
-                                    (1 / (1 - np.exp(tl1 + tl2))))
-
-            cdf.append(eq2(te))
-            self.var['beta'].append(tbeta)
-            self.var['lambda_2'].append(tl2)
+            cdf.append(tbeta * ((1 / (1 - np.exp(tl1 + (tl2 * te)))) - 
+                                    (1 / (1 - np.exp(tl1 + tl2)))))
 
         return cdf
 
@@ -3294,9 +4774,7 @@ class psi(Distribution):
         
         n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
 
-        start = 0.3
-        stop = 2
-        flmax = sys.float_info[0]
+        state = self._solved()
 
         n_arrays = [np.arange(1, i + 1) for i in tot_obs]
         
@@ -3304,25 +4782,31 @@ class psi(Distribution):
         prad = lambda beta, r, tot_obs, l1, l2: (1 / l2) * np.log(((beta *\
                                    tot_obs) + r - 0.5) / (r - 0.5)) - (l1 / l2)
         rad = []
-        for tn_samp, ttot_obs, tE, tn, in zip(n_samp, tot_obs, E, n_arrays):
-
-            k = np.linspace(1, ttot_obs, num=ttot_obs)
-            try:
-                tx = scipy.optimize.brentq(beta_solver, start,
-                                min((flmax/tn_samp)**(1/float(ttot_obs)), stop), 
-                                args = (k, ttot_obs, tn_samp), disp=True)
-            except(ValueError):
-                raise ValueError("No solution to %s.rad for tot_obs = %.2f"
-                                 % (self.__class__.__name__, ttot_obs) + 
-                                 " and n_samp = %.2f" % (tn_samp))
-            tbeta = -np.log(tx)
-            tl2 = float(tn_samp) / (tE - ttot_obs) # Harte (2011) 7.26
-            tl1 = tbeta - tl2
+        for ttot_obs, tn, tbeta, tl1, tl2 in zip(tot_obs, n_arrays,
+                     state['beta'], state['lambda_1'], state['lambda_2']):
 
             trad = prad(tbeta, tn, ttot_obs, tl1, tl2)
             rad.append(trad)
 
         return rad
+
+    @doc_inherit
+    def rvs(self, size=1, random_state=None):
+
+        E = self.get_params(['n_samp', 'tot_obs', 'E'])[2]
+        state = self._solved()
+        random_state = _random_state(random_state)
+
+        # Inverse of the cdf, truncated at E
+        rvs = []
+        for tE, tbeta, tl1, tl2 in zip(E, state['beta'], state['lambda_1'],
+                                                           state['lambda_2']):
+            start = 1 / (1 - np.exp(tl1 + tl2))
+            u = random_state.random_sample(size) * tbeta * ((1 / (1 -
+                                            np.exp(tl1 + (tl2 * tE)))) - start)
+            rvs.append((np.log(1 - (1 / ((u / tbeta) + start))) - tl1) / tl2)
+
+        return rvs
         
 
     def fit(self, data):
@@ -3376,15 +4860,26 @@ class theta(Distribution):
     lambda_2 : list of floats
         The lambda2 lagrange multiplier
 
+    Notes
+    -----
+    n_samp, tot_obs and E may instead be given as a METEState with the keyword
+    state, which is shared by the species of a community.
+
     '''
 
     @doc_inherit
     def __init__(self, **kwargs): 
 
         self.params = kwargs
+        _set_state(self)
         self.par_num = 2
         self.min_supp = 1
         self.var = {}
+
+    def _solve(self):
+
+        n_samp, tot_obs, E, n = self.get_params(['n_samp', 'tot_obs', 'E','n'])
+        return {'lambda_2': _get_state(self, n_samp, tot_obs, E).lambda_2}
     
     @doc_inherit
     def pdf(self, e):
@@ -3395,21 +4890,38 @@ class theta(Distribution):
         # TODO: More checks?
         assert np.all(n <= tot_obs), 'n must be less than or equal to tot_obs'
 
+        lambda_2 = self._solved()['lambda_2']
 
         pdf = []
-        self.var['lambda_2'] = []
 
-        for tn_samp, ttot_obs, tE, tn, te in zip(n_samp, tot_obs, E, n, e):
+        for tE, tn, te, tl2 in zip(E, n, e, lambda_2):
 
-            tl2 = float(tn_samp) / (tE - ttot_obs)
             tpdf = (tn * tl2 * np.exp(-tl2 * tn * te)) / (np.exp(-tl2 * tn)\
                                 - np.exp(-tl2 * tn * tE)) #Harte (2011) 7.25
 
             pdf.append(tpdf)
-            self.var['lambda_2'].append(tl2)
         
         return pdf
 
+    @doc_inherit
+    def logpdf(self, e):
+
+        n_samp, tot_obs, E, n = self.get_params(['n_samp', 'tot_obs', 'E','n'])
+        e = expand_n(e, len(n_samp))
+
+        assert np.all(n <= tot_obs), 'n must be less than or equal to tot_obs'
+
+        lambda_2 = self._solved()['lambda_2']
+
+        logpdf = []
+        for tE, tn, te, tl2 in zip(E, n, e, lambda_2):
+            # Log of Harte (2011) 7.25
+            tlogpdf = np.log(tn * tl2) - tl2 * tn * (te - 1) - \
+                                        np.log(-np.expm1(-tl2 * tn * (tE - 1)))
+            logpdf.append(tlogpdf)
+
+        return logpdf
+
     @doc_inherit
     def cdf(self, e):
 
@@ -3419,57 +4931,78 @@ class theta(Distribution):
         # TODO: More checks?
         assert np.all(n <= tot_obs), 'n must be less than or equal to tot_obs'
 
+        lambda_2 = self._solved()['lambda_2']
 
         cdf = []
-        self.var['lambda_2'] = []
 
-        for tn_samp, ttot_obs, tE, tn, te in zip(n_samp, tot_obs, E, n, e):
-
-            tl2 = float(tn_samp) / (tE - ttot_obs)
+        for tn, te, tl2 in zip(n, e, lambda_2):
 
             # Exact cdf
             tcdf = -np.exp(tl2 * tn) * (np.exp(-tl2 * tn * te) - 
                                                         np.exp(-tl2 * tn))   
 
             cdf.append(tcdf)
-            self.var['lambda_2'].append(tl2)
         
         return cdf
 
-    @doc_inherit
-    def rad(self, tol=.1):
+    def rad(self, tol=None):
+        '''
+        Rank energy distribution of each species, from the inverse of the
+        exact cdf.
+
+        Parameters
+        ----------
+        tol : None
+            Not used, as the cdf is inverted in closed form. Kept for
+            compatibility.
+
+        Returns
+        -------
+        : list
+            A list of rank energy distributions
+
+        Notes
+        -----
+        e_max, where the cdf equals 1 - 1 / (2 * n), is
+        1 + log(2 * n) / (lambda_2 * n). All species are calculated together.
+
+        '''
 
         n_samp, tot_obs, E, n = self.get_params(['n_samp', 'tot_obs', 'E','n'])
         
         # TODO: More checks?
         assert np.all(n <= tot_obs), 'n must be less than or equal to tot_obs'
 
-        n_arrays = [np.arange(1, i + 1) for i in n]
+        lambda_2 = self._solved()['lambda_2']
+        e_max = 1 + np.log(2 * n) / (lambda_2 * n)
 
-        prad = lambda r, n, l2, e_max : 1 + (1 / (l2 * n)) * \
-                    np.log(1 / (((r - 0.5) / n) + np.exp(-l2 * n * (e_max))))
+        # Ranks of all species, with the parameters of their species
+        counts = n.astype(int)
+        ranks = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) -
+                                                          counts, counts) + 1
+        tn, tl2, te_max = [np.repeat(arr, counts) for arr in (n, lambda_2,
+                                                                      e_max)]
 
-        rad = []
-        terms= []
-        for tn_samp, ttot_obs, tE, tn, tn_arr in zip(n_samp, tot_obs, E, n, 
-                                                        n_arrays):
-            
-            tl2 = float(tn_samp) / (tE - ttot_obs)
+        rad = 1 + (1 / (tl2 * tn)) * np.log(1 / (((ranks - 0.5) / tn) +
+                                                  np.exp(-tl2 * tn * te_max)))
 
-            # Exact cdf
-            cdf_eq = lambda es: -np.exp(tl2 * tn) * (np.exp(-tl2 * tn * es) - 
-                                                        np.exp(-tl2 * tn))
+        return np.split(rad, np.cumsum(counts)[:-1])
 
-            # Calculate e_max for correction term
-            max_obs_cdf = 1 - (1 / (2 * tn))
-            min_func = lambda e_max: max_obs_cdf - cdf_eq(e_max)
-            e_max = scipy.optimize.brentq(min_func, 1, tE, disp=True)
-            terms.append((tn, e_max, np.exp(-tl2 * tn * (e_max))))
+    @doc_inherit
+    def rvs(self, size=1, random_state=None):
 
-            trad = prad(tn_arr, tn, tl2, e_max)
-            rad.append(trad)
+        n_samp, tot_obs, E, n = self.get_params(['n_samp', 'tot_obs', 'E','n'])
+        lambda_2 = self._solved()['lambda_2']
+        random_state = _random_state(random_state)
 
-        return rad
+        # Inverse of the cdf of the pdf, which is truncated at E
+        rvs = []
+        for tE, tn, tl2 in zip(E, n, lambda_2):
+            u = random_state.random_sample(size)
+            rvs.append(1 - np.log1p(u * np.expm1(-tl2 * tn * (tE - 1))) /
+                                                                    (tl2 * tn))
+
+        return rvs
 
     def fit(self, data):
         '''
@@ -3527,21 +5060,32 @@ class nu(Distribution):
         The beta lagrange multiplier
     lambda_2 : list of floats
         The lambda2 lagrange multiplier
-    sigma : list of floats
-        The sigma lagrange multiplier
+    norm : list of floats
+        Normalizing constant of the pmf
 
     Notes
     -----
-    This is a discrete distribution.
+    This is a discrete distribution. n_samp, tot_obs and E may instead be
+    given as a METEState with the keyword state.
     '''
 
     @doc_inherit
     def __init__(self, **kwargs):
         self.params = kwargs
+        _set_state(self)
         self.par_num = 2
         self.min_supp = 1
         self.var = {}
 
+    def _solve(self):
+
+        n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
+        state = _get_state(self, n_samp, tot_obs, E)
+        _check_roots(state.x, self.__class__.__name__, tot_obs, n_samp)
+
+        return {'beta': state.beta, 'lambda_2': state.lambda_2, 'norm':
+                state.nu_norm}
+
     @doc_inherit
     def pmf(self, e):
         '''
@@ -3559,51 +5103,22 @@ class nu(Distribution):
         n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
         e = expand_n(e, len(n_samp))
 
-        start = 0.3
-        stop = 2                                                           
-        flmax = sys.float_info[0]
+        state = self._solved()
         
         pmf = []
-        self.var['beta'] = []
-        self.var['lambda_2'] = []
 
-        for tn_samp, ttot_obs, tE, te in zip(n_samp, tot_obs, E, e):
-            k = np.linspace(1, ttot_obs, num=ttot_obs)
-            try:
-                tx = scipy.optimize.brentq(beta_solver, start,
-                               min((flmax/tn_samp)**(1/float(ttot_obs)), stop), 
-                               args = (k, ttot_obs, tn_samp), disp=True)
-            except(ValueError):
-                raise ValueError("No solution to %s.pmf for tot_obs = %.2f"
-                                 % (self.__class__.__name__, ttot_obs) + 
-                                 " and n_samp = %.2f" % (tn_samp))
+        for tn_samp, ttot_obs, te, tbeta, tl2, tnorm in zip(n_samp, tot_obs, e,
+                           state['beta'], state['lambda_2'], state['norm']):
 
-            # Set lagrange multipliers
-            tbeta = -np.log(tx)
-            tl2 = float(tn_samp) / (tE - ttot_obs) # Harte (2011) 7.26
+            # Values that aren't in range are zero
             e_max = 1 + (1 / tl2)
             e_min = 1 + (1 / (ttot_obs * tl2))
-            
-            norm = integrate.quad(nu_pmf_eq, e_min, e_max, (tbeta, tl2, 
-                                                                   tn_samp))[0]
-            tpmf = np.empty(len(te), dtype=float)
-            
-            # Parse values that aren't in range as set to zero
-            ind_tot = np.arange(len(tpmf))
-            ind_less = np.where(te >= e_min)[0]
-            ind_more = np.where(te <= e_max)[0]
-            ind_include = np.intersect1d(ind_more, ind_less)
-            ind_exclude = np.array(list(set(ind_tot) - set(ind_include)))
-            if len(ind_exclude) != 0:
-                tpmf[ind_exclude] = 0
-            
-            if len(ind_include) != 0:
-                tpmf[ind_include] =\
-                        nu_pmf_eq(te[ind_include], tbeta, tl2, tn_samp) / norm
+            include = (te >= e_min) & (te <= e_max)
+
+            tpmf = np.zeros(len(te))
+            tpmf[include] = nu_pmf_eq(te[include], tbeta, tl2, tn_samp) / tnorm
 
             pmf.append(tpmf)
-            self.var['beta'].append(tbeta)
-            self.var['lambda_2'].append(tl2)
 
         return pmf
     
@@ -3613,110 +5128,87 @@ class nu(Distribution):
         n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
         e = expand_n(e, len(n_samp))
 
-        start = 0.3
-        stop = 2                                                           
-        flmax = sys.float_info[0]
+        state = self._solved()
         
         cdf = []
-        self.var['beta'] = []
-        self.var['lambda_2'] = []
 
-        for tn_samp, ttot_obs, tE, te in zip(n_samp, tot_obs, E, e):
-            k = np.linspace(1, ttot_obs, num=ttot_obs)
-            try:
-                tx = scipy.optimize.brentq(beta_solver, start,
-                               min((flmax/tn_samp)**(1/float(ttot_obs)), stop), 
-                               args = (k, ttot_obs, tn_samp), disp=True)
-            except(ValueError):
-                raise ValueError("No solution to %s.pmf for tot_obs = %.2f"
-                                 % (self.__class__.__name__, ttot_obs) + 
-                                 " and n_samp = %.2f" % (tn_samp))
+        for tn_samp, ttot_obs, te, tbeta, tl2, tnorm in zip(n_samp, tot_obs, e,
+                           state['beta'], state['lambda_2'], state['norm']):
 
-            # Set lagrange multipliers
-            tbeta = -np.log(tx)
-            tl2 = float(tn_samp) / (tE - ttot_obs) # Harte (2011) 7.26
+            # Values that aren't in range are 0 or 1
             e_max = 1 + (1 / tl2)
             e_min = 1 + (1 / (ttot_obs * tl2))
+            include = (te >= e_min) & (te <= e_max)
 
-            tcdf = np.empty(len(te), dtype=float)
-
-            # Parse values that aren't in range as set to 0 or 1
-            ind_tot = np.arange(len(tcdf))
-            ind_less = np.where(te < e_min)[0]
-            ind_more = np.where(te > e_max)[0]
-            ind_combo = np.concatenate((ind_more, ind_less))
-            ind_include = np.array(list(set(ind_tot) - set(ind_combo)))
-            
-            if len(ind_less) != 0:
-                tcdf[ind_less] = 0
-            if len(ind_more) != 0:
-                tcdf[ind_more] = 1
-
-            norm = integrate.quad(nu_pmf_eq, e_min, e_max, (tbeta, tl2, 
-                                                                   tn_samp))[0] 
-            if len(ind_include) != 0:
-                tcdf[ind_include] = np.array([integrate.quad(nu_pmf_eq, e_min, se, 
-                                    (tbeta, tl2, tn_samp))[0] / norm for se in 
-                                    te[ind_include]])
+            tcdf = (te > e_max).astype(float)
+            tcdf[include] = (_exp1(tbeta / (tl2 * (te[include] - 1))) -
+                             _exp1(tbeta * ttot_obs)) / (np.log(tn_samp /
+                             tbeta) * tnorm)
 
             cdf.append(tcdf)
-            self.var['beta'].append(tbeta)
-            self.var['lambda_2'].append(tl2)
 
         return cdf
         
-    def rad(self, tol=.1):
+    def rad(self, tol=None):
         '''
         This rad uses the observed cdf for a given nu distribution and the
         predicted cdf to calculate the rank energy distribution.  
 
         Parameter
         ----------
-        tol : float
-            Precision interval.  The integral of nu is approximated at the
-            interval tol.  Smaller intervals can be more precise, but a tol
-            between 0.1 and 0.5 is more effecient and the results are changed
-            only marginally.
+        tol : None
+            Not used, as the cdf is inverted to full precision. Kept for
+            compatibility.
 
         Returns
         -------
         : list
             A list of rank energy distributions 
 
+        Notes
+        -----
+        The energy of the species at rank r is where the cdf equals
+        (r - 0.5) / n_samp. See _ppf.
+
         '''
     
-        n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
-        rad = []
-        
-        for tn_samp, ttot_obs, tE in zip(n_samp, tot_obs, E):
-
-            # Set temp params
-            self.params['n_samp'] = tn_samp
-            self.params['ttot_obs'] = ttot_obs
-            self.params['E'] = tE
+        n_samp = self.get_params(['n_samp', 'tot_obs', 'E'])[0]
+        return self._ppf([(np.arange(1, tn_samp + 1) - 0.5) / tn_samp for
+                                                           tn_samp in n_samp])
 
-            tl2 = float(tn_samp) / (tE - ttot_obs) # Harte (2011) 7.26
-            e_max = 1 + (1 / tl2)
-            e_min = 1 + (1 / (ttot_obs * tl2))
-            
-            num = np.round((e_max - e_min) / tol, decimals=0)
-            eng = np.linspace(e_min, e_max + tol, num=num)
-            diff = eng[1] - eng[0]
-
-            tcdf = np.cumsum(diff * self.pmf(eng)[0])
+    @doc_inherit
+    def rvs(self, size=1, random_state=None):
 
-            # Observed cdf. Not quite true if some energies overlap
-            obs_cdf = np.arange(1 / (2 * (tn_samp)), 1, 1/tn_samp)
+        n_samp = self.get_params(['n_samp', 'tot_obs', 'E'])[0]
+        random_state = _random_state(random_state)
+        u = [random_state.random_sample(size) for i in xrange(len(n_samp))]
+        return [trvs.reshape(np.shape(tu)) for trvs, tu in zip(self._ppf(
+                                             [tu.ravel() for tu in u]), u)]
 
-            trad = [eng[sum(oc >= tcdf) - 1] for oc in obs_cdf]
+    def _ppf(self, q):
+        '''
+        Inverse of the cdf at q, a list with one 1D array of probabilities for
+        each parameter set. The cdf is an exponential integral in
+        beta / (lambda_2 * (e - 1)), and it is inverted for all parameter sets
+        at once with batch_solver.
+        '''
+        n_samp, tot_obs, E = self.get_params(['n_samp', 'tot_obs', 'E'])
+        state = self._solved()
 
-            rad.append(trad)
+        # Probabilities of all parameter sets, with the parameters of their set
+        counts = [len(tq) for tq in q]
+        tot_obs, beta, lambda_2 = [np.repeat(arr, counts) for arr in (tot_obs,
+                                         state['beta'], state['lambda_2'])]
+        q = np.concatenate(q)
 
-        self.params['n_samp'] = n_samp
-        self.params['ttot_obs'] = tot_obs
-        self.params['E'] = E
+        # Exponential integral at each probability
+        low = _exp1(beta * tot_obs)
+        target = low + q * (_exp1(beta) - low)
+        eq = lambda e, beta, l2, target: _exp1(beta / (l2 * (e - 1))) - target
+        ppf = batch_solver(eq, 1 + (1 / (tot_obs * lambda_2)), 1 + (1 /
+                           lambda_2), args=(beta, lambda_2, target))
 
-        return rad
+        return np.split(ppf, np.cumsum(counts)[:-1])
 
 
     def fit(self, data):
@@ -3780,6 +5272,38 @@ def nu_pmf_eq(es, beta, l2, s):
     return (1 / np.log(s / beta)) * (np.exp(-beta / (l2 * (es - 1)))) / \
                                                                     (es - 1)
 
+def _random_state(random_state):
+    '''
+    Returns a np.random.RandomState from None (numpy's global RandomState),
+    an int seed or a RandomState.
+    '''
+    if random_state is None:
+        return np.random.mtrand._rand
+    if isinstance(random_state, np.random.RandomState):
+        return random_state
+    return np.random.RandomState(random_state)
+
+def _exp1(t):
+    '''
+    Exponential integral E1(t), the integral of exp(-u) / u from t to
+    infinity, continued to t < 0 as -Ei(-t). _exp1(a) - _exp1(b) is the
+    integral of exp(-u) / u from a to b for a and b of the same sign.
+
+    Parameters
+    ----------
+    t : float or np.array
+        Nonzero values at which to calculate E1
+
+    Returns
+    -------
+    : np.array
+
+    '''
+    t = np.asarray(t, dtype=float)
+    with np.errstate(over='ignore'):
+        return np.where(t > 0, scipy.special.exp1(np.abs(t)),
+                        -scipy.special.expi(-t))
+
 def beta_solver(x, k, tot_obs, n_samp):
     """ Used with a solver to get the beta lagrange multiplier in the METE
     distributions.  With a solver, this function
@@ -3789,8 +5313,9 @@ def beta_solver(x, k, tot_obs, n_samp):
     ----------
     x : float
         Lagrange multiplier x = e**-beta
-    k : np.array
-        np.arange(1, tot_obs + 1)
+    k : np.array or None
+        np.arange(1, tot_obs + 1). Not used, as the sums over k are
+        calculated with _geo_sum and _log_sum. Kept for compatibility.
     tot_obs : float
         The total number of individuals observed (N in METE, see Harte 2011)
     n_samp : float
@@ -3802,7 +5327,676 @@ def beta_solver(x, k, tot_obs, n_samp):
     """
 
     # Beta Solver
-    return sum(x ** k / float(tot_obs) * n_samp) -  sum((x ** k) / k)
+    return beta_eq(x, tot_obs, n_samp)[0]
+
+
+def batch_solver(func, start, stop, args=(), xtol=2e-12, rtol=4 *
+                 np.finfo(float).eps, maxiter=200):
+    '''
+    Vectorized bracketed root finder. Solves func(x, *args) = 0 for many
+    independent problems at once.
+
+    Parameters
+    ----------
+    func : function
+        Vectorized function of x and args. Called with 1D arrays, each
+        element of which is an independent problem.
+    start, stop : float or np.array
+        Lower and upper limits of the bracket containing each root
+    args : tuple
+        Additional arguments to func, floats or arrays broadcastable to start
+        and stop
+    xtol, rtol : float
+        Absolute and relative tolerance for the root of each problem
+    maxiter : int
+        Maximum number of iterations
+
+    Returns
+    -------
+    : np.array
+        Roots of each problem. Elements for which func does not change sign
+        between start and stop are nan.
+
+    Notes
+    -----
+    Uses the Illinois variant of regula falsi, falling back to bisection for
+    elements whose bracket does not at least halve in an iteration or whose
+    trial point is not finite. Only elements that have not yet converged are
+    passed to func in each iteration.
+
+    '''
+
+    arrays = np.broadcast_arrays(np.asarray(start, dtype=float),
+                    np.asarray(stop, dtype=float), *[np.asarray(arg) for arg
+                                                                 in args])
+    a = np.array(arrays[0], dtype=float).ravel()
+    b = np.array(arrays[1], dtype=float).ravel()
+    args = [np.array(arg).ravel() for arg in arrays[2:]]
+
+    if len(a) == 0:
+        return a
+
+    fa = np.asarray(func(a, *args), dtype=float)
+    fb = np.asarray(func(b, *args), dtype=float)
+
+    root = np.empty(len(a))
+    root.fill(np.nan)
+    root[fb == 0] = b[fb == 0]
+    root[fa == 0] = a[fa == 0]
+
+    active = np.where((fa * fb < 0) & np.isnan(root))[0]
+    bisect = np.zeros(len(a), dtype=bool)
+    width = np.abs(b - a)
+
+    for i in xrange(maxiter):
+        if len(active) == 0:
+            break
+
+        ta, tb, tfa, tfb = a[active], b[active], fa[active], fb[active]
+        targs = [arg[active] for arg in args]
+
+        # Regula falsi step, or bisection where it is unsafe
+        mid = 0.5 * (ta + tb)
+        c = tb - tfb * (tb - ta) / (tfb - tfa)
+        lo = np.minimum(ta, tb)
+        hi = np.maximum(ta, tb)
+        use_mid = bisect[active] | ~(c > lo) | ~(c < hi)
+        c[use_mid] = mid[use_mid]
+        fc = np.asarray(func(c, *targs), dtype=float)
+
+        # Retry non-finite function values at the midpoint
+        bad = ~np.isfinite(fc) & ~use_mid
+        if np.any(bad):
+            c[bad] = mid[bad]
+            fc[bad] = func(c[bad], *[arg[bad] for arg in targs])
+
+        # Keep the endpoint on the other side of the root. Illinois
+        # modification halves a retained endpoint's function value.
+        flip = fc * tfb < 0
+        new_a = np.where(flip, tb, ta)
+        new_fa = np.where(flip, tfb, 0.5 * tfa)
+        a[active], fa[active] = new_a, new_fa
+        b[active], fb[active] = c, fc
+
+        new_width = np.abs(c - new_a)
+        bisect[active] = new_width > 0.5 * width[active]
+        width[active] = new_width
+
+        done = (fc == 0) | (new_width <= xtol + rtol * np.abs(c))
+        failed = ~np.isfinite(fc)
+        root[active[done]] = c[done]
+        active = active[~done & ~failed]
+
+    if len(active) != 0:
+        raise RuntimeError('batch_solver failed to converge after %i ' % 
+                            maxiter + 'iterations')
+
+    return root
+
+
+def _check_roots(roots, method, tot_obs, n_samp):
+    '''
+    Raises a ValueError naming the first parameter set that has no solution
+    (a nan root) from batch_solver.
+    '''
+    bad = np.where(np.isnan(roots))[0]
+    if len(bad) != 0:
+        raise ValueError("No solution to %s when tot_obs = %.2f" % (method,
+                         tot_obs[bad[0]]) + " and n_samp = %.2f" % 
+                         (n_samp[bad[0]]))
+
+
+def beta_eq(x, tot_obs, n_samp):
+    '''
+    Vectorized form of beta_solver, for use with batch_solver.
+
+    Parameters
+    ----------
+    x : np.array
+        Lagrange multipliers x = e**-beta
+    tot_obs : np.array
+        The total number of individuals observed (N in METE)
+    n_samp : np.array
+        The total number of species observed (S in METE)
+
+    Returns
+    -------
+    : np.array
+
+    '''
+
+    x, tot_obs, n_samp = np.broadcast_arrays(np.asarray(x, dtype=float),
+                                        np.asarray(tot_obs, dtype=float),
+                                        np.asarray(n_samp, dtype=float))
+
+    return _geo_sum(x, tot_obs) * n_samp / tot_obs - _log_sum(x, tot_obs)
+
+
+def _geo_sum(x, N, log_x=None):
+    '''
+    Sum of x ** k for k = 1 to N, calculated in closed form.
+
+    Parameters
+    ----------
+    x : float or np.array
+        Ratio of the geometric series, x > 0
+    N : float or np.array
+        Number of terms
+    log_x : float or np.array
+        If not None, log(x), which is used in place of x. Gives full
+        precision when x is within a few ulps of 1.
+
+    Returns
+    -------
+    : np.array
+
+    '''
+
+    if log_x is not None:
+        x = np.exp(log_x)
+    x, N = np.broadcast_arrays(np.asarray(x, dtype=float), 
+                               np.asarray(N, dtype=float))
+    x = np.atleast_1d(x)
+    N = np.atleast_1d(N)
+    if log_x is None:
+        lx = np.log(x)
+    else:
+        lx = np.broadcast_to(np.asarray(log_x, dtype=float), x.shape)
+
+    # x * (1 - x**N) / (1 - x), written with expm1 to keep precision near 1
+    one = lx == 0
+    tot = np.empty(x.shape)
+    with np.errstate(over='ignore', invalid='ignore'):
+        tot[~one] = x[~one] * np.expm1(N[~one] * lx[~one]) / np.expm1(lx[~one])
+    tot[one] = N[one]
+    return tot
+
+
+# Bernoulli numbers B_2, B_4, ..., B_16 used by _log_sum
+_BERNOULLI = np.array([1 / 6, -1 / 30, 1 / 42, -1 / 30, 5 / 66, -691 / 2730,
+                       7 / 6, -3617 / 510])
+
+
+def _log_sum(x, N, direct=64, log_x=None):
+    '''
+    Sum of x ** k / k for k = 1 to N (the truncated log series), calculated
+    without allocating an array of length N.
+
+    Parameters
+    ----------
+    x : float or np.array
+        x > 0
+    N : float or np.array
+        Number of terms
+    direct : int
+        Number of leading terms that are summed directly
+    log_x : float or np.array
+        If not None, log(x), which is used in place of x. See _geo_sum.
+
+    Returns
+    -------
+    : np.array
+
+    Notes
+    -----
+    The first direct terms are summed exactly. The remaining terms, from
+    a = direct + 1 to b = N, are calculated with the Euler-Maclaurin formula
+    for f(k) = exp(c * k) / k, c = log(x), whose integral is
+    Ei(c * b) - Ei(c * a). Corrections up to the 15th derivative of f are
+    included, which bounds the relative error of the remainder by roughly
+    (max(|c|, 1 / a) / (2 * pi)) ** 16. In the range of x used by the METE
+    solvers this is below double precision.
+
+    '''
+
+    if log_x is not None:
+        x = np.exp(log_x)
+    x, N = np.broadcast_arrays(np.asarray(x, dtype=float), 
+                               np.asarray(N, dtype=float))
+    x = np.atleast_1d(x)
+    N = np.atleast_1d(N)
+    if log_x is None:
+        c = np.log(x)
+    else:
+        c = np.broadcast_to(np.asarray(log_x, dtype=float), x.shape)
+
+    # Direct sum of the first terms
+    k = np.arange(1, direct + 1)
+    over = k[None, :] > N[:, None]
+    with np.errstate(over='ignore'):
+        terms = x[:, None] ** np.where(over, 0, k[None, :]) / k[None, :]
+    terms[over] = 0
+    tot = np.sum(terms, axis=1)
+
+    # Euler-Maclaurin for the remaining terms
+    rem = N > direct
+    if np.any(rem):
+        tc = c[rem]
+        a = float(direct + 1)
+        b = N[rem]
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            zero = tc == 0
+            integral = np.empty(len(tc))
+            integral[zero] = np.log(b[zero] / a)
+            integral[~zero] = scipy.special.expi(tc[~zero] * b[~zero]) - \
+                              scipy.special.expi(tc[~zero] * a)
+
+            ea = np.exp(tc * a)
+            eb = np.exp(tc * b)
+            em = integral + (ea / a + eb / b) / 2
+
+            # f^(m)(k) = exp(c * k) * sum_i m! / (m - i)! * c**(m - i) * 
+            # (-1)**i / k**(i + 1)
+            for j, bern in enumerate(_BERNOULLI):
+                order = 2 * j + 1
+                da = np.zeros(len(tc))
+                db = np.zeros(len(tc))
+                for i in xrange(order + 1):
+                    coef = (-1) ** i * m.factorial(order) / \
+                           m.factorial(order - i)
+                    da += coef * tc ** (order - i) / a ** (i + 1)
+                    db += coef * tc ** (order - i) / b ** (i + 1)
+                em += bern / m.factorial(2 * j + 2) * (eb * db - ea * da)
+
+        tot[rem] += em
+
+    return tot
+
+
+def solve_beta(n_samp, tot_obs):
+    '''
+    Solves for x = e**-beta in the METE distributions for arrays of n_samp and
+    tot_obs in a single call to batch_solver.
+
+    Parameters
+    ----------
+    n_samp : np.array
+        The total number of species observed (S in METE)
+    tot_obs : np.array
+        The total number of individuals observed (N in METE)
+
+    Returns
+    -------
+    : np.array
+        x for each pair of n_samp and tot_obs, nan if there is no solution
+
+    '''
+    def solve(n_samp, tot_obs):
+        start = 0.3
+        stop = np.minimum((sys.float_info[0] / n_samp) ** (1 / tot_obs), 2)
+        return batch_solver(beta_eq, start, stop, args=(tot_obs, n_samp))
+
+    return _memo_solve('beta', solve, n_samp, tot_obs)
+
+def share_mete_state(dists):
+    '''
+    Gives distributions that take a METEState and have the same n_samp,
+    tot_obs and E one shared state, so that its Lagrange multipliers and
+    normalizing constants are solved once.
+
+    Parameters
+    ----------
+    dists : list
+        Distribution objects. Those without a state attribute are ignored.
+
+    '''
+    states = []
+    for dist in dists:
+        if not hasattr(dist, 'state'):
+            continue
+        # Parameters are broadcast as in the distribution's methods
+        names = [name for name in ['n_samp', 'tot_obs', 'E', 'n'] if name in
+                                                                  dist.params]
+        params = dist.get_params(names)[:3]
+        for state in states:
+            if state.matches(*params) and (len(params) == 2 or state.E is not
+                                                                         None):
+                break
+        else:
+            state = METEState(*params)
+            states.append(state)
+        dist.state = state
+
+def _set_state(dist):
+    '''
+    Pops the keyword state from dist.params and sets n_samp, tot_obs and, if
+    the state has it, E from that METEState.
+    '''
+    dist.state = dist.params.pop('state', None)
+    if dist.state is not None:
+        dist.params['n_samp'] = dist.state.n_samp
+        dist.params['tot_obs'] = dist.state.tot_obs
+        if dist.state.E is not None:
+            dist.params['E'] = dist.state.E
+
+def _get_state(dist, n_samp, tot_obs, E=None):
+    '''
+    Returns the METEState of dist if it matches n_samp, tot_obs and E, and
+    otherwise a new METEState.
+    '''
+    state = getattr(dist, 'state', None)
+    if state is None or not state.matches(n_samp, tot_obs, E):
+        state = METEState(n_samp, tot_obs, E)
+    return state
+
+
+def _memo_solve(name, solver, *params):
+    '''
+    Looks up the solution for each parameter set in solve_cache and calls
+    solver once with the parameter sets that are not cached.
+
+    Parameters
+    ----------
+    name : str
+        Name of the solve, used as part of the cache key
+    solver : function
+        Function taking arrays of params and returning an array of solutions,
+        with nan where there is no solution. nan results are not cached.
+    params : np.arrays
+        Parameters of each solve
+
+    Returns
+    -------
+    : np.array
+        Solutions for each parameter set
+
+    '''
+    params = [make_array(param).astype(float) for param in params]
+    keys = zip(*params)
+    vals = solve_cache.get_many(name, keys)
+
+    miss = np.where(np.isnan(vals))[0]
+    if len(miss) != 0:
+        vals[miss] = solver(*[param[miss] for param in params])
+        solved = miss[~np.isnan(vals[miss])]
+        solve_cache.set_many(name, [keys[i] for i in solved], vals[solved])
+
+    return vals
+
+
+def _mle(func, starts, bounds=None, step=1e-5):
+    '''
+    Minimizes a negative log-likelihood with L-BFGS-B and analytic gradients.
+
+    Parameters
+    ----------
+    func : function
+        Function of the parameter vector returning the negative
+        log-likelihood and its gradient
+    starts : list of array-like objects
+        Candidate starting points, eg, a default guess and the solution for
+        the previous data set. The optimizer starts from the candidate with
+        the lowest negative log-likelihood. None entries are skipped.
+    bounds : list of tuples
+        (min, max) for each parameter, with None for no bound
+    step : float
+        Relative step of the finite differences of the gradient used for the
+        Hessian
+
+    Returns
+    -------
+    : np.array
+        Parameters at the minimum
+    : np.array
+        Standard errors of the parameters from the inverse of the Hessian,
+        nan if the Hessian is not positive definite
+
+    '''
+    starts = [np.atleast_1d(np.asarray(start, dtype=float)) for start in
+                                                   starts if start is not None]
+    with np.errstate(all='ignore'):
+        nlls = [func(start)[0] for start in starts]
+    x0 = starts[np.nanargmin(nlls)]
+
+    with np.errstate(all='ignore'):
+        x, nll, info = scipy.optimize.fmin_l_bfgs_b(func, x0, bounds=bounds,
+                                                   factr=10, pgtol=1e-10)
+
+    # Hessian from central differences of the gradient
+    hess = np.empty((len(x), len(x)))
+    with np.errstate(all='ignore'):
+        for i in xrange(len(x)):
+            h = step * max(1, abs(x[i]))
+            dx = np.zeros(len(x))
+            dx[i] = h
+            hess[:, i] = (func(x + dx)[1] - func(x - dx)[1]) / (2 * h)
+    hess = (hess + hess.T) / 2
+
+    if np.all(np.isfinite(hess)) and np.all(np.linalg.eigvalsh(hess) > 0):
+        se = np.sqrt(np.diag(np.linalg.inv(hess)))
+    else:
+        se = np.repeat(np.nan, len(x))
+
+    return x, se
+
+
+def _nbd_k_newton(X, W, mu, k0=1, trunc=False, tol=1e-10, maxiter=100):
+    '''
+    Solves the score equation of the nbd for k, for all rows of X at once,
+    with Newton's method on log(k).
+
+    Parameters
+    ----------
+    X : np.array
+        Matrix of data with one row for each data set, eg, the abundances of
+        one species in each cell, or the unique abundances of one species
+    W : np.array
+        Weights of the elements of X, eg, 1 for data (or the counts of unique
+        values) and 0 for padding
+    mu : array-like object
+        Mean of the nbd for each row
+    k0 : float
+        Starting value of k
+    trunc : bool
+        If True, k is solved for the zero truncated nbd
+    tol : float
+        Rows have converged when the Newton step in log(k) is below tol
+    maxiter : int
+        Maximum number of iterations
+
+    Returns
+    -------
+    : np.array
+        k for each row, nan for rows that did not converge
+    : np.array
+        Standard error of k from the second derivative of the log-likelihood
+
+    Notes
+    -----
+    Steps are limited to a factor of e in k. Where the log-likelihood is not
+    concave in log(k), the step is a factor of e uphill.
+
+    '''
+    digamma = scipy.special.digamma
+    trigamma = lambda x: scipy.special.polygamma(1, x)
+    mu = make_array(mu).astype(float)
+    S = np.sum(W, axis=1)
+    sum_x = np.sum(W * X, axis=1)
+
+    def derivs(k, X, W, S, sum_x, mu):
+        '''First and second derivatives of the log-likelihood in k.'''
+        tk = k[:, None]
+        p = k / (k + mu)
+        score = (np.sum(W * (digamma(X + tk) - digamma(tk)), axis=1) + S *
+                 (np.log(p) + 1) - (S * k + sum_x) / (k + mu))
+        hess = (np.sum(W * (trigamma(X + tk) - trigamma(tk)), axis=1) + S *
+                (1 / k - 1 / (k + mu)) - (S * mu - sum_x) / (k + mu) ** 2)
+
+        # Truncation adds -log(1 - p**k) to each observation
+        if trunc:
+            q = p ** k
+            a = np.log(p) + 1 - p
+            da = mu / (k * (k + mu)) - mu / (k + mu) ** 2
+            score += S * q * a / (1 - q)
+            hess += S * (q * da / (1 - q) + q * a ** 2 / (1 - q) ** 2)
+
+        return score, hess
+
+    logk = np.repeat(np.log(k0), len(X)).astype(float)
+    done = np.zeros(len(X), dtype=bool)
+    active = np.arange(len(X))
+
+    with np.errstate(all='ignore'):
+        for i in xrange(maxiter):
+            k = np.exp(logk[active])
+            score, hess = derivs(k, X[active], W[active], S[active],
+                                 sum_x[active], mu[active])
+
+            # Derivatives in log(k)
+            g = k * score
+            h = k ** 2 * hess + g
+            step = np.where(h < 0, -g / h, np.sign(g))
+            step = np.clip(step, -1, 1)
+            logk[active] += step
+
+            conv = np.abs(step) < tol
+            done[active[conv]] = True
+            active = active[~conv & np.isfinite(step)]
+            if len(active) == 0:
+                break
+
+        k = np.exp(logk)
+        score, hess = derivs(k, X, W, S, sum_x, mu)
+        se = 1 / np.sqrt(-hess)
+
+    # Rows that did not converge, or ran off to k = 0 or infinity
+    bad = ~done | (k < 1e-10) | (k > 1e10) | ~np.isfinite(se)
+    k[bad] = np.nan
+    se[bad] = np.nan
+
+    return k, se
+
+
+def _dgamma_norm(alpha, theta, tot_obs):
+    '''
+    Log of the normalizing sum of the discrete gamma, sum(k**(alpha - 1) *
+    theta**k) for k in 1..tot_obs, and the means of log(k) and k. Vectorized
+    over parameter sets and memoized in solve_cache.
+
+    Parameters
+    ----------
+    alpha, theta : array-like object
+        Parameters of the discrete gamma
+    tot_obs : array-like object
+        Upper limit of the sum
+
+    Returns
+    -------
+    : tuple of np.arrays
+        Log normalizing sum, mean of log(k) and mean of k
+
+    Notes
+    -----
+    The sum is taken in blocks of doubling length. For theta < 1, the terms
+    past the mode decrease at least as fast as a geometric series with ratio
+    (1 + 1 / k)**max(alpha - 1, 0) * theta, and the sum stops once that
+    bound on the rest is below 1e-17 of the total. For theta > 1 and alpha >=
+    1, the sum is taken down from tot_obs in the same way, with ratio 1 /
+    theta. Otherwise, all terms are summed.
+
+    '''
+    names = ['dgamma_lognorm', 'dgamma_mean_log', 'dgamma_mean_k']
+    params = [make_array(param).astype(float) for param in (alpha, theta,
+                                                            np.floor(tot_obs))]
+    params = np.broadcast_arrays(*params)
+    keys = zip(*params)
+    vals = [solve_cache.get_many(name, keys) for name in names]
+
+    miss = np.where(np.any(np.isnan(vals), axis=0))[0]
+    for i in miss:
+        talpha, ttheta, N = [param[i] for param in params]
+        logtheta = np.log(ttheta)
+
+        # Shift by the largest term to avoid overflow. Sum down from N if
+        # the terms only increase.
+        down = ttheta > 1 and talpha >= 1
+        if ttheta < 1 and talpha > 1:
+            peak = min(max((talpha - 1) / -logtheta, 1), N)
+        elif ttheta < 1:
+            peak = 1
+        else:
+            peak = max(N, 1)
+        shift = max([(talpha - 1) * np.log(tk) + tk * logtheta for tk in
+                                                                (1, peak)])
+
+        sums = np.zeros(3)
+        done = 0
+        block = 1024
+        while done < N:
+            if down:
+                k = np.arange(N - done, max(N - done - block, 0), -1)
+            else:
+                k = np.arange(done + 1, min(done + block, N) + 1)
+            g = np.exp((talpha - 1) * np.log(k) + k * logtheta - shift)
+            sums += [np.sum(g), np.sum(g * np.log(k)), np.sum(g * k)]
+            done += len(k)
+
+            # Bound on the rest of the sum
+            last = k[-1]
+            if down:
+                ratio = 1 / ttheta
+            else:
+                ratio = (1 + 1 / last) ** max(talpha - 1, 0) * ttheta
+            if (down or last >= peak) and ratio < 1 and g[-1] * ratio / (1 -
+                                                ratio) < 1e-17 * sums[0]:
+                break
+            block *= 2
+
+        for tvals, val in zip(vals, [shift + np.log(sums[0]), sums[1] /
+                                     sums[0], sums[2] / sums[0]]):
+            tvals[i] = val
+
+    if len(miss) != 0:
+        for name, tvals in zip(names, vals):
+            solve_cache.set_many(name, [keys[i] for i in miss], tvals[miss])
+
+    return tuple(vals)
+
+
+def _sugihara_chunk(job):
+    '''
+    Simulates a chunk of sequential breakage sequences of the sugihara
+    distribution at once, as a (sequences x species) array.
+
+    Parameters
+    ----------
+    job : tuple
+        Number of sequences, number of species, seed of the random numbers
+        and whether the niche that is broken is chosen in proportion to its
+        size (True) or uniformly (False)
+
+    Returns
+    -------
+    : tuple of np.arrays
+        Sum and sum of squares over the sequences of the proportion of each
+        species, sorted from least to most abundant
+
+    '''
+    size, S, seed, biased = job
+    rng = np.random.RandomState(seed)
+    U = rng.triangular(0.5, 0.75, 1, size=(size, max(S - 1, 0)))
+    rows = np.arange(size)
+
+    p = np.zeros((size, S))
+    p[:, 0] = 1
+    for i in xrange(1, S):
+
+        # Choose a niche in each sequence
+        u = rng.random_sample(size)
+        if biased:
+            index = np.sum(np.cumsum(p[:, :i], axis=1) < u[:, None], axis=1)
+            index = np.minimum(index, i - 1)
+        else:
+            index = (u * i).astype(int)
+
+        # Break it in two
+        niche = p[rows, index]
+        p[rows, index] = niche * U[:, i - 1]
+        p[:, i] = niche * (1 - U[:, i - 1])
+
+    p = np.sort(p, axis=1)
+    return np.sum(p, axis=0), np.sum(p ** 2, axis=0)
 
 
 def make_array(n):
@@ -3813,6 +6007,34 @@ def make_array(n):
         return np.array([n])
 
 
+def freq_table(data):
+    '''
+    Frequency table of data, eg, an SAD as abundance -> number of species.
+
+    Parameters
+    ----------
+    data : array-like object
+        1D data
+
+    Returns
+    -------
+    : tuple
+        Sorted unique values of data and the number of times each occurs
+
+    '''
+    return np.unique(np.asarray(data), return_counts=True)
+
+def _freq_tables(data, freq):
+    '''
+    Frequency table of each data set in data, or data itself as arrays if it
+    is already a list of frequency tables (freq=True).
+    '''
+    if freq:
+        return [(np.asarray(tvalues), np.asarray(tcounts)) for tvalues,
+                                                            tcounts in data]
+    return [freq_table(tdata) for tdata in data]
+
+
 def expand_n(n, size):
     '''Check dimensions of n and expand to match size if necessary.'''
     if np.iterable(n) and np.iterable(n[0]):  # If n is iterable of iterables
@@ -3884,21 +6106,15 @@ def make_rank_abund(pmf, n_samp, min_supp=1):
     pmf = pmf / np.sum(pmf)  # Ensure distribution is normalized
 
     points = np.arange(1/(2*n_samp), 1, 1/n_samp)
-    counts = np.zeros(n_samp)
-
     
     if min_supp == 1:
-        pmf = np.array([0] + list(pmf)) # Add 0 to start of pmf
+        pmf = np.concatenate(([0], pmf)) # Add 0 to start of pmf
     cum_pmf = np.cumsum(pmf)
-    
-    for cutoff in cum_pmf:
-        greater_thans = (points >= cutoff)
-        counts[greater_thans] += 1
 
-        if not greater_thans.any():  # If no greater thans, done with samples
-            break
+    # Abundance of each point is the number of cutoffs at or below it
+    counts = np.searchsorted(cum_pmf, points, side='right').astype(float)
     
-    return counts # / (sum(counts) / len(pmf))
+    return counts
 
 
 def canonical_lognorm_pmf(r, S, param_ret=False):
@@ -3947,6 +6163,122 @@ def canonical_lognorm_pmf(r, S, param_ret=False):
     pmf = (s0 / S) * np.exp(-(a ** 2) * (r ** 2)) 
     return pmf, s0, a
 
+def _pln_logpmf(n, mu, sigma, drop=40., grad=False):
+    '''
+    Log of the Poisson lognormal pmf, vectorized over n, mu and sigma.
+
+    Parameters
+    ----------
+    n : array-like object
+        Abundances
+    mu, sigma : float or array-like object
+        Parameters of the Poisson lognormal, broadcast against n. sigma > 0.
+    drop : float
+        Integrand is cut off where its log is drop below its maximum
+    grad : bool
+        If True, the derivatives of the log pmf with respect to mu and sigma
+        are returned as well
+
+    Returns
+    -------
+    : np.array
+        Log pmf at n
+    : tuple of np.arrays
+        Derivatives of log pmf with respect to mu and sigma. Only returned if
+        grad is True.
+
+    Notes
+    -----
+    For n <= 170, the mixing integral over t = log(lambda) is calculated with
+    fixed Gauss-Legendre nodes placed on panels around the mode of the
+    integrand. The mode, where n - exp(t) - (t - mu) / sigma**2 = 0, is
+    t = mu + sigma**2 * n - W(sigma**2 * exp(mu + sigma**2 * n)), with W the
+    Lambert W function. For n > 170, the asymptotic approximation in Bulmer
+    (1974) is used.
+
+    The derivatives are the posterior means of the scores of the normal
+    density, E[(t - mu) / sigma**2] and E[(t - mu)**2 / sigma**3] - 1 / sigma,
+    calculated with the same nodes.
+
+    '''
+    n, mu, sigma = np.broadcast_arrays(np.asarray(n, dtype=float),
+                np.asarray(mu, dtype=float), np.asarray(sigma, dtype=float))
+    logpmf = np.empty(n.shape)
+    dmu = np.empty(n.shape)
+    dsigma = np.empty(n.shape)
+
+    # Asymptotic approximation for large n
+    big = n > 170
+    if np.any(big):
+        tn, tmu, tsigma = n[big], mu[big], sigma[big]
+        z = (np.log(tn) - tmu) / tsigma
+        q = (z**2 + np.log(tn) - tmu - 1) / (2 * tn * tsigma**2)
+        logpmf[big] = (np.log1p(q) - 0.5 * z**2 - np.log(np.sqrt(2 * np.pi) *
+                       tsigma * tn))
+        dmu[big] = (-(2 * z / tsigma + 1) / (2 * tn * tsigma**2) / (1 + q) +
+                    z / tsigma)
+        dsigma[big] = ((-z**2 / (tn * tsigma**3) - 2 * q / tsigma) / (1 + q) +
+                       (z**2 - 1) / tsigma)
+
+    small = ~big
+    if not np.any(small):
+        if grad:
+            return logpmf, (dmu, dsigma)
+        return logpmf
+    n, mu, sigma = n[small], mu[small], sigma[small]
+    s2 = sigma ** 2
+
+    # Mode of the integrand from w = W(exp(z)), solving w + log(w) = z
+    z = np.log(s2) + mu + s2 * n
+    w = np.where(z > 1, z - np.log(np.maximum(z, 1)), np.exp(np.minimum(z,
+                                                                        1)))
+    for i in xrange(100):
+        w_new = w / (1 + w) * (1 + z - np.log(w))
+        if np.all(np.abs(w_new - w) <= 1e-14 * (1 + w_new)):
+            w = w_new
+            break
+        w = w_new
+    mode = mu + s2 * n - w
+
+    integrand = lambda t: n * t - np.exp(t) - 0.5 * ((t - mu) / sigma) ** 2
+    fmode = integrand(mode)
+
+    # The curvature is largest in magnitude at the mode, so the integrand
+    # falls by drop within d to the right. The left tail can be wider and
+    # its end is found with Newton steps.
+    d = sigma / np.sqrt(1 + w) * np.sqrt(2 * drop)
+    left = mode - d
+    for i in xrange(10):
+        diff = fmode - integrand(left) - drop
+        slope = -(n - np.exp(left) - (left - mu) / s2)
+        left = np.minimum(left - diff / slope, mode - d)
+
+    # Integrate panels, scaled by the maximum of the integrand
+    edges = [left, mode - d, mode - d / 3, mode, mode + d / 3, mode + d]
+    tot = np.zeros(len(n))
+    tot1 = np.zeros(len(n))
+    tot2 = np.zeros(len(n))
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        half = (hi - lo) / 2
+        t = ((hi + lo) / 2)[:, None] + half[:, None] * _PLN_NODES
+        ft = n[:, None] * t - np.exp(t) - 0.5 * ((t - mu[:, None]) /
+                                         sigma[:, None]) ** 2 - fmode[:, None]
+        wft = _PLN_WEIGHTS * np.exp(ft)
+        tot += half * np.sum(wft, axis=1)
+        if grad:
+            dt = t - mu[:, None]
+            tot1 += half * np.sum(wft * dt, axis=1)
+            tot2 += half * np.sum(wft * dt**2, axis=1)
+
+    logpmf[small] = (fmode + np.log(tot) - 0.5 * np.log(2 * np.pi * s2) - 
+                     scipy.special.gammaln(n + 1))
+
+    if grad:
+        dmu[small] = tot1 / tot / s2
+        dsigma[small] = tot2 / tot / (s2 * sigma) - 1 / sigma
+        return logpmf, (dmu, dsigma)
+    return logpmf
+
 def _ln_choose(n, k):
     '''
     Log binomial coefficient with extended gamma factorials. n and k may be int 
@@ -3955,6 +6287,21 @@ def _ln_choose(n, k):
     gammaln = scipy.special.gammaln
     return gammaln(n + 1) - (gammaln(k + 1) + gammaln(n - k + 1))
 
+def _fnbd_logpmf(n, N, a, k):
+    '''
+    Log pmf of the finite negative binomial (Zillio and He 2010) at n for
+    abundance N, cell to total area ratio a and aggregation parameter k.
+    Arguments are broadcast.
+    '''
+    return _ln_choose(n + k - 1, n) + _ln_choose(N - n + (k / a) - k - 1, N -
+                                        n) - _ln_choose(N + (k / a) - 1, N)
+
+def _abund_area(tot_obs, a):
+    '''Casts abundances and area ratios as float arrays of one length.'''
+    tot_obs = make_array(tot_obs).astype(float)
+    a = make_array(a).astype(float)
+    return tot_obs + 0 * a, a + 0 * tot_obs
+
 def set_up_and_down(anch, a_list, base=2):
     '''
     Sets the number of upscales and downscales given an a_list.
@@ -4006,6 +6353,8 @@ def _upscale_sar_(up_areas, N, S):
 
     returns:
         1D array of species at a given upscaled area
+
+    Doublings to more than _SAR_DIRECT_MAX individuals use _upscale_step.
     '''
 
     
@@ -4018,6 +6367,12 @@ def _upscale_sar_(up_areas, N, S):
         else:
             num_ind[i] = 2 * num_ind[i - 1]
             N2A = num_ind[i]
+            if N2A > _SAR_DIRECT_MAX:
+                spp[i] = _upscale_step(N2A, spp[i - 1])[0]
+                if np.isnan(spp[i]):
+                    raise ValueError('No solution to the METE SAR when ' +
+                                     'doubling to N = %.2f' % N2A)
+                continue
             n = np.linspace(1, N2A, num=N2A)
             eq1 = lambda x: (sum((x**n)/n) * ((N2A) / ((x - x**(N2A + 1)) / \
                             (1 - x)) * (1 / x))) - ((N2A) * ((1 - x) / \
@@ -4044,6 +6399,8 @@ def _downscale_sar_(down_areas, N, S):
 
     returns:
         1D array of species at a given downscaled areas
+
+    Halvings from more than _SAR_DIRECT_MAX individuals use _downscale_step.
     '''
 
     num_ind = np.empty(len(down_areas))
@@ -4061,6 +6418,12 @@ def _downscale_sar_(down_areas, N, S):
                                      ' per cell.')
             N_A = num_ind[i - 1]
             S_A = spp[i - 1]
+            if N_A > _SAR_DIRECT_MAX:
+                spp[i] = _downscale_step(N_A, S_A, N, S)[0]
+                if np.isnan(spp[i]):
+                    raise ValueError('No solution to the METE SAR when ' +
+                                     'halving from N = %.2f' % N_A)
+                continue
             n = np.linspace(1, N_A, num=N_A)
             eq1 = lambda x: sum((x**n) / n) - ((S_A / N_A) * sum(x**n))
             x = scipy.optimize.brentq(eq1, 1e-10, min((sys.float_info[0] / S)\
@@ -4070,6 +6433,183 @@ def _downscale_sar_(down_areas, N, S):
             spp[i] = ShalfA
     return spp[::-1]
 
+def _upscale_step(N2A, S_A):
+    '''
+    One doubling of _upscale_sar_ from S_A species to an area with N2A
+    individuals, for large N2A. N2A and S_A may be arrays, which are solved
+    together by batch_solver.
+
+    The equations of _upscale_sar_ are solved for beta = -log(x) rather than
+    x, and the sums over abundances are calculated by _log_sum and _geo_sum.
+    Memory does not depend on N2A, and x may be closer to 1 than the
+    1 - 1e-10 limit of the direct solve. The sums have a relative error
+    below about 1e-14 and beta is found to a relative tolerance of about
+    1e-12. Species numbers agree with direct summation in extended precision
+    to about 1e-13.
+
+    Returns
+    -------
+    : np.array
+        Species at each doubled area, nan where there is no solution
+    '''
+    N2A, S_A = [np.atleast_1d(arr) for arr in np.broadcast_arrays(
+                np.asarray(N2A, dtype=float), np.asarray(S_A, dtype=float))]
+
+    def eq1(beta, N2A, S_A):
+        log_sum = _log_sum(1, N2A, log_x=-beta)
+        geo = _geo_sum(1, N2A, log_x=-beta)
+        return (log_sum * (N2A / geo) * np.exp(beta)) - ((N2A / geo) * (1 -
+                (np.exp(-beta * N2A) / (N2A + 1)))) - S_A
+
+    beta = batch_solver(eq1, np.minimum(1e-10, 1e-3 / N2A), -np.log(1e-10),
+                        args=(N2A, S_A), xtol=1e-12 / np.max(N2A))
+    return np.log(1 / beta) * (N2A / _geo_sum(1, N2A, log_x=-beta))
+
+def _downscale_step(N_A, S_A, N, S):
+    '''
+    One halving of _downscale_sar_ from S_A species and N_A individuals, for
+    large N_A. N and S at the anchor scale set the bracket, as in
+    _downscale_sar_. See _upscale_step.
+    '''
+    N_A, S_A, N, S = [np.atleast_1d(arr) for arr in np.broadcast_arrays(
+                      np.asarray(N_A, dtype=float), np.asarray(S_A,
+                      dtype=float), np.asarray(N, dtype=float),
+                      np.asarray(S, dtype=float))]
+
+    def eq1(beta, N_A, S_A):
+        log_sum = _log_sum(1, N_A, log_x=-beta)
+        return log_sum - ((S_A / N_A) * _geo_sum(1, N_A, log_x=-beta))
+
+    beta = batch_solver(eq1, -np.minimum(np.log(sys.float_info[0] / S) / N,
+                        np.log(2)), -np.log(1e-10), args=(N_A, S_A),
+                        xtol=1e-12 / np.max(N_A))
+    geo = _geo_sum(1, N_A, log_x=-beta)
+    return (S_A * np.exp(beta)) - ((N_A / geo) * (1 - (np.exp(-beta * N_A) /
+                                                                (N_A + 1))))
+
+def mete_sar_table(n_samp, tot_obs, upscale=0, downscale=0):
+    '''
+    METE SAR (method 1 in Harte 2011) of many sites at once, with each
+    doubling or halving interpolated from a table.
+
+    Parameters
+    ----------
+    n_samp : float or np.array
+        Number of species at the anchor area of each site
+    tot_obs : float or np.array
+        Number of individuals at the anchor area of each site
+    upscale : int
+        Number of doublings of the anchor area
+    downscale : int
+        Number of halvings of the anchor area
+
+    Returns
+    -------
+    : np.array
+        Species at each site (rows) at areas 2 ** -downscale to 2 ** upscale
+        times the anchor area (columns)
+
+    Notes
+    -----
+    The ratio of species at double (or half) the area to species at an area
+    with S species and N individuals is tabled at _SAR_TABLE_PER_DOUBLING
+    values per doubling of S and of N / S, and interpolated with cubic
+    polynomials in log(S) and log(N / S). Nodes are solved as they are
+    needed, together, with _upscale_step and _downscale_step. They are kept
+    in solve_cache, so all sites share them, and they are kept on disk if
+    solve_cache.use_disk has been called. Steps with nodes below
+    _SAR_TABLE_MIN_N, _SAR_TABLE_MIN_S or _SAR_TABLE_MIN_RATIO, or without a
+    solution, are calculated exactly, as in mete_sar_iter, and raise the
+    same errors as mete_sar_iter.iter_vals when they have no solution.
+
+    The interpolation error of each step is below about 1e-5 and typically
+    1e-7. The table treats N as continuous, while exact iteration sums over
+    np.linspace(1, N, num=int(N)) when N is fractional, so SARs differ from
+    mete_sar_iter.iter_vals by up to about 1e-3 at small, fractional N.
+
+    '''
+    S, N = [np.atleast_1d(arr).astype(float) for arr in
+                                    np.broadcast_arrays(n_samp, tot_obs)]
+    if np.any(N / 2 ** downscale <= 1):
+        raise DownscaleError('Cannot downscale %i iterations from ' %
+                             downscale + 'anchor scale. One or less ' +
+                             'individuals per cell.')
+
+    sar = np.empty((len(S), upscale + downscale + 1))
+    sar[:, downscale] = S
+    for up, steps in ((True, upscale), (False, downscale)):
+        tS, tN = S, N
+        for i in xrange(1, steps + 1):
+            tS = tS * _mete_sar_ratio(tN, tS, up)
+            if up:
+                tN = 2 * tN
+                sar[:, downscale + i] = tS
+            else:
+                tN = tN / 2
+                sar[:, downscale - i] = tS
+    return sar
+
+def _mete_sar_ratio(N, S, up):
+    '''
+    Ratio of species at double (up=True) or half the area to S, at areas with
+    N individuals and S species, interpolated from the table of
+    mete_sar_table.
+    '''
+    P = _SAR_TABLE_PER_DOUBLING
+    if up:
+        name = 'mete_sar_up'
+        solver = lambda N, S: _upscale_step(2 * N, S) / S
+    else:
+        name = 'mete_sar_down'
+        solver = lambda N, S: _downscale_step(N, S, N, S) / S
+
+    # Nodes of the 4 x 4 stencil around each site
+    u = np.log2(S) * P
+    v = np.log2(N / S) * P
+    u0, v0 = np.floor(u), np.floor(v)
+    off = np.arange(-1, 3)
+    node_S, node_N = np.broadcast_arrays(2 ** ((u0[:, None, None] +
+                        off[None, :, None]) / P), 2 ** ((u0[:, None, None] +
+                        off[None, :, None] + v0[:, None, None] + off[None,
+                        None, :]) / P))
+
+    # Each node is looked up or solved once
+    log_ratio = np.empty(node_N.shape)
+    log_ratio.fill(np.nan)
+    use = (node_N >= _SAR_TABLE_MIN_N) & (node_S >= _SAR_TABLE_MIN_S) &\
+                                      (node_N >= _SAR_TABLE_MIN_RATIO * node_S)
+    if np.any(use):
+        nodes, inv = np.unique(np.column_stack((node_N[use], node_S[use])),
+                               axis=0, return_inverse=True)
+        log_ratio[use] = np.log(_memo_solve(name, solver, nodes[:, 0],
+                                            nodes[:, 1]))[inv]
+
+    ratio = np.exp(np.einsum('si,sij,sj->s', _cubic_weights(u - u0),
+                             log_ratio, _cubic_weights(v - v0)))
+
+    # Exact steps where the table does not apply
+    for i in np.where(np.isnan(ratio))[0]:
+        if up:
+            ratio[i] = _upscale_sar_(np.array([1, 2.]), N[i], S[i])[1]
+        else:
+            ratio[i] = _downscale_sar_(np.array([.5, 1]), N[i], S[i])[0]
+        ratio[i] /= S[i]
+
+    return ratio
+
+def _cubic_weights(t):
+    '''
+    Weights of the cubic interpolating polynomial through nodes -1, 0, 1 and 2
+    at each t in [0, 1).
+    '''
+    t = np.asarray(t, dtype=float)
+    nodes = np.arange(-1, 3)
+    weights = np.ones((len(t), 4))
+    for k in xrange(4):
+        for other in np.delete(nodes, k):
+            weights[:, k] *= (t - other) / (nodes[k] - other)
+    return weights
+
 def _generate_areas_(anchor_area, upscale, downscale, base=2):
     '''
     Utility function that makes the area list
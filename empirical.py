@@ -13,6 +13,7 @@ Patch Methods
 - `sad` -- calculate species abundance distribution (grid or sample)
 - `sar` -- calculate species-area relationship (grid or sample)
 - `universal_sar` -- calculates the universal sar curve
+- `sta` -- calculate species-time-area relationships for repeated censuses
 - `ear` -- calculate endemics-area relationship (grid or sample)
 - `comm` -- calculate commonality between sub-patches (grid)
 - `ssad` -- calculate species-level spatial abundance distrib (grid or sample)
@@ -26,6 +27,7 @@ Patch Methods
 Misc functions
 --------------
 - `distance` -- return Euclidean distance between two points
+- `n_workers` -- return the number of worker processes to use for n_jobs
 '''
 
 from __future__ import division
@@ -33,8 +35,12 @@ import numpy as np
 from math import radians, cos, sin, asin, sqrt
 import itertools
 from copy import deepcopy
+import multiprocessing
 from data import DataTable
 
+# Patch shared with forked worker processes in Patch.sar
+_shared_patch = None
+
 
 class Patch:
     '''
@@ -276,7 +282,8 @@ class Patch:
 
 
 
-    def sar(self, div_cols, div_list, criteria, form='sar', output_N=False):
+    def sar(self, div_cols, div_list, criteria, form='sar', output_N=False,
+            n_jobs=1):
         '''
         Calculate an empirical species-area relationship given criteria.
 
@@ -296,6 +303,11 @@ class Patch:
         output_N : bool
             Adds the column N to the output rec array which contains the
             average N for a given area.
+        n_jobs : int
+            Number of worker processes used to evaluate the divisions in
+            div_list. If 1 (default), divisions are evaluated serially. If -1,
+            one worker per cpu is used. Workers are forked from this process
+            and inherit the data table without it being pickled.
 
         Returns
         -------
@@ -312,68 +324,75 @@ class Patch:
         # If any element in div_cols in criteria, remove from criteria
         criteria = {k: v for k, v in criteria.items() if k not in div_cols}
 
+        if form not in ['sar', 'ear']:
+            raise NotImplementedError('No SAR of form %s available' % form)
+
         # Loop through div combinations (ie, areas), calc sad, and summarize
-        areas = []
-        mean_result = []
-        full_result = []
-        N_result = []
+        jobs = [(div_cols, div, criteria, form, output_N) for div in div_list]
+        div_results = _map_over_divs(self, jobs, n_jobs)
 
-        for div in div_list:
+        areas = [res[0] for res in div_results]
+        mean_result = [res[1] for res in div_results]
+        full_result = [res[2] for res in div_results]
+        N_result = [res[3] for res in div_results]
 
-            # Add divs to criteria dict
-            this_criteria = deepcopy(criteria)
-            for i, col in enumerate(div_cols):
-                this_criteria[col] = div[i]
+        # Return
+        if not output_N:
+            rec_sar = np.array(zip(mean_result, areas), dtype=[('items',
+                                                np.float), ('area', np.float)])
+        else:
+            rec_sar = np.array(zip(mean_result, N_result, areas),
+              dtype=[('items', np.float), ('N', np.float), ('area', np.float)])
 
-            # Get flattened sad for all criteria and this div
-            sad_return = self.sad(this_criteria)
+        return rec_sar, full_result
 
-            if output_N:
-                N_result.append(np.mean([sum(sad[1]) for sad in sad_return]))
+    def _sar_div(self, div_cols, div, criteria, form, output_N):
+        '''
+        Calculate the area, mean items, full result and mean N for a single
+        division of div_cols. See Patch.sar docstring.
+        '''
 
-            flat_sad = flatten_sad(sad_return)[1]
+        # Add divs to criteria dict
+        this_criteria = deepcopy(criteria)
+        for i, col in enumerate(div_cols):
+            this_criteria[col] = div[i]
 
-            # Store results
-            if form == 'sar':
-                this_full = np.sum((flat_sad > 0), axis=0)
-                this_mean = np.mean(this_full)
-            elif form == 'ear':
-                totcnt = np.sum(flat_sad, axis=1)
-                totcnt_arr = \
-                    np.array([list(totcnt),]*np.shape(flat_sad)[1]).transpose()
+        # Get flattened sad for all criteria and this div
+        sad_return = self.sad(this_criteria)
 
-                this_full = np.sum(np.equal(flat_sad, totcnt_arr), axis=0)
-                this_mean = np.mean(this_full)
-            else:
-                raise NotImplementedError('No SAR of form %s available' % form)
+        if output_N:
+            this_N = np.mean([sum(sad[1]) for sad in sad_return])
+        else:
+            this_N = None
 
-            full_result.append(this_full)
-            mean_result.append(this_mean)
+        flat_sad = flatten_sad(sad_return)[1]
 
-            # Store area
-            area = 1
-            for i, col in enumerate(div_cols):
-                dmin = self.data_table.meta[(col, 'minimum')]
-                dmax = self.data_table.meta[(col, 'maximum')]
-                dprec = self.data_table.meta[(col, 'precision')]
-                length = (dmax + dprec - dmin)
+        if form == 'sar':
+            this_full = np.sum((flat_sad > 0), axis=0)
+            this_mean = np.mean(this_full)
+        else:  # form == 'ear', checked in sar
+            totcnt = np.sum(flat_sad, axis=1)
+            totcnt_arr = \
+                np.array([list(totcnt),]*np.shape(flat_sad)[1]).transpose()
 
-                area *= length / div[i]
+            this_full = np.sum(np.equal(flat_sad, totcnt_arr), axis=0)
+            this_mean = np.mean(this_full)
 
-            areas.append(area)
+        # Get area
+        area = 1
+        for i, col in enumerate(div_cols):
+            dmin = self.data_table.meta[(col, 'minimum')]
+            dmax = self.data_table.meta[(col, 'maximum')]
+            dprec = self.data_table.meta[(col, 'precision')]
+            length = (dmax + dprec - dmin)
 
-        # Return
-        if not output_N:
-            rec_sar = np.array(zip(mean_result, areas), dtype=[('items',
-                                                np.float), ('area', np.float)])
-        else:
-            rec_sar = np.array(zip(mean_result, N_result, areas),
-              dtype=[('items', np.float), ('N', np.float), ('area', np.float)])
+            area *= length / div[i]
 
-        return rec_sar, full_result
+        return area, this_mean, this_full, this_N
 
 
-    def universal_sar(self, div_cols, div_list, criteria, include_full=False):
+    def universal_sar(self, div_cols, div_list, criteria, include_full=False,
+                      n_jobs=1):
         '''
         Calculates the empirical universal sar given criteria. The universal
         sar calculates the slope of the SAR and the ratio of N / S at all
@@ -400,6 +419,9 @@ class Patch:
             If include_full = True, the division (1,1) will be included if it
             was now already included. Else it will not be included.  (1,1) is
             equivalent to the full plot
+        n_jobs : int
+            Number of worker processes used to evaluate the divisions. See
+            Patch.sar docstring.
 
 
         Returns
@@ -426,7 +448,8 @@ class Patch:
                 div_list.insert(0, (1,1))
 
         # Run sar with the div_cols
-        sar = self.sar(div_cols, div_list, criteria, output_N=True)[0]
+        sar = self.sar(div_cols, div_list, criteria, output_N=True,
+                       n_jobs=n_jobs)[0]
 
         # sort by area
         sar = np.sort(sar, order=['area'])[::-1]
@@ -447,6 +470,134 @@ class Patch:
         
         return z_array
 
+    def sta(self, div_cols, div_list, time_col, criteria, windows=None):
+        '''
+        Calculates species-area, species-time and species-time-area
+        relationships and per-census SADs for a repeatedly censused patch.
+
+        A (time x cell x species) count cube is built with a single vectorized
+        pass over the data table for each division in div_list, and all
+        relationships are computed from this cube rather than from separate
+        subsets of the table for each census and cell.
+
+        Parameters
+        ----------
+        div_cols : tuple
+            Column names to divide, eg, ('x', 'y'). Must be metric.
+        div_list : list of tuples
+            List of division pairs in same order as div_cols, eg, [(1,1),
+            (2,2), (4,4)]. Values are number of divisions of div_col.
+        time_col : str
+            Name of column identifying the census, eg, 'year'.
+        criteria : dict
+            Dictionary with a key with a value of 'species' and, optionally, a
+            key with a value of 'count' (see Patch.sad docstring). Items
+            referring to div_cols or time_col are ignored. Other criteria are
+            not supported; use the subset argument of Patch instead.
+        windows : list of ints
+            Numbers of consecutive censuses to pool. If None (default), all
+            window lengths from 1 to the number of censuses are used.
+
+        Returns
+        -------
+        rec_sta : structured array
+            Structured array with fields 'time', 'window', 'area' and 'items'.
+            Each row gives the average number of species found in a cell of
+            size 'area' over 'window' consecutive censuses starting at census
+            'time'. Rows with window 1 give the SAR of each census, and rows
+            with the area of the full plot give the species-time relationship.
+        sads : list
+            List of tuples, one per census, in the format returned by
+            Patch.sad for the full plot.
+
+        '''
+
+        table = self.data_table.table
+
+        spp_col = None
+        count_col = None
+        for key, value in criteria.items():
+            if key in div_cols or key == time_col:
+                continue
+            if value == 'species':
+                spp_col = key
+            elif value == 'count':
+                count_col = key
+            elif value != 'whole':
+                raise NotImplementedError('Criteria %s: %s not supported by '
+                                          % (key, value) + 'Patch.sta')
+        if spp_col == None:
+            raise TypeError('No species column specified in "criteria" ' +
+                                                                   'parameter')
+
+        # Index every record by census and species once
+        times, time_ind = np.unique(table[time_col], return_inverse=True)
+        spp_list, spp_ind = np.unique(table[spp_col], return_inverse=True)
+        if count_col:
+            counts = table[count_col]
+        else:
+            counts = np.ones(len(table))
+
+        n_time = len(times)
+        n_spp = len(spp_list)
+
+        if windows is None:
+            windows = range(1, n_time + 1)
+        for window in windows:
+            if window < 1 or window > n_time:
+                raise ValueError('Windows must be between 1 and the number '
+                                 'of censuses (%i)' % n_time)
+
+        # Per-census SADs for the full plot
+        tot = np.bincount(time_ind * n_spp + spp_ind, weights=counts,
+                          minlength=n_time * n_spp).reshape(n_time, n_spp)
+        sads = [({time_col: ('==', times[t])}, tot[t].astype(counts.dtype),
+                 spp_list) for t in xrange(n_time)]
+
+        rows = []
+        for div in div_list:
+
+            # Assign records to cells as done in Patch.parse_criteria
+            cell_ind = np.zeros(len(table), dtype=int)
+            valid = np.ones(len(table), dtype=bool)
+            area = 1
+            for i, col in enumerate(div_cols):
+                dmin = self.data_table.meta[(col, 'minimum')]
+                dmax = self.data_table.meta[(col, 'maximum')]
+                dprec = self.data_table.meta[(col, 'precision')]
+                length = (dmax + dprec - dmin)
+                area *= length / div[i]
+
+                step = length / div[i]
+                starts = np.arange(dmin, dmax + dprec, step)
+                col_ind = np.searchsorted(starts, table[col], side='right') - 1
+                col_ind[col_ind < 0] = 0
+                valid &= (table[col] >= starts[col_ind]) & \
+                         (table[col] < starts[col_ind] + step)
+                cell_ind = cell_ind * len(starts) + col_ind
+                n_cells = len(starts) if i == 0 else n_cells * len(starts)
+
+            # Build (time x cell x species) count cube
+            flat_ind = (time_ind[valid] * n_cells + cell_ind[valid]) * n_spp +\
+                        spp_ind[valid]
+            cube = np.bincount(flat_ind, weights=counts[valid],
+                        minlength=n_time * n_cells * n_spp).reshape(n_time,
+                                                            n_cells, n_spp)
+
+            # Pool consecutive censuses with a cumulative sum over time
+            cum = np.concatenate((np.zeros((1, n_cells, n_spp)),
+                                  np.cumsum(cube, axis=0)))
+            for window in windows:
+                pooled = cum[window:] - cum[:-window]
+                items = np.mean(np.sum(pooled > 0, axis=2), axis=1)
+                for t in xrange(n_time - window + 1):
+                    rows.append((times[t], window, area, items[t]))
+
+        rec_sta = np.array(rows, dtype=[('time', times.dtype), ('window',
+                           np.int), ('area', np.float), ('items', np.float)])
+
+        return rec_sta, sads
+
     def comm_sep(self, plot_locs, criteria, loc_unit=None):
         '''
         Calculates commonality (Sorensen and Jaccard) between pairs of plots.
@@ -734,6 +885,60 @@ class Patch:
 
         return result
 
+def n_workers(n_jobs, n_tasks):
+    '''
+    Returns the number of worker processes to use for n_jobs and n_tasks.
+
+    Parameters
+    ----------
+    n_jobs : int
+        Requested number of processes. -1 uses one process per cpu.
+    n_tasks : int
+        Number of tasks to be distributed among the processes.
+
+    Returns
+    -------
+    : int
+        Number of worker processes, never more than n_tasks.
+
+    '''
+    if n_jobs == -1:
+        n_jobs = multiprocessing.cpu_count()
+    if n_jobs < 1:
+        raise ValueError('n_jobs must be a positive integer or -1')
+    return int(max(1, min(n_jobs, n_tasks)))
+
+
+def _map_over_divs(patch, jobs, n_jobs):
+    '''
+    Evaluates Patch._sar_div for each set of arguments in jobs, either serially
+    or in a pool of forked processes that inherit patch.
+    '''
+    global _shared_patch
+
+    n_proc = n_workers(n_jobs, len(jobs))
+    if n_proc == 1:
+        return [patch._sar_div(*job) for job in jobs]
+
+    # Workers are forked after the patch is placed in module scope, so the
+    # data table is shared copy-on-write rather than pickled to each worker.
+    _shared_patch = patch
+    pool = multiprocessing.Pool(n_proc)
+    try:
+        results = pool.map(_sar_div_worker, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+        _shared_patch = None
+
+    return results
+
+
+def _sar_div_worker(job):
+    '''Evaluates one division of Patch.sar on the patch shared at fork.'''
+    return _shared_patch._sar_div(*job)
+
+
 def flatten_sad(sad):
     '''
     Takes a list of tuples, like sad output, ignores keys, and converts values 
@@ -58,6 +58,27 @@ class TestCompare(unittest.TestCase):
         self.assertTrue(np.all(sad_c.dist_list[0].params['tot_obs'] ==
                                                            np.array([13, 10])))
 
+        # Frequency tables give the same SADs and likelihoods
+        tables = [dist.freq_table(sad) for sad in self.sad_data]
+        sad_f = CompareSAD(tables, ['logser'], freq=True)
+        for obs, sad in zip(sad_f.observed_data, self.sad_data):
+            self.assertTrue(np.array_equal(obs, np.sort(sad)))
+        nlls = nll(dist.logser(n_samp=[10, 10], tot_obs=[25, 20]).pmf(
+                                                                self.sad_data))
+        self.assertTrue(np.allclose(np.array(sad_f.compare_aic()).ravel(),
+                                    aic(nlls, [1, 1]), rtol=1e-12))
+
+        # Distributions are fit to the tables as they are to the SADs
+        sad_f = CompareSAD(tables, ['plognorm', 'nbd_lt'], freq=True)
+        sad_r = CompareSAD(self.sad_data, ['plognorm', 'nbd_lt'])
+        for dist_f, dist_r in zip(sad_f.dist_list, sad_r.dist_list):
+            for kw in ['n_samp', 'tot_obs', 'k', 'mu', 'sigma']:
+                if kw in dist_r.params:
+                    self.assertTrue(np.allclose(dist_f.params[kw],
+                                                dist_r.params[kw], rtol=1e-6))
+        self.assertTrue(np.allclose(sad_f.compare_aic(), sad_r.compare_aic(),
+                                    rtol=1e-6))
+
         # Check that the species lists were set correctly
         self.assertTrue(np.all(sad_c.sad_spp_list[0] == 
                                     np.array(['a', 'b', 'c', 'd', 'e', 'g'])))
@@ -131,6 +152,12 @@ class TestCompare(unittest.TestCase):
         self.assertTrue(np.all(ied_c.dist_list[0].params['E'] ==
                     np.array([sum(np.arange(10,100)),sum(np.arange(1,20))])))
 
+        # Distributions fit to the same data share one METEState
+        ied_c = CompareIED(ied_data, dist_list=['psi', 'nu'])
+        self.assertTrue(ied_c.dist_list[0].state is ied_c.dist_list[1].state)
+        self.assertTrue(np.array_equal(ied_c.dist_list[0].var['beta'],
+                                       ied_c.dist_list[1].var['beta']))
+
         # If patch is True, make sure the fit works
         patch_sad = [({'test' : 'criteria'}, np.array([1,1,1,2,3,5]),
                      np.array(['a', 'b', 'c', 'd', 'e', 'g'])), ({'test' : 
@@ -20,8 +20,12 @@ Weecology functions from https://github.com/weecology/macroecotools.
 
 import unittest
 from macroeco.distributions import *
+from macroeco.distributions import _geo_sum, _log_sum, _pln_logpmf, \
+                                    _nbd_k_newton, _dgamma_norm, _upscale_step
 import numpy as np
 import scipy.stats as stats
+import scipy.integrate as integrate
+import scipy.optimize
 import matplotlib.pyplot as plt
 
 # TODO: Need to add fit functions to tests with new fit functions. 
@@ -164,15 +168,45 @@ class TestDistributions(unittest.TestCase):
         self.assertTrue(sum(np.round(plognorm(mu=3,sigma=-3).\
                                      pmf([1,2,3,4,5])[0], decimals=3)) == 0)
 
-        # Test that MLE fit matches R package poilog
+        # Test that MLE fit matches R package poilog, which stops about 2e-5
+        # short of the optimum
         Rmu = 1.31928; Rsigma = 1.18775
         test_vec1 = np.array([1,1,1,1,1,2,2,2,3,3,4,4,5,5,6,6,12,45,67])
         test_plog = plognorm().fit([test_vec1])
         print test_plog.params
-        self.assertTrue(np.round(test_plog.params['mu'][0], decimals = 5) ==
-                            Rmu)
-        self.assertTrue(np.round(test_plog.params['sigma'][0], decimals = 5) ==
-                            Rsigma)
+        self.assertTrue(abs(test_plog.params['mu'][0] - Rmu) < 1e-4)
+        self.assertTrue(abs(test_plog.params['sigma'][0] - Rsigma) < 1e-4)
+
+        # Score is zero at the fit and standard errors are in var
+        loglik, grad = test_plog._loglik_grad(freq_table(test_vec1),
+                       test_plog.params['mu'][0], test_plog.params['sigma'][0])
+        self.assertTrue(np.all(np.abs(grad) < 1e-6))
+        self.assertTrue(np.all(test_plog.var['sigma_se'] > 0))
+
+        # Analytic derivatives of the kernel match finite differences
+        n = np.array([0, 1, 3, 50, 170, 171, 3000])
+        logpmf, (dmu, dsigma) = _pln_logpmf(n, 2, 1.5, grad=True)
+        h = 1e-6
+        self.assertTrue(np.allclose(dmu, (_pln_logpmf(n, 2 + h, 1.5) -
+                        _pln_logpmf(n, 2 - h, 1.5)) / (2 * h), atol=1e-6))
+        self.assertTrue(np.allclose(dsigma, (_pln_logpmf(n, 2, 1.5 + h) -
+                        _pln_logpmf(n, 2, 1.5 - h)) / (2 * h), atol=1e-6))
+
+        # Quadrature kernel matches adaptive quadrature of the integral
+        n = np.array([0, 1, 2, 7, 30, 170])
+        for mu, sigma in [(.1, 5), (2, .05), (2, 1.5), (8, 3)]:
+            eq = lambda t, x: np.exp(x * t - np.exp(t) - 0.5 * ((t - mu) /
+                                                                sigma) ** 2)
+            quad = [integrate.quad(eq, -np.inf, np.inf, args=(x,),
+                    epsabs=0, epsrel=1e-12, limit=500)[0] / np.sqrt(2 *
+                    np.pi) / sigma / np.prod(np.arange(1., x + 1)) for x in n]
+            pmf = plognorm(mu=mu, sigma=sigma).pmf(n)[0]
+            self.assertTrue(np.allclose(pmf, quad, rtol=1e-8, atol=1e-300))
+
+        # Many parameter sets are evaluated together
+        pmfs = plognorm(mu=[1, 2], sigma=[1, 2]).pmf([[1, 2, 1], [3]])
+        self.assertTrue(np.array_equal(pmfs[0], plognorm(mu=1,
+                                       sigma=1).pmf([1, 2, 1])[0]))
 
         # Test that these don't fail
         plognorm().fit([self.abund_list[0]])
@@ -261,8 +295,23 @@ class TestDistributions(unittest.TestCase):
         r_lognorm_fits = np.array([2.07598, 1.59213])
         pyfit1 = lognorm().fit([fit_array1]).params['sigma'][0]
         pyfit2 = lognorm().fit([fit_array2]).params['sigma'][0]
-        diff = r_lognorm_fits - np.round([pyfit1, pyfit2], decimals=5)
-        self.assertTrue(np.all(diff == 0))
+        # optimize stops within about 2e-5 of the closed form MLE
+        diff = r_lognorm_fits - np.array([pyfit1, pyfit2])
+        self.assertTrue(np.all(np.abs(diff) < 1e-4))
+
+        # Equal abundances give sigma 0 and no standard error
+        fit = lognorm().fit([[5, 5, 5, 5]])
+        self.assertTrue(fit.params['sigma'][0] == 0)
+        self.assertTrue(np.isnan(fit.var['sigma_se'][0]))
+
+        # Closed form is at the maximum of the likelihood
+        dist = lognorm().fit([fit_array1])
+        sig = dist.params['sigma'][0]
+        loglik = [lognorm(tot_obs=sum(fit_array1), n_samp=len(fit_array1),
+                  sigma=tsig).loglik([fit_array1])[0] for tsig in [sig - 1e-4,
+                  sig, sig + 1e-4]]
+        self.assertTrue(loglik[1] > loglik[0] and loglik[1] > loglik[2])
+        self.assertTrue(dist.var['sigma_se'][0] > 0)
         
         # Test that these don't fail
         lognorm().fit([self.abund_list[0]])
@@ -349,6 +398,31 @@ class TestDistributions(unittest.TestCase):
         # Check that the parameters are in vars
         self.assertTrue('alpha' in dg.var)
         self.assertTrue('theta' in dg.var)
+        self.assertTrue(dg.var['alpha_se'][0] > 0)
+        self.assertTrue(dg.var['theta_se'][0] > 0)
+
+        # Score is zero at the fit
+        loglik, grad = dg._loglik_grad(freq_table(obs_sad),
+                dg.params['alpha'][0], dg.params['theta'][0], sum(obs_sad))
+        self.assertTrue(np.all(np.abs(grad) < 1e-4))
+
+        # Truncated normalizing sums match the full sums
+        for alpha, theta, N in [(.44, .98, 2000), (3, .5, 100), (3, 1.05,
+                                 2000), (.5, 1.01, 500), (2, 1, 3000)]:
+            k = np.arange(1, N + 1)
+            logg = (alpha - 1) * np.log(k) + k * np.log(theta)
+            g = np.exp(logg - np.max(logg))
+            full = [np.max(logg) + np.log(np.sum(g)), np.sum(g * np.log(k)) /
+                    np.sum(g), np.sum(g * k) / np.sum(g)]
+            norm = [tval[0] for tval in _dgamma_norm(alpha, theta, N)]
+            self.assertTrue(np.allclose(full, norm, rtol=1e-12))
+
+        # Fit with large tot_obs, and loglik from sufficient statistics
+        np.random.seed(0)
+        big_sad = np.random.geometric(.001, size=1000)
+        dg_big = dgamma().fit([big_sad])
+        loglik = np.sum(dg_big.logpmf(big_sad)[0])
+        self.assertTrue(np.allclose(dg_big.loglik([big_sad])[0], loglik))
 
         # Check that the distribution sums to one.
         pmf = dg.pmf(np.arange(1, sum(obs_sad)))[0]
@@ -367,6 +441,19 @@ class TestDistributions(unittest.TestCase):
         ind = np.abs(diff) <= error
         self.assertTrue(np.all(ind))
 
+        # Seeded results do not depend on the number of processes
+        dist = sugihara(n_samp=[10, 20], tot_obs=[400, 500])
+        rad1 = dist.rad(sample_size=5000, random_state=3)
+        rad2 = dist.rad(sample_size=5000, random_state=3, n_jobs=2)
+        self.assertTrue(np.all([np.array_equal(trad1, trad2) for trad1, trad2
+                                in zip(rad1, rad2)]))
+
+        # Stops early once the standard error is below tol
+        dist = sugihara(n_samp=10, tot_obs=400)
+        dist.rad(sample_size=10**6, random_state=1, tol=.5)
+        self.assertTrue(dist.var['sample_size'][0] < 10**6)
+        self.assertTrue(np.all(dist.var['rad_se'][0] < .5))
+
         # Test that error is raised for cdf, pdf, pmf methods
         self.assertRaises(NotImplementedError, sugihara().pmf, 67)
         self.assertRaises(NotImplementedError, sugihara().cdf, 34)
@@ -421,6 +508,36 @@ class TestDistributions(unittest.TestCase):
         geo_data = np.random.geometric(p, size=10000)
         dist = nbd().fit([geo_data])
         self.assertTrue(np.round(dist.params['k'][0], decimals=1) == 1)
+
+        # Fit is at the maximum of the likelihood, for nbd and nbd_lt, and
+        # later data sets are fit from the previous solution
+        data = [[0, 0, 1, 1, 2, 3, 5, 8, 13], [1, 1, 2, 2, 3, 4, 6, 9, 14]]
+        for dist in [nbd(), nbd_lt()]:
+            dist.fit(data[dist.min_supp:])
+            k = dist.params['k'][0]
+            loglik = [dist.__class__(tot_obs=dist.params['tot_obs'][0],
+                      n_samp=dist.params['n_samp'][0], k=tk).loglik(
+                      data[dist.min_supp:][:1])[0] for tk in [k * .999, k, k
+                      * 1.001]]
+            self.assertTrue(loglik[1] > loglik[0] and loglik[1] > loglik[2])
+            self.assertTrue(np.all(dist.var['k_se'] > 0))
+
+        # Batched fit matches fitting one data set at a time
+        np.random.seed(2)
+        data = [np.random.negative_binomial(tk, .2, size=500) for tk in [.3,
+                1, 4]]
+        for dist in [nbd(), nbd_lt()]:
+            tdata = [tdat[tdat >= dist.min_supp] for tdat in data]
+            batch = dist.fit(tdata).params['k']
+            single = dist.fit(tdata, batch=False).params['k']
+            self.assertTrue(np.allclose(batch, single, rtol=1e-5))
+
+        # Underdispersed data, where k runs off to infinity, falls back to a
+        # single fit
+        k, se = _nbd_k_newton(np.array([[1, 2, 3]]), np.ones((1, 3)), 2)
+        self.assertTrue(np.isnan(k[0]))
+        dist = nbd().fit([[1, 2, 3], [0, 0, 1, 5, 9]])
+        self.assertTrue(np.all(np.isfinite(dist.params['k'])))
     
     def test_nbd_lt(self):
         # TODO: test pmf
@@ -504,6 +621,22 @@ class TestDistributions(unittest.TestCase):
         dist = fnbd().fit([geo_data])
         self.assertTrue(np.round(dist.params['k'][0], decimals=1) == 1)
 
+        # Grid of log-likelihoods matches loglik
+        table = freq_table(geo_data)
+        ks = [.01, 1, 30]
+        grid = dist._loglik_k(table, ks, np.sum(geo_data), len(geo_data))
+        loglik = [fnbd(tot_obs=np.sum(geo_data), n_samp=len(geo_data),
+                  k=tk).loglik([geo_data])[0] for tk in ks]
+        self.assertTrue(np.allclose(grid, loglik))
+
+        # Upper bound of k is extended beyond 10 when needed
+        np.random.seed(1)
+        nb_data = np.random.negative_binomial(40, 40 / 45., size=400)
+        dist = fnbd().fit([nb_data])
+        self.assertTrue(dist.params['k'][0] > 10)
+        dist = fnbd().fit([nb_data], upper_bnd=10)
+        self.assertTrue(dist.params['k'][0] <= 10)
+
         # Test against published data in Zillio and He 2010
         # Generated plots match exactly with plots in Zillio and He, 2010
         # Code to generate plots: Unquote and run nosetest if you want to see
@@ -703,6 +836,56 @@ class TestDistributions(unittest.TestCase):
         # That vals method is not implemented
         self.assertRaises(NotImplementedError, sar.vals, 4)
 
+        # Large areas are iterated in bounded memory
+        sar = mete_sar_iter(n_samp=300, tot_obs=100000).iter_vals(upscale=30,
+                                                                 downscale=3)
+        self.assertTrue(len(sar) == 34)
+        self.assertTrue(np.all(np.diff(sar['items']) > 0))
+
+        # One large doubling matches the equations summed directly
+        N, S = 2.0**17, 300.
+        n = np.arange(1, N + 1)
+        def eq1(beta):
+            log_sum = np.sum(np.exp(-beta * n) / n)
+            geo_sum = np.sum(np.exp(-beta * n))
+            return log_sum * N / geo_sum * np.exp(beta) - N / geo_sum * (1 -
+                                    np.exp(-beta * N) / (N + 1)) - S
+        beta = scipy.optimize.brentq(eq1, 1e-10, 20, xtol=1e-20)
+        S2A = np.log(1 / beta) * N / np.sum(np.exp(-beta * n))
+        self.assertTrue(np.allclose(_upscale_step(N, S), S2A, rtol=1e-10,
+                                    atol=0))
+
+        # The interpolated table agrees with the iterated SAR
+        sar = mete_sar_iter(n_samp=300, tot_obs=100000)
+        iter_sar = sar.iter_vals(upscale=3, downscale=3)
+        table_sar = sar.iter_vals(upscale=3, downscale=3, method='table')
+        self.assertTrue(np.allclose(table_sar['items'], iter_sar['items'],
+                                    rtol=1e-5, atol=0))
+        self.assertTrue(np.all(table_sar['area'] == iter_sar['area']))
+        self.assertRaises(ValueError, sar.iter_vals, upscale=1,
+                                                           method='hello')
+
+        # Many sites at once, with exact steps for small N
+        spp = mete_sar_table([300, 50, 5], [100000, 2000, 30], upscale=2,
+                                                                  downscale=2)
+        self.assertTrue(spp.shape == (3, 5))
+        self.assertTrue(np.allclose(spp[0], table_sar['items'][1:-1]))
+        small = mete_sar_iter(n_samp=5, tot_obs=30).iter_vals(upscale=2,
+                                                                  downscale=2)
+        self.assertTrue(np.allclose(spp[2], small['items']))
+        self.assertRaises(DownscaleError, mete_sar_table, 5, 30, downscale=5)
+
+        # Unsolvable steps raise as they do in iter_vals
+        self.assertRaises(ValueError, mete_sar_iter(n_samp=10,
+                          tot_obs=11).iter_vals, upscale=2)
+        self.assertRaises(ValueError, mete_sar_table, [300, 10], [100000, 11],
+                                                                  upscale=2)
+
+        # univ_curve passes the method on
+        z_iter = sar.univ_curve(num_iter=2)[0]['z']
+        z_table = sar.univ_curve(num_iter=2, method='table')[0]['z']
+        self.assertTrue(np.allclose(z_table, z_iter, rtol=1e-5, atol=0))
+
     def test_power_law(self):
 
         # Check that fit produces correct result. Predicted species at 1 should
@@ -747,6 +930,22 @@ class TestDistributions(unittest.TestCase):
         diff = np.abs(msi['items'] - ms['items'])
         self.assertTrue(np.all(diff <= error))
 
+        # tgeo is solved at areas other than one half, where x ** (N + 1)
+        # used to overflow for N from 341 to about 511
+        g = mete_sar.vals([.25, .3])['items']
+        g_interp = gen_sar(logser_ut(), tgeo(), tot_obs=600, n_samp=40,
+                           interp=True).vals([.3, .7])['items']
+        self.assertTrue(np.all(np.isfinite(g)) and np.all(np.diff(g) > 0))
+        self.assertTrue(np.all(np.isfinite(g_interp)))
+        abunds = np.arange(341, 512)
+        for a in [.25, .3]:
+            pmf = tgeo(tot_obs=abunds, n_samp=1 / a).pmf(
+                                        [np.arange(tN + 1) for tN in abunds])
+            means = [np.sum(np.arange(len(tpmf)) * tpmf) for tpmf in pmf]
+            self.assertTrue(np.allclose(means, abunds * a))
+            self.assertTrue(np.allclose(tgeo().p_absent(abunds, a),
+                                        [tpmf[0] for tpmf in pmf]))
+
         # Test that changing the base changes the value of iter_vals
         gnsar = gen_sar(broken_stick(), binm(), n_samp=40, tot_obs=600)
         base2 = gnsar.iter_vals([1,2,.8,.2,.3], base=2)
@@ -789,6 +988,49 @@ class TestDistributions(unittest.TestCase):
         non_iter = gnsar.univ_curve(num_iter=3)
         self.assertTrue(len(itera) == len(non_iter))
 
+        # Presence tables are reused, and match the ssad
+        sar = gen_sar(logser(), nbd(k=.5), tot_obs=600, n_samp=40)
+        g = sar.vals([.25, .5, 2])
+        n_tables = len(sar._presence_tables)
+        sar.iter_vals([1, .5, .25])
+        self.assertTrue(len(sar._presence_tables) == n_tables)
+        p_pres = 1 - np.array([tpmf[0] for tpmf in nbd(tot_obs=[1, 5, 50],
+                                          n_samp=4, k=.5).pmf(0)])
+        self.assertTrue(np.allclose(sar._p_present([1, 5, 50], 4), p_pres))
+
+        # Interpolation in log-area is close to the exact values
+        sar_interp = gen_sar(logser(), nbd(k=.5), tot_obs=600, n_samp=40,
+                             interp=True)
+        a_list = [.3, .7, 3]
+        exact = sar.vals(a_list)['items']
+        interp = sar_interp.vals(a_list)['items']
+        self.assertTrue(np.allclose(exact, interp, rtol=1e-3))
+
+        # Upscaling leaves the sad and ssad unchanged and reuses sad pmfs
+        sad = logser(n_samp=10, tot_obs=100)
+        ssad = nbd(k=.5)
+        sar = gen_sar(sad, ssad, tot_obs=600, n_samp=40)
+        up = sar.vals([2, 4])['items']
+        self.assertTrue(sad.params == {'n_samp': 10, 'tot_obs': 100})
+        self.assertTrue(ssad.params == {'k': .5})
+        n_pmfs = len(sar._sad_pmfs)
+        self.assertTrue(np.array_equal(sar.vals([2, 4])['items'], up))
+        self.assertTrue(len(sar._sad_pmfs) == n_pmfs)
+        self.assertTrue(np.allclose(sar.vals([4])['items'], up[1],
+                                    rtol=1e-10))
+
+        # Areas evaluated together equal areas evaluated one at a time
+        sar = gen_sar(logser(), pois(), tot_obs=600, n_samp=40)
+        a_list = [.5, .01, 1, .2, 2, .5]
+        together = sar.vals(a_list)['items']
+        alone = [sar.vals([a])['items'][0] for a in a_list]
+        self.assertTrue(np.allclose(together, alone, rtol=1e-12))
+        uni, spp = sar.univ_curve(num_iter=3)
+        ends = sar.vals([1 / 16., 2])['items']
+        items = np.concatenate(([ends[0]], spp['items'], [ends[1]]))
+        z = np.log(items[2:] / items[:-2]) / (2 * np.log(2))
+        self.assertTrue(np.allclose(np.sort(uni['z']), np.sort(z)))
+
     #More testing should be done
     def test_theta(self):
 
@@ -814,6 +1056,16 @@ class TestDistributions(unittest.TestCase):
         # Test rad doesn't throw error
         tht.rad()
 
+        # rad uses the e_max at which the cdf is 1 - 1 / (2 * n)
+        tht = theta(n_samp=4, tot_obs=16, E=64, n=[10, 3])
+        rad = tht.rad()
+        self.assertTrue([len(trad) for trad in rad] == [10, 3])
+        l2 = tht.var['lambda_2'][0]
+        e_max = scipy.optimize.brentq(lambda e: tht.cdf(e)[0][0] - (1 - 1 /
+                                                                20.), 1, 64)
+        self.assertTrue(np.allclose(rad[0], 1 + (1 / (l2 * 10)) * np.log(1 /
+                     ((np.arange(1, 11) - .5) / 10 + np.exp(-l2 * 10 * e_max)))))
+
         # TODO: test fit
 
     def test_psi(self):
@@ -873,11 +1125,342 @@ class TestDistributions(unittest.TestCase):
         g = nudist.rad()
         self.assertTrue((len(g[0]) == 50))
 
+        # cdf matches the integral of the pmf, and rad inverts it
+        beta = nudist.var['beta'][0]
+        cdf = integrate.quad(nu_pmf_eq, 1 + 1 / (500 * l2), 20, (beta, l2,
+                             50))[0] / nudist.var['norm'][0]
+        self.assertTrue(np.allclose(nudist.cdf(20)[0], cdf, rtol=1e-10))
+        self.assertTrue(np.allclose(nudist.cdf(g)[0], (np.arange(1, 51) -
+                                    .5) / 50, rtol=0, atol=1e-12))
+        g = nu(tot_obs=[500, 40], n_samp=[50, 7], E=[E, 300]).rad()
+        self.assertTrue(len(g[1]) == 7 and np.all(np.diff(g[1]) > 0))
+
         # Test fit
         g = nu().fit([([1,2,3,4,5,6,7], [1,2,3,4,5,6,7])])
         self.assertTrue(g.params['tot_obs'][0] == 28)
         self.assertTrue(g.params['n_samp'][0] == 7)
         self.assertTrue(g.params['E'][0] == 28)
+
+    def test_batch_solver(self):
+
+        # Roots of many problems in one call match scipy's brentq
+        eq = lambda x, c: x ** 3 - c
+        c = np.linspace(.1, 20, num=50)
+        roots = batch_solver(eq, 0, 5, args=(c,))
+        brentq = [scipy.optimize.brentq(eq, 0, 5, args=(tc,)) for tc in c]
+        self.assertTrue(np.allclose(roots, brentq, rtol=0, atol=1e-11))
+
+        # No sign change gives nan
+        roots = batch_solver(eq, 0, 2, args=([1, 27],))
+        self.assertTrue(np.round(roots[0], decimals=10) == 1)
+        self.assertTrue(np.isnan(roots[1]))
+
+        # Batched parameter sets equal those solved one at a time
+        n_samp = np.array([4, 16, 30, 64])
+        tot_obs = np.array([16, 2**8 * 16, 500, 1000])
+        for i in xrange(len(n_samp)):
+            lg = logser_ut(n_samp=n_samp[i], tot_obs=tot_obs[i])
+            lg.pmf(1)
+            self.assertTrue(np.allclose(lg.var['x'][0], solve_beta(n_samp,
+                                        tot_obs)[i], rtol=1e-10, atol=0))
+
+        # Repeated solves are answered from the cache
+        solve_cache.clear()
+        ps = psi(n_samp=30, tot_obs=511, E=4001)
+        ps.pdf(2)
+        ps.cdf(2)
+        self.assertTrue(solve_cache.stats()['hits'] == 1)
+
+        # Error names the parameter set with no solution
+        self.assertRaises(ValueError, logser_ut_appx(n_samp=[20, 50],
+                                                 tot_obs=[100, 60]).pmf, 1)
+
+    def test_freeze(self):
+
+        # Frozen distributions give the same results as unfrozen
+        for dist in [logser(n_samp=[30, 20], tot_obs=[400, 1000]),
+                     logser_ut(n_samp=[30, 20], tot_obs=[400, 1000]),
+                     tgeo(n_samp=[4, 16], tot_obs=[100, 1000]),
+                     nbd(n_samp=10, tot_obs=100, k=[.5, 2]),
+                     psi(n_samp=30, tot_obs=400, E=[4000, 5000]),
+                     nu(n_samp=30, tot_obs=400, E=[4000, 5000])]:
+            frozen = dist.freeze()
+            self.assertTrue(frozen.frozen and not dist.frozen)
+            try:
+                n = [1, 2, 3]
+                self.assertTrue(np.array_equal(dist.pmf(n), frozen.pmf(n)))
+            except NotImplementedError:
+                n = [2.5, 3, 10]
+                self.assertTrue(np.array_equal(dist.pdf(n), frozen.pdf(n)))
+            self.assertTrue(np.array_equal(dist.cdf(n), frozen.cdf(n)))
+            for key in frozen._state.keys():
+                self.assertTrue(np.array_equal(dist.var[key],
+                                               frozen.var[key]))
+
+        # Frozen psi reuses the stored beta
+        frozen = psi(n_samp=30, tot_obs=513, E=4000).freeze()
+        solve_cache.clear()
+        frozen.pdf(2)
+        frozen.cdf(2)
+        frozen.rad()
+        self.assertTrue(solve_cache.stats()['misses'] == 0)
+
+        # Parameters cannot be changed
+        frozen = logser().fit([[1, 1, 2, 5, 10]]).freeze()
+        self.assertRaises(TypeError, frozen.fit, [[1, 2, 3]])
+        self.assertRaises(TypeError, frozen.params.__setitem__, 'n_samp', 3)
+        self.assertTrue(frozen.params['tot_obs'][0] == 19)
+
+    def test_mete_state(self):
+
+        # Distributions with a state match those without one
+        state = METEState([30, 50], [400, 500], [4000, 8000])
+        n = [1, 2, 3]
+        for dist, new in [(psi(n_samp=[30, 50], tot_obs=[400, 500], E=[4000,
+                           8000]), psi(state=state)), (nu(n_samp=[30, 50],
+                           tot_obs=[400, 500], E=[4000, 8000]),
+                           nu(state=state)), (logser_ut(n_samp=[30, 50],
+                           tot_obs=[400, 500]), logser_ut(state=state))]:
+            try:
+                self.assertTrue(np.allclose(dist.pmf(n), new.pmf(n)))
+            except NotImplementedError:
+                self.assertTrue(np.allclose(dist.pdf(n), new.pdf(n)))
+            self.assertTrue(np.allclose(dist.cdf(n), new.cdf(n)))
+        ps = psi(state=state)
+        ps.pdf(1)
+        self.assertTrue(np.array_equal(ps.var['norm'], state.psi_norm))
+
+        # The state is solved once and shared by copies
+        state = METEState([30, 50], [400, 500], [4000, 8000])
+        solve_cache.clear()
+        ps = psi(state=state)
+        ps.pdf(2)
+        ps.freeze().cdf(2)
+        nu(state=state).pmf(2)
+        self.assertTrue(solve_cache.stats()['misses'] == 2)
+        self.assertTrue(solve_cache.stats()['hits'] == 0)
+        self.assertTrue(ps.freeze().state is state)
+
+        # Species of a community share one lambda_2
+        state = METEState([30] * 3, [400] * 3, [4000] * 3)
+        tht = theta(state=state, n=[1, 5, 20])
+        self.assertTrue(np.allclose(tht.pdf(2), theta(n_samp=30, tot_obs=400,
+                                    E=4000, n=[1, 5, 20]).pdf(2)))
+        self.assertTrue(np.allclose(tht.var['lambda_2'], 30 / 3600.))
+
+        # A state that no longer matches the params is not used
+        ps = psi(state=state).fit([(np.arange(1, 20), np.arange(1, 6))])
+        ps.pdf(2)
+        self.assertTrue(ps.var['lambda_2'][0] == 5 / (190. - 15))
+        self.assertRaises(TypeError, lambda: METEState(30, 400).lambda_2)
+
+    def test_rvs(self):
+
+        # Seeds give reproducible variates of the given shape
+        lg = logser_ut(n_samp=[30, 300], tot_obs=[400, 20000])
+        rvs = lg.rvs((1000, 30), random_state=3)
+        self.assertTrue(len(rvs) == 2 and rvs[1].shape == (1000, 30))
+        self.assertTrue(np.array_equal(rvs[1], lg.rvs((1000, 30),
+                                                    random_state=3)[1]))
+
+        # The mean of the upper-truncated log series is N / S
+        self.assertTrue(np.allclose(np.mean(rvs[0]), 400 / 30., rtol=.05))
+        self.assertTrue(np.allclose(np.mean(rvs[1]), 20000 / 300., rtol=.05))
+        self.assertTrue(np.min(rvs[1]) >= 1 and np.max(rvs[1]) <= 20000)
+
+        # Variates follow the cdf, whether or not the support ends at tot_obs
+        for dist in [tgeo(n_samp=5, tot_obs=40), nbd_lt(n_samp=5,
+                     tot_obs=40, k=.7), fnbd(n_samp=5, tot_obs=40, k=.7),
+                     logser(n_samp=5, tot_obs=40), lognorm(n_samp=30,
+                     tot_obs=400, sigma=1)]:
+            rvs = dist.rvs(20000, random_state=np.random.RandomState(4))[0]
+            vals = np.unique(rvs)
+            emp = np.searchsorted(np.sort(rvs), vals, side='right') / 20000.
+            self.assertTrue(np.max(np.abs(dist.cdf(vals)[0] - emp)) < .01)
+        rvs = nbd_lt(n_samp=5, tot_obs=40, k=.7).rvs(20000, random_state=4)[0]
+        self.assertTrue(np.min(rvs) >= 1 and np.max(rvs) > 40)
+        self.assertTrue(np.max(tgeo(n_samp=5, tot_obs=40).rvs(20000,
+                                                  random_state=4)[0]) <= 40)
+
+        # Standard distributions use numpy's generators
+        rvs = pois(n_samp=5, tot_obs=40).rvs(10, random_state=5)[0]
+        self.assertTrue(np.array_equal(rvs,
+                               np.random.RandomState(5).poisson(8, 10)))
+        rvs = nbd(n_samp=5, tot_obs=40, k=2).rvs(10, random_state=5)[0]
+        self.assertTrue(np.array_equal(rvs,
+                  np.random.RandomState(5).negative_binomial(2, 1 / 5., 10)))
+
+        # Energy distributions lie between 1 and E
+        for dist in [psi(n_samp=30, tot_obs=400, E=4000), theta(n_samp=30,
+                     tot_obs=400, E=4000, n=[3, 20]), nu(n_samp=30,
+                     tot_obs=400, E=4000)]:
+            for rvs in dist.rvs(1000, random_state=6):
+                self.assertTrue(np.all((rvs >= 1) & (rvs <= 4000)))
+        rvs = nu(n_samp=30, tot_obs=400, E=4000).rvs(20000, random_state=6)[0]
+        self.assertTrue(np.abs(np.mean(nu(n_samp=30, tot_obs=400,
+                        E=4000).cdf(np.median(rvs))[0]) - .5) < .02)
+
+        self.assertRaises(NotImplementedError, sugihara(n_samp=30,
+                                                        tot_obs=400).rvs, 10)
+
+    def test_log_sum(self):
+
+        # Closed forms match the exact sums
+        for x in [0.3, 0.99, 0.999999, 1, 1.001, 2]:
+            for N in [1, 64, 65, 1000, 10**5]:
+                if N * np.log(x) > 600:
+                    continue
+                k = np.arange(1, N + 1, dtype=float)
+                self.assertTrue(np.allclose(_log_sum(x, N), np.sum(x ** k /
+                                                k), rtol=1e-12, atol=0))
+                self.assertTrue(np.allclose(_geo_sum(x, N), np.sum(x ** k),
+                                                        rtol=1e-12, atol=0))
+
+        # beta_solver no longer needs k
+        k = np.arange(1, 501)
+        self.assertTrue(np.allclose(beta_solver(.99, None, 500, 30), 
+                        np.sum(.99 ** k / 500 * 30) - np.sum(.99 ** k / k),
+                        rtol=1e-12, atol=0))
+
+        # Very large N can be solved
+        lg = logser_ut(n_samp=1000, tot_obs=10**8)
+        pmf = lg.pmf(1)[0]
+        self.assertTrue(lg.var['x'][0] < 1 and pmf[0] > 0)
+
+    def test_make_rank_abund(self):
+
+        # Quantiles match a direct count of cutoffs below each point
+        np.random.seed(8)
+        for min_supp in [0, 1]:
+            for n_samp in [1, 7, 30]:
+                pmf = np.random.rand(50) ** 4
+                rad = make_rank_abund(pmf, n_samp, min_supp=min_supp)
+                cum_pmf = np.cumsum(np.concatenate(([0] * min_supp, pmf)) /
+                                    np.sum(pmf))
+                points = np.arange(1 / (2. * n_samp), 1, 1. / n_samp)
+                count = [np.sum(cum_pmf <= point) for point in points]
+                self.assertTrue(np.array_equal(rad, count))
+
+        # Support is only truncated once the tail is negligible
+        lg = logser_ut(n_samp=30, tot_obs=500)
+        full = lg.pmf(np.arange(1, 501))[0]
+        self.assertTrue(np.array_equal(lg._support_pmf([500])[0], full))
+        self.assertTrue(np.array_equal(lg.rad()[0],
+                                       make_rank_abund(full, 30)))
+
+        po = pois(n_samp=[10, 10**6], tot_obs=[100, 10**7])
+        pmf = po._support_pmf([100, 10**7])
+        self.assertTrue(len(pmf[0]) == 101 and len(pmf[1]) < 10**4)
+        rad = po.rad()
+        self.assertTrue(len(rad[1]) == 10**6 and rad[1][-1] < 100)
+
+    def test_cum_table(self):
+
+        # Cdf from the table equals the cumulative sum of the pmf
+        lg = logser_ut(n_samp=[30, 20], tot_obs=[400, 1000])
+        cdf = lg.cdf([[1, 5, 400, 5], [1000, 2, 0]])
+        full = lg.pmf([np.arange(1, 401), np.arange(1, 1001)])
+        self.assertTrue(np.array_equal(cdf[0], np.cumsum(full[0])[[0, 4, 399,
+                                                                     4]]))
+        self.assertTrue(np.array_equal(cdf[1], np.append(np.cumsum(full[1])
+                                                         [[999, 1]], 0)))
+
+        # Table is extended by doubling and reused for smaller n
+        tables = lg._cum_tables[1]
+        self.assertTrue(len(tables[0]) == 400 and len(tables[1]) == 1000)
+        lg.cdf([[401], [3]])
+        self.assertTrue(len(lg._cum_tables[1][0]) == 800)
+        self.assertTrue(lg._cum_tables[1][1] is tables[1])
+
+        # Changed params give a new table
+        lg.params['tot_obs'] = np.array([500, 1000])
+        fresh = logser_ut(n_samp=[30, 20], tot_obs=[500, 1000])
+        self.assertTrue(np.array_equal(lg.cdf(450), fresh.cdf(450)))
+
+    def test_logpmf(self):
+
+        # logpmf and logpdf equal the log of pmf and pdf
+        n = [1, 2, 5, 30]
+        for dist in [logser(n_samp=30, tot_obs=400),
+                     logser_ut(n_samp=[30, 30], tot_obs=[400, 30]),
+                     logser_ut_appx(n_samp=30, tot_obs=400),
+                     plognorm(mu=2, sigma=1.5),
+                     plognorm_lt(mu=[2, .5], sigma=[1.5, 2]),
+                     lognorm(n_samp=30, tot_obs=400, sigma=1.2),
+                     dgamma(n_samp=30, tot_obs=400, alpha=.5, theta=.99),
+                     geo_ser(n_samp=30, tot_obs=400, k=.1),
+                     broken_stick(n_samp=30, tot_obs=400),
+                     binm(n_samp=10, tot_obs=100),
+                     pois(n_samp=10, tot_obs=100),
+                     nbd(n_samp=10, tot_obs=100, k=[.5, 2]),
+                     nbd_lt(n_samp=10, tot_obs=100, k=.5),
+                     fnbd(n_samp=10, tot_obs=100, k=.5),
+                     geo(n_samp=10, tot_obs=100),
+                     fgeo(n_samp=10, tot_obs=100),
+                     tgeo(n_samp=[2, 1, 16], tot_obs=100),
+                     nu(n_samp=30, tot_obs=400, E=5000)]:
+            log = np.log(dist.pmf(n))
+            self.assertTrue(np.allclose(dist.logpmf(n), log, rtol=1e-10,
+                                        atol=0))
+
+        n = [1, 2.5, 10, 30]
+        for dist in [psi(n_samp=30, tot_obs=400, E=5000),
+                     theta(n_samp=30, tot_obs=400, E=5000, n=[1, 20])]:
+            log = np.log(dist.pdf(n))
+            self.assertTrue(np.allclose(dist.logpdf(n), log, rtol=1e-10,
+                                        atol=0))
+
+        # Likelihood from frequency tables
+        sad = [1, 1, 1, 2, 2, 5, 9, 9]
+        dist = nbd_lt(n_samp=8, tot_obs=30, k=[.5, 1])
+        loglik = dist.loglik([sad, sad])
+        self.assertTrue(np.allclose(loglik, np.sum(dist.logpmf(sad), axis=1),
+                                    rtol=1e-12, atol=0))
+        table = freq_table(sad)
+        self.assertTrue(np.array_equal(table[0], [1, 2, 5, 9]) and
+                        np.array_equal(table[1], [3, 2, 1, 2]))
+        self.assertTrue(np.array_equal(loglik, dist.loglik([table, table],
+                                                           freq=True)))
+
+        # Fits from frequency tables match fits from the data
+        sad2 = [1, 1, 1, 2, 3, 3, 4, 6, 12, 40]
+        tables = [freq_table(sad), freq_table(sad2)]
+        for dist in [logser_ut, plognorm, plognorm_lt, lognorm, dgamma,
+                     geo_ser, nbd, nbd_lt, fnbd]:
+            fit = dist().fit([sad, sad2]).params
+            fit_freq = dist().fit(tables, freq=True).params
+            for kw in fit:
+                self.assertTrue(np.allclose(fit[kw], fit_freq[kw], rtol=1e-6,
+                                            atol=0))
+
+        # No underflow far in the tail
+        self.assertTrue(np.isfinite(pois(n_samp=10, tot_obs=100).logpmf(
+                                                                    500)[0]))
+
+    def test_p_absent(self):
+
+        # Closed forms equal pmf(0) and pmf(tot_obs) with n_samp = 1 / a
+        abunds = np.array([1, 2, 7, 50, 300])
+        for a in [.5, .1, .01]:
+            for dist in [binm(), pois(), nbd(k=.5), geo(), fnbd(k=2),
+                         fgeo(), tgeo()]:
+                dist.params.update(tot_obs=abunds, n_samp=1 / a)
+                p_abs = [tpmf[0] for tpmf in dist.pmf(0)]
+                p_all = [tpmf[0] for tpmf in dist.pmf(zip(abunds))]
+                self.assertTrue(np.allclose(dist.p_absent(abunds, a), p_abs,
+                                            rtol=1e-10, atol=1e-300))
+                self.assertTrue(np.allclose(dist.p_all(abunds, a), p_all,
+                                            rtol=1e-10, atol=1e-300))
+
+        # Whole area
+        for dist in [binm(), fnbd(k=2), fgeo(), tgeo()]:
+            self.assertTrue(np.all(dist.p_absent(abunds, 1) == 0))
+            self.assertTrue(np.allclose(dist.p_all(abunds, 1), 1))
+
+        # Areas broadcast against abundances, and k is taken from params
+        p = nbd(k=2).p_absent(10, [.5, .25])
+        self.assertTrue(np.allclose(p, (1 + np.array([.5, .25]) * 10 / 2) **
+                                    -2))
         
 if __name__ == '__main__':
     unittest.main()
@@ -258,6 +258,30 @@ f, scav, 0, 1, 4''')
         self.pat9 = Patch('xyfile13.csv')
         self.pat9.data_table.meta = self.xymeta13
 
+        # Data file with two yearly censuses of the same plot
+        self.xyfile14 = open('xyfile14.csv', 'w')
+        self.xyfile14.write('''spp_code, x, y, count, year
+a, 0, 0, 1, 2010
+b, 0, 1, 2, 2010
+c, 1, 0, 1, 2010
+a, 1, 1, 3, 2010
+a, 0, 0, 2, 2011
+d, 0, 0, 1, 2011
+b, 1, 1, 1, 2011
+c, 1, 1, 0, 2011''')
+        self.xyfile14.close()
+        self.xymeta14 = {('x', 'maximum'): 1, ('x', 'minimum'): 0, ('x',
+        'precision'): 1, ('x', 'type'): 'interval', ('y', 'maximum'): 1,
+        ('y', 'minimum'): 0, ('y', 'precision'): 1, ('y', 'type'): 'interval',
+        ('spp_code', 'maximum'): None, ('spp_code', 'minimum'): None,
+        ('spp_code', 'precision'): None, ('spp_code', 'type'): 'ordinal',
+        ('count', 'maximum'): None, ('count', 'minimum'): None, ('count',
+        'precision'): None, ('count', 'type'): 'ratio', ('year', 'maximum'):
+        None, ('year', 'minimum'): None, ('year', 'precision'): None,
+        ('year', 'type'): 'ordinal'}
+        self.pat10 = Patch('xyfile14.csv')
+        self.pat10.data_table.meta = self.xymeta14
+
 
 
 
@@ -271,6 +295,7 @@ f, scav, 0, 1, 4''')
         os.remove('xyfile11.csv')
         os.remove('xyfile12.csv')
         os.remove('xyfile13.csv')
+        os.remove('xyfile14.csv')
 
     #
     # init and set_attributes
@@ -395,6 +420,20 @@ f, scav, 0, 1, 4''')
         self.assertTrue(np.round(sar[0]['area'][0], decimals=2) == 0.06)
         self.assertTrue(sar[0]['items'][0] == 2)
 
+        # Parallel evaluation should match the serial result exactly
+        divs = [(1,1), (1,2), (3,2)]
+        for form in ['sar', 'ear']:
+            ser = self.pat4.sar(('x', 'y'), divs, {'spp_code': 'species',
+                        'count': 'count'}, form=form, output_N=True)
+            par = self.pat4.sar(('x', 'y'), divs, {'spp_code': 'species',
+                        'count': 'count'}, form=form, output_N=True, n_jobs=2)
+            self.assertTrue(np.array_equal(ser[0], par[0]))
+            for s_full, p_full in zip(ser[1], par[1]):
+                self.assertTrue(np.array_equal(s_full, p_full))
+
+        self.assertRaises(ValueError, self.pat4.sar, ('x', 'y'), divs,
+                          {'spp_code': 'species', 'count': 'count'}, n_jobs=0)
+
     def test_universal_sar(self):
 
         # Check that it returns the right length
@@ -418,6 +457,9 @@ f, scav, 0, 1, 4''')
         vals = self.pat8.universal_sar(div_cols, [(1,1), (1,2), (2,2)], 
                                                                     criteria)
         self.assertTrue(np.round(vals['z'][0], decimals=4) == 0.3390)
+        par_vals = self.pat8.universal_sar(div_cols, [(1,1), (1,2), (2,2)], 
+                                                        criteria, n_jobs=2)
+        self.assertTrue(np.array_equal(vals, par_vals))
 
         # If I pass in something other than a halving I should still get
         # something back
@@ -425,6 +467,37 @@ f, scav, 0, 1, 4''')
                                                                     criteria)
         self.assertTrue(len(vals) == 2)
 
+    def test_sta(self):
+        criteria = {'spp_code': 'species', 'count': 'count'}
+        divs = [(1,1), (2,1), (2,2)]
+        sta, sads = self.pat10.sta(('x', 'y'), divs, 'year', criteria)
+
+        # Window one matches sar run on each census separately
+        for year in [2010, 2011]:
+            pat = Patch('xyfile14.csv', {'year': ('==', year)})
+            pat.data_table.meta = self.xymeta14
+            sar = pat.sar(('x', 'y'), divs, criteria)[0]
+            rows = sta[(sta['window'] == 1) & (sta['time'] == year)]
+            self.assertTrue(np.array_equal(rows['items'], sar['items']))
+            self.assertTrue(np.array_equal(rows['area'], sar['area']))
+
+        # Species-time relationship for full plot and species-time-area
+        full = sta[(sta['area'] == 4) & (sta['window'] == 2)]
+        self.assertTrue(np.array_equal(full['items'], [4]))
+        quad = sta[(sta['area'] == 1) & (sta['window'] == 2)]
+        self.assertTrue(np.array_equal(quad['items'], [1.5]))
+
+        # Per-census sads
+        self.assertTrue(np.array_equal(sads[0][1], [4, 2, 1, 0]))
+        self.assertTrue(np.array_equal(sads[1][1], [2, 1, 0, 1]))
+        self.assertTrue(np.array_equal(sads[1][2], ['a', 'b', 'c', 'd']))
+
+        sta, sads = self.pat10.sta(('x', 'y'), divs, 'year', criteria,
+                                   windows=[2])
+        self.assertTrue(len(sta) == 3)
+        self.assertRaises(ValueError, self.pat10.sta, ('x', 'y'), divs,
+                          'year', criteria, windows=[3])
+
     def test_comm_sep(self):
 
         # Create result recarray 
@@ -0,0 +1,216 @@
+#!/usr/bin/python
+
+'''
+Memoization of numerical solves, such as the Lagrange multipliers of the METE
+distributions, that are repeated with the same parameters.
+
+Classes
+-------
+- `SolveCache` -- LRU cache in memory with an optional SQLite tier on disk
+'''
+
+from __future__ import division
+import os
+import threading
+import sqlite3 as lite
+from collections import OrderedDict
+import numpy as np
+
+
+class SolveCache(object):
+    '''
+    Cache of solved values keyed by the name of the solve and its parameters.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of values held in memory. The least recently used
+        values are discarded first.
+    path : str
+        Path to a SQLite database used as a second, persistent tier. If None
+        (default), values are only held in memory.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups answered from memory
+    disk_hits : int
+        Number of lookups answered from the SQLite tier
+    misses : int
+        Number of lookups that were not in the cache
+
+    Notes
+    -----
+    All methods are thread safe. Each process holds its own memory tier; the
+    SQLite tier may be shared between processes, and connections are reopened
+    in processes forked after the cache was created.
+
+    '''
+
+    def __init__(self, maxsize=10000, path=None):
+        '''Initialize SolveCache object. See class docstring.'''
+
+        self.maxsize = maxsize
+        self._lock = threading.RLock()
+        self._mem = OrderedDict()
+        self._con = None
+        self._pid = None
+        self.path = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path is not None:
+            self.use_disk(path)
+
+    def use_disk(self, path):
+        '''
+        Sets the SQLite database used as the persistent tier.
+
+        Parameters
+        ----------
+        path : str or None
+            Path to database, created if it does not exist. None turns off
+            the persistent tier.
+
+        '''
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
+            self._con = None
+            self.path = path
+            if path is not None:
+                self._connect()
+
+    def get(self, name, key, default=None):
+        '''
+        Returns the cached value of solve name for parameters key.
+
+        Parameters
+        ----------
+        name : str
+            Name of the solve, eg, 'beta'
+        key : tuple
+            Parameters of the solve
+        default : object
+            Returned if the value is not cached
+
+        '''
+        full_key = _make_key(name, key)
+
+        with self._lock:
+            if full_key in self._mem:
+                value = self._mem.pop(full_key)
+                self._mem[full_key] = value
+                self.hits += 1
+                return value
+
+            value = self._disk_get(full_key)
+            if value is not None:
+                self.disk_hits += 1
+                self._mem_set(full_key, value)
+                return value
+
+            self.misses += 1
+            return default
+
+    def set(self, name, key, value):
+        '''Stores value of solve name for parameters key. See get.'''
+        full_key = _make_key(name, key)
+
+        with self._lock:
+            self._mem_set(full_key, value)
+            self._disk_set([(full_key, value)])
+
+    def get_many(self, name, keys):
+        '''
+        Returns an array of cached values of solve name for each tuple of
+        parameters in keys, with nan for values that are not cached.
+        '''
+        return np.array([self.get(name, key, np.nan) for key in keys],
+                                                                 dtype=float)
+
+    def set_many(self, name, keys, values):
+        '''Stores values of solve name for each tuple of parameters in keys.'''
+        items = [(_make_key(name, key), value) for key, value in zip(keys,
+                                                                     values)]
+        with self._lock:
+            for full_key, value in items:
+                self._mem_set(full_key, value)
+            self._disk_set(items)
+
+    def clear(self, disk=False):
+        '''
+        Empties the memory tier and resets statistics. If disk is True, the
+        SQLite tier is emptied as well.
+        '''
+        with self._lock:
+            self._mem.clear()
+            self.hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+            if disk and self._connection() is not None:
+                self._con.execute('DELETE FROM solves')
+                self._con.commit()
+
+    def stats(self):
+        '''
+        Returns a dictionary with the number of hits, disk_hits and misses,
+        the hit_rate (fraction of lookups answered from either tier) and the
+        number of values held in memory (size).
+        '''
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            if lookups == 0:
+                rate = 0.
+            else:
+                rate = (self.hits + self.disk_hits) / lookups
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses':
+                    self.misses, 'hit_rate': rate, 'size': len(self._mem)}
+
+    def _mem_set(self, full_key, value):
+        '''Stores value in memory, discarding the least recently used.'''
+        self._mem.pop(full_key, None)
+        self._mem[full_key] = value
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def _connect(self):
+        '''Opens the SQLite tier for this process.'''
+        self._con = lite.connect(self.path, timeout=30,
+                                 check_same_thread=False)
+        self._con.execute('CREATE TABLE IF NOT EXISTS solves (key TEXT ' +
+                          'PRIMARY KEY, value REAL)')
+        self._con.commit()
+        self._pid = os.getpid()
+
+    def _connection(self):
+        '''Returns connection to the SQLite tier, reopened after a fork.'''
+        if self.path is None:
+            return None
+        if self._con is None or self._pid != os.getpid():
+            self._connect()
+        return self._con
+
+    def _disk_get(self, full_key):
+        con = self._connection()
+        if con is None:
+            return None
+        row = con.execute('SELECT value FROM solves WHERE key = ?',
+                          (full_key,)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def _disk_set(self, items):
+        con = self._connection()
+        if con is None:
+            return
+        con.executemany('INSERT OR REPLACE INTO solves VALUES (?, ?)',
+                        [(full_key, float(value)) for full_key, value in items])
+        con.commit()
+
+
+def _make_key(name, key):
+    '''Makes a string key that is identical for equal float parameters.'''
+    return name + ':' + ','.join([repr(float(k)) for k in key])
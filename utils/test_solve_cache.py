@@ -0,0 +1,84 @@
+#!/usr/bin/python
+#Testing solve_cache.py
+
+import unittest
+from solve_cache import *
+import numpy as np
+import os
+import threading
+
+
+class TestSolveCache(unittest.TestCase):
+    '''Tests the SolveCache class in solve_cache.py'''
+
+    def setUp(self):
+        self.db = 'solve_cache_test.db'
+
+    def tearDown(self):
+        if os.path.exists(self.db):
+            os.remove(self.db)
+
+    def test_get_set(self):
+        cache = SolveCache()
+        self.assertTrue(cache.get('beta', (30, 500)) is None)
+        cache.set('beta', (30, 500), .99)
+        self.assertTrue(cache.get('beta', (30, 500)) == .99)
+
+        # Ints and floats with the same value share a key
+        self.assertTrue(cache.get('beta', (30., 500.)) == .99)
+        self.assertTrue(cache.get('tgeo', (30, 500)) is None)
+
+        stats = cache.stats()
+        self.assertTrue(stats['hits'] == 2)
+        self.assertTrue(stats['misses'] == 2)
+        self.assertTrue(stats['hit_rate'] == .5)
+
+        vals = cache.get_many('beta', [(30, 500), (1, 2)])
+        self.assertTrue(vals[0] == .99)
+        self.assertTrue(np.isnan(vals[1]))
+
+    def test_lru(self):
+        cache = SolveCache(maxsize=2)
+        cache.set_many('beta', [(1, 2), (2, 3)], [.1, .2])
+        cache.get('beta', (1, 2))
+        cache.set('beta', (3, 4), .3)
+
+        # Least recently used value is discarded
+        self.assertTrue(cache.get('beta', (2, 3)) is None)
+        self.assertTrue(cache.get('beta', (1, 2)) == .1)
+        self.assertTrue(cache.stats()['size'] == 2)
+
+    def test_disk(self):
+        cache = SolveCache(path=self.db)
+        cache.set('beta', (30, 500), .99)
+
+        # A new cache, eg, in a new run, finds the value on disk
+        cache = SolveCache(path=self.db)
+        self.assertTrue(cache.get('beta', (30, 500)) == .99)
+        self.assertTrue(cache.stats()['disk_hits'] == 1)
+        self.assertTrue(cache.get('beta', (30, 500)) == .99)
+        self.assertTrue(cache.stats()['hits'] == 1)
+
+        cache.clear(disk=True)
+        self.assertTrue(cache.get('beta', (30, 500)) is None)
+
+    def test_threads(self):
+        cache = SolveCache(maxsize=50, path=self.db)
+
+        def work(i):
+            for j in xrange(100):
+                cache.set('beta', (i, j), i + j)
+                cache.get('beta', (i, j - 1))
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in
+                   xrange(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(cache.stats()['size'] == 50)
+        self.assertTrue(cache.get('beta', (3, 99)) == 102)
+
+if __name__ == '__main__':
+    unittest.main()